@@ -0,0 +1,132 @@
+"""partition system_log by day (RANGE on timestamp)
+
+Revision ID: 20261017_0017
+Revises: 20260221_0016
+Create Date: 2026-10-17
+
+system_log menjadi table Postgres yang di-partisi RANGE per hari (UTC):
+- parent system_log (PK (id, timestamp), index yang sama seperti sebelumnya
+  sebagai partitioned index)
+- satu partisi system_log_pYYYYMMDD per hari, dari hari log tertua sampai
+  hari ini + PREMAKE_DAYS
+- partisi DEFAULT system_log_default untuk row di luar range harian
+
+Data lama disalin dari table lama lalu table lama di-drop. Partisi hari
+berikutnya dibuat oleh Task 6 (SystemLogPartitionService.ensure_partitions).
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261017_0017"
+down_revision = "20260221_0016"
+branch_labels = None
+depends_on = None
+
+PREMAKE_DAYS = 7
+
+_INDEXES = [
+    ("ix_system_log_timestamp", ["timestamp"]),
+    ("ix_system_log_level", ["level"]),
+    ("ix_system_log_module", ["module"]),
+    ("ix_system_log_mo_id", ["mo_id"]),
+    ("ix_system_log_level_timestamp", ["level", "timestamp"]),
+    ("ix_system_log_module_timestamp", ["module", "timestamp"]),
+]
+
+
+def _day_literal(day: date) -> str:
+    return f"{day.isoformat()} 00:00:00+00"
+
+
+def _create_indexes(table_name: str) -> None:
+    for index_name, columns in _INDEXES:
+        op.create_index(index_name, table_name, columns)
+
+
+def _drop_indexes(table_name: str) -> None:
+    for index_name, _ in reversed(_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    _drop_indexes("system_log")
+    op.rename_table("system_log", "system_log_legacy")
+    op.execute("ALTER TABLE system_log_legacy DROP CONSTRAINT IF EXISTS system_log_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE system_log (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            level VARCHAR(16) NOT NULL,
+            module VARCHAR(255) NOT NULL,
+            message TEXT NOT NULL,
+            batch_no VARCHAR(64),
+            mo_id VARCHAR(64),
+            CONSTRAINT system_log_pkey PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    _create_indexes("system_log")
+    op.execute("CREATE TABLE system_log_default PARTITION OF system_log DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM system_log_legacy")).scalar()
+    today = datetime.now(timezone.utc).date()
+    first_day = oldest.astimezone(timezone.utc).date() if oldest is not None else today
+    first_day = min(first_day, today)
+
+    day = first_day
+    while day <= today + timedelta(days=PREMAKE_DAYS):
+        op.execute(
+            f"CREATE TABLE system_log_p{day:%Y%m%d} PARTITION OF system_log "
+            f"FOR VALUES FROM ('{_day_literal(day)}') TO ('{_day_literal(day + timedelta(days=1))}')"
+        )
+        day += timedelta(days=1)
+
+    op.execute(
+        "INSERT INTO system_log (id, timestamp, level, module, message, batch_no, mo_id) "
+        "SELECT id, timestamp, level, module, message, batch_no, mo_id FROM system_log_legacy"
+    )
+    op.drop_table("system_log_legacy")
+
+
+def downgrade() -> None:
+    op.rename_table("system_log", "system_log_partitioned")
+    op.execute(
+        "ALTER TABLE system_log_partitioned RENAME CONSTRAINT system_log_pkey TO system_log_partitioned_pkey"
+    )
+    op.create_table(
+        "system_log",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("level", sa.String(length=16), nullable=False),
+        sa.Column("module", sa.String(length=255), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("batch_no", sa.String(length=64), nullable=True),
+        sa.Column("mo_id", sa.String(length=64), nullable=True),
+    )
+    op.execute(
+        "INSERT INTO system_log (id, timestamp, level, module, message, batch_no, mo_id) "
+        "SELECT id, timestamp, level, module, message, batch_no, mo_id FROM system_log_partitioned"
+    )
+    # DROP parent ikut men-drop semua partisinya (termasuk DEFAULT)
+    op.execute("DROP TABLE system_log_partitioned")
+    _create_indexes("system_log")
@@ -0,0 +1,52 @@
+"""add task_id and run_id to system_log
+
+Revision ID: 20261017_0018
+Revises: 20261017_0017
+Create Date: 2026-10-17
+
+Log dari task scheduler ditandai task_id (task1..task6) dan run_id (satu
+eksekusi task) lewat app.core.log_context. Admin task monitor memfilter
+dengan index (task_id, timestamp) menggantikan message ILIKE '%[TASK n]%'.
+
+Log lama di-backfill dari prefix message "[TASK n]".
+
+Pada table yang dipartisi, ADD COLUMN dan CREATE INDEX di parent otomatis
+berlaku untuk semua partisi.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_0018"
+down_revision = "20261017_0017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("system_log", sa.Column("task_id", sa.String(length=32), nullable=True))
+    op.add_column("system_log", sa.Column("run_id", sa.String(length=32), nullable=True))
+
+    # Backfill log lama dari prefix message "[TASK n]" (sekali jalan, run_id tetap NULL)
+    op.execute(
+        r"""
+        UPDATE system_log
+        SET task_id = 'task' || substring(message from '\[TASK ([1-6])\]')
+        WHERE task_id IS NULL AND message ~ '\[TASK [1-6]\]'
+        """
+    )
+
+    op.create_index(
+        "ix_system_log_task_id_timestamp",
+        "system_log",
+        ["task_id", "timestamp"],
+    )
+    op.create_index("ix_system_log_run_id", "system_log", ["run_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_system_log_run_id", table_name="system_log")
+    op.drop_index("ix_system_log_task_id_timestamp", table_name="system_log")
+    op.drop_column("system_log", "run_id")
+    op.drop_column("system_log", "task_id")
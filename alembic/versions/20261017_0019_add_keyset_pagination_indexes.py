@@ -0,0 +1,42 @@
+"""add keyset pagination indexes for system_log and mo_histories
+
+Revision ID: 20261017_0019
+Revises: 20261017_0018
+Create Date: 2026-10-17
+
+Keyset pagination (app.db.pagination.keyset_page) mengurutkan:
+- system_log   : (timestamp DESC, id DESC)
+- mo_histories : (last_read_from_plc DESC NULLS LAST, id DESC)
+
+Index komposit di bawah membuat setiap halaman menjadi satu index range
+scan. ix_system_log_timestamp digantikan ix_system_log_timestamp_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_0019"
+down_revision = "20261017_0018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_system_log_timestamp_id",
+        "system_log",
+        ["timestamp", "id"],
+    )
+    op.drop_index("ix_system_log_timestamp", table_name="system_log")
+    op.create_index(
+        "ix_mo_histories_last_read_id",
+        "mo_histories",
+        [sa.text("last_read_from_plc DESC NULLS LAST"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mo_histories_last_read_id", table_name="mo_histories")
+    op.create_index("ix_system_log_timestamp", "system_log", ["timestamp"])
+    op.drop_index("ix_system_log_timestamp_id", table_name="system_log")
@@ -0,0 +1,43 @@
+"""add pg_trgm GIN indexes for system_log message/module search
+
+Revision ID: 20261017_0020
+Revises: 20261017_0019
+Create Date: 2026-10-17
+
+Filter /api/logs `search` dan `module` memakai ILIKE '%...%' yang tidak
+bisa dilayani B-tree. Index GIN gin_trgm_ops membuat ILIKE (pattern >= 3
+karakter) dan word_similarity() memakai index. Di table yang dipartisi,
+index dibuat di parent dan otomatis ada di semua partisi.
+"""
+
+from alembic import op
+
+
+revision = "20261017_0020"
+down_revision = "20261017_0019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_system_log_message_trgm",
+        "system_log",
+        ["message"],
+        postgresql_using="gin",
+        postgresql_ops={"message": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_system_log_module_trgm",
+        "system_log",
+        ["module"],
+        postgresql_using="gin",
+        postgresql_ops={"module": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_system_log_module_trgm", table_name="system_log")
+    op.drop_index("ix_system_log_message_trgm", table_name="system_log")
+    # Extension pg_trgm dibiarkan (bisa dipakai object lain)
@@ -7,9 +7,10 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import desc, text, select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, func, or_, text, select
+from sqlalchemy.orm import Session, aliased
 
+from app.core.db_logger import get_database_log_stats
 from app.core.scheduler import (
     auto_sync_mo_task,
     get_scheduler_status,
@@ -55,6 +56,16 @@ TASK_MONITOR_CONFIG: dict[str, dict[str, str]] = {
         "prefix": "[TASK 4]",
         "description": "Health monitoring scheduler",
     },
+    "task5": {
+        "label": "TASK 5",
+        "prefix": "[TASK 5]",
+        "description": "Equipment failure monitoring scheduler",
+    },
+    "task6": {
+        "label": "TASK 6",
+        "prefix": "[TASK 6]",
+        "description": "System log cleanup scheduler",
+    },
 }
 
 
@@ -69,21 +80,34 @@ def _resolve_task_monitor(task_name: str) -> dict[str, str]:
     return task_config
 
 
-def _build_task_log_query(
-    db: Session,
-    task_prefix: str,
+def _task_log_filters(
+    task_ids: list[str],
     since_minutes: Optional[int],
     level: Optional[str] = None,
-):
-    query = db.query(SystemLog).filter(SystemLog.message.ilike(f"%{task_prefix}%"))
+) -> list[Any]:
+    """Filter system_log per task via kolom task_id (index task_id, timestamp)."""
+    filters: list[Any] = [SystemLog.task_id.in_(task_ids)]
 
     if since_minutes is not None:
         cutoff = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
-        query = query.filter(SystemLog.timestamp >= cutoff)
+        filters.append(SystemLog.timestamp >= cutoff)
 
     if level:
-        query = query.filter(SystemLog.level == level.upper())
+        filters.append(SystemLog.level == level.upper())
+
+    return filters
+
 
+def _build_task_log_query(
+    db: Session,
+    task_id: str,
+    since_minutes: Optional[int],
+    level: Optional[str] = None,
+    run_id: Optional[str] = None,
+):
+    query = db.query(SystemLog).filter(*_task_log_filters([task_id], since_minutes, level))
+    if run_id:
+        query = query.filter(SystemLog.run_id == run_id)
     return query
 
 
@@ -116,38 +140,76 @@ def _serialize_system_log(log: SystemLog) -> dict[str, Any]:
         "message": log.message,
         "batch_no": log.batch_no,
         "mo_id": log.mo_id,
+        "task_id": log.task_id,
+        "run_id": log.run_id,
     }
 
 
+def _build_task_monitor_summaries(
+    db: Session,
+    task_names: list[str],
+    since_minutes: Optional[int],
+) -> dict[str, dict[str, Any]]:
+    """
+    Ringkasan beberapa TASK sekaligus: satu query agregat GROUP BY task_id
+    (COUNT(*) FILTER per level) plus satu query untuk log terbaru tiap task.
+    """
+    task_ids = [task_name.lower() for task_name in task_names]
+    task_configs = {task_id: _resolve_task_monitor(task_id) for task_id in task_ids}
+
+    counts_stmt = (
+        select(
+            SystemLog.task_id,
+            func.count().label("total"),
+            func.count().filter(SystemLog.level == "INFO").label("info"),
+            func.count().filter(SystemLog.level == "WARNING").label("warning"),
+            func.count().filter(SystemLog.level.in_(["ERROR", "CRITICAL"])).label("error"),
+            func.max(SystemLog.timestamp).label("last_at"),
+        )
+        .where(*_task_log_filters(task_ids, since_minutes))
+        .group_by(SystemLog.task_id)
+    )
+    counts = {row.task_id: row for row in db.execute(counts_stmt)}
+
+    latest_logs: dict[str, SystemLog] = {}
+    latest_conditions = [
+        and_(SystemLog.task_id == task_id, SystemLog.timestamp == row.last_at)
+        for task_id, row in counts.items()
+    ]
+    if latest_conditions:
+        for log in db.query(SystemLog).filter(or_(*latest_conditions)).all():
+            latest_logs.setdefault(log.task_id, log)
+
+    summaries: dict[str, dict[str, Any]] = {}
+    for task_id in task_ids:
+        task_config = task_configs[task_id]
+        row = counts.get(task_id)
+        latest_log = latest_logs.get(task_id)
+        summaries[task_id] = {
+            "task": task_id,
+            "label": task_config["label"],
+            "description": task_config["description"],
+            "status": _derive_task_health(latest_log),
+            "latest_level": latest_log.level if latest_log is not None else None,
+            "last_run_at": latest_log.timestamp.isoformat() if latest_log is not None else None,
+            "last_run_id": latest_log.run_id if latest_log is not None else None,
+            "latest_message": latest_log.message if latest_log is not None else None,
+            "log_counts": {
+                "total": row.total if row is not None else 0,
+                "info": row.info if row is not None else 0,
+                "warning": row.warning if row is not None else 0,
+                "error": row.error if row is not None else 0,
+            },
+        }
+    return summaries
+
+
 def _build_task_monitor_summary(
     db: Session,
     task_name: str,
     since_minutes: Optional[int],
 ) -> dict[str, Any]:
-    task_config = _resolve_task_monitor(task_name)
-    base_query = _build_task_log_query(db, task_config["prefix"], since_minutes)
-
-    total_logs = base_query.count()
-    latest_log = base_query.order_by(desc(SystemLog.timestamp)).first()
-    error_count = base_query.filter(SystemLog.level.in_(["ERROR", "CRITICAL"])).count()
-    warning_count = base_query.filter(SystemLog.level == "WARNING").count()
-    info_count = base_query.filter(SystemLog.level == "INFO").count()
-
-    return {
-        "task": task_name,
-        "label": task_config["label"],
-        "description": task_config["description"],
-        "status": _derive_task_health(latest_log),
-        "latest_level": latest_log.level if latest_log is not None else None,
-        "last_run_at": latest_log.timestamp.isoformat() if latest_log is not None else None,
-        "latest_message": latest_log.message if latest_log is not None else None,
-        "log_counts": {
-            "total": total_logs,
-            "info": info_count,
-            "warning": warning_count,
-            "error": error_count,
-        },
-    }
+    return _build_task_monitor_summaries(db, [task_name], since_minutes)[task_name.lower()]
 
 
 @router.post("/admin/reset-task1-start")
@@ -250,6 +312,17 @@ async def get_scheduler_runtime_status() -> Any:
         ) from exc
 
 
+@router.get("/admin/db-log/status")
+async def get_db_log_status() -> Any:
+    """
+    Status buffer DatabaseLogHandler: isi queue, record tertulis, dan record yang di-drop.
+    """
+    return {
+        "status": "success",
+        "data": get_database_log_stats(),
+    }
+
+
 @router.post("/admin/scheduler/toggle")
 async def toggle_scheduler_runtime(payload: SchedulerToggleRequest) -> Any:
     """
@@ -367,9 +440,11 @@ async def get_mo_histories_table(
     offset: int = Query(default=0, ge=0),
     status: Optional[str] = Query(default=None),
     mo_id: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(default=None, description="next_cursor halaman sebelumnya"),
+    count: str = Query(default="exact", pattern="^(exact|approx|none)$"),
 ) -> Any:
     """
-    Get data tabel mo_histories dengan pagination.
+    Get data tabel mo_histories dengan pagination (offset atau keyset via cursor).
     """
     try:
         table_service = get_table_view_service(db)
@@ -378,12 +453,16 @@ async def get_mo_histories_table(
             offset=offset,
             status=status,
             mo_id=mo_id,
+            cursor=cursor,
+            count=count,
         )
 
         return {
             "status": "success",
             "data": data,
         }
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("Error getting mo_histories table: %s", str(exc))
         raise
@@ -466,10 +545,9 @@ async def get_task_monitor_summary(
     Cocok untuk kartu monitoring frontend.
     """
     try:
-        tasks = [
-            _build_task_monitor_summary(db, task_name, since_minutes)
-            for task_name in TASK_MONITOR_CONFIG
-        ]
+        tasks = list(
+            _build_task_monitor_summaries(db, list(TASK_MONITOR_CONFIG), since_minutes).values()
+        )
 
         return {
             "status": "success",
@@ -501,25 +579,32 @@ async def get_task_monitor_errors(
         if include_warning:
             levels.append("WARNING")
 
-        alerts_by_task: dict[str, list[dict[str, Any]]] = {}
-        total_alerts = 0
-
-        for task_name, task_config in TASK_MONITOR_CONFIG.items():
-            alert_query = _build_task_log_query(
-                db=db,
-                task_prefix=task_config["prefix"],
-                since_minutes=since_minutes,
-            ).filter(SystemLog.level.in_(levels))
-
-            task_alerts = (
-                alert_query.order_by(desc(SystemLog.timestamp))
-                .limit(limit_per_task)
-                .all()
+        # Satu query: N alert terbaru per task via row_number() OVER (PARTITION BY task_id)
+        ranked = (
+            select(
+                SystemLog,
+                func.row_number()
+                .over(partition_by=SystemLog.task_id, order_by=desc(SystemLog.timestamp))
+                .label("task_rank"),
+            )
+            .where(
+                *_task_log_filters(list(TASK_MONITOR_CONFIG), since_minutes),
+                SystemLog.level.in_(levels),
             )
+            .subquery()
+        )
+        ranked_log = aliased(SystemLog, ranked)
+        task_alerts = (
+            db.query(ranked_log)
+            .filter(ranked.c.task_rank <= limit_per_task)
+            .order_by(desc(ranked.c.timestamp))
+            .all()
+        )
 
-            serialized = [_serialize_system_log(item) for item in task_alerts]
-            alerts_by_task[task_name] = serialized
-            total_alerts += len(serialized)
+        alerts_by_task: dict[str, list[dict[str, Any]]] = {task_name: [] for task_name in TASK_MONITOR_CONFIG}
+        for item in task_alerts:
+            alerts_by_task[item.task_id].append(_serialize_system_log(item))
+        total_alerts = len(task_alerts)
 
         return {
             "status": "success",
@@ -553,35 +638,37 @@ async def get_task_monitor_errors_flat(
         if include_warning:
             levels.append("WARNING")
 
-        all_alerts: list[dict[str, Any]] = []
-
-        for task_name, task_config in TASK_MONITOR_CONFIG.items():
-            alert_query = _build_task_log_query(
-                db=db,
-                task_prefix=task_config["prefix"],
-                since_minutes=since_minutes,
-            ).filter(SystemLog.level.in_(levels))
-
-            for item in alert_query.all():
-                serialized = _serialize_system_log(item)
-                serialized["task"] = task_name
-                serialized["task_label"] = task_config["label"]
-                serialized["task_prefix"] = task_config["prefix"]
-                all_alerts.append(serialized)
+        alert_query = db.query(SystemLog).filter(
+            *_task_log_filters(list(TASK_MONITOR_CONFIG), since_minutes),
+            SystemLog.level.in_(levels),
+        )
+        total_alerts = alert_query.count()
+        items = (
+            alert_query.order_by(desc(SystemLog.timestamp))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
-        all_alerts.sort(key=lambda item: item.get("timestamp") or "", reverse=True)
-        paged_alerts = all_alerts[skip : skip + limit]
+        paged_alerts: list[dict[str, Any]] = []
+        for item in items:
+            task_config = TASK_MONITOR_CONFIG[item.task_id]
+            serialized = _serialize_system_log(item)
+            serialized["task"] = item.task_id
+            serialized["task_label"] = task_config["label"]
+            serialized["task_prefix"] = task_config["prefix"]
+            paged_alerts.append(serialized)
 
         return {
             "status": "success",
             "data": {
                 "since_minutes": since_minutes,
                 "levels": levels,
-                "total_alerts": len(all_alerts),
+                "total_alerts": total_alerts,
                 "skip": skip,
                 "limit": limit,
                 "items": paged_alerts,
-                "has_next": (skip + len(paged_alerts)) < len(all_alerts),
+                "has_next": (skip + len(paged_alerts)) < total_alerts,
             },
         }
     except Exception as exc:
@@ -597,13 +684,14 @@ async def get_task_monitor_detail(
     skip: int = Query(default=0, ge=0),
     since_minutes: Optional[int] = Query(default=180, ge=1, le=10080),
     level: Optional[str] = Query(default=None),
+    run_id: Optional[str] = Query(default=None, description="Filter satu eksekusi task"),
 ) -> Any:
     """
     Detail monitoring untuk satu TASK scheduler, termasuk recent log lines.
     """
     try:
         task_config = _resolve_task_monitor(task_name)
-        log_query = _build_task_log_query(db, task_config["prefix"], since_minutes, level)
+        log_query = _build_task_log_query(db, task_name.lower(), since_minutes, level, run_id)
         total = log_query.count()
         items = (
             log_query.order_by(desc(SystemLog.timestamp))
@@ -622,6 +710,7 @@ async def get_task_monitor_detail(
                     "prefix": task_config["prefix"],
                     "since_minutes": since_minutes,
                     "level": level.upper() if level else None,
+                    "run_id": run_id,
                     "skip": skip,
                     "limit": limit,
                 },
@@ -644,14 +733,19 @@ async def get_batch_history(
     db: Session = Depends(get_db),
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor halaman sebelumnya"),
 ) -> Any:
     """
     Get history of processed batches (completed and failed).
-    Support pagination.
+    Support pagination (offset, atau keyset via cursor).
     """
     try:
         history_service = get_mo_history_service(db)
-        histories = history_service.get_history(limit=limit, offset=offset)
+        histories, next_cursor = history_service.get_history_page(
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
         
         history_list = [
             {
@@ -689,10 +783,14 @@ async def get_batch_history(
             "data": {
                 "total": len(history_list),
                 "limit": limit,
-                "offset": offset,
+                "offset": 0 if cursor else offset,
+                "has_next": next_cursor is not None,
+                "next_cursor": next_cursor,
                 "histories": history_list,
             },
         }
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("Error getting batch history: %s", str(exc))
         raise
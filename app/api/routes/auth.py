@@ -1,10 +1,10 @@
 import logging
 from typing import Any
 
-import httpx
 from fastapi import APIRouter, HTTPException
 
 from app.services.odoo_auth_service import authenticate_odoo
+from app.services.odoo_client import get_odoo_client
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -16,16 +16,22 @@ async def authenticate():
     Authenticate user to Odoo and return session info.
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            result = await authenticate_odoo(client)
-            return {
-                "status": "success",
-                "message": "Authenticated successfully",
-                "data": result,
-            }
+        result = await authenticate_odoo(force=True)
+        return {
+            "status": "success",
+            "message": "Authenticated successfully",
+            "data": result,
+        }
     except Exception as exc:  # noqa: BLE001
         logger.exception("Auth error: %s", str(exc))
         raise HTTPException(
             status_code=401,
             detail=str(exc),
         ) from exc
+
+
+@router.get("/scada/odoo-client")
+async def get_odoo_client_status():
+    """Status shared Odoo client: session, jumlah login/re-auth, jumlah request."""
+    client = await get_odoo_client()
+    return {"status": "success", "data": client.get_status()}
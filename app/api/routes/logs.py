@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, func, select
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.db.pagination import count_rows, encode_cursor, keyset_page
 from app.db.session import get_db
 from app.models.system_log import SystemLog
 from app.schemas.system_log import (
@@ -12,10 +14,17 @@ from app.schemas.system_log import (
     SystemLogListResponse,
     SystemLogResponse,
 )
+from app.services.system_log_partition_service import get_system_log_partition_service
 
 router = APIRouter()
 
 
+def _contains_pattern(value: str) -> str:
+    """Pattern ILIKE '%value%' dengan wildcard dari input user di-escape."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
 @router.get("/", response_model=SystemLogListResponse)
 def get_system_logs(
     db: Session = Depends(get_db),
@@ -26,30 +35,99 @@ def get_system_logs(
     search: Optional[str] = None,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor dari halaman sebelumnya (keyset pagination, skip diabaikan)",
+    ),
+    count: str = Query(
+        default="exact",
+        pattern="^(exact|approx|none)$",
+        description="exact = COUNT(*), approx = estimasi planner (cepat), none = tanpa total",
+    ),
+    sort: str = Query(
+        default="time",
+        pattern="^(time|relevance)$",
+        description="relevance = urut word_similarity(search, message) (butuh search, Postgres)",
+    ),
 ):
-    query = db.query(SystemLog)
+    search_from: Optional[datetime] = None
+    window_days = get_settings().log_search_window_days
+    if (search or module) and start_time is None and window_days > 0:
+        # Prefilter waktu: search tanpa start_time hanya melihat N hari terakhir
+        # (partition pruning + index trigram hanya untuk partisi tersebut)
+        search_from = datetime.now(timezone.utc) - timedelta(days=window_days)
+        start_time = search_from
+
+    stmt = select(SystemLog)
 
     if level:
-        query = query.filter(SystemLog.level == level.upper())
+        stmt = stmt.where(SystemLog.level == level.upper())
     if module:
-        query = query.filter(SystemLog.module.ilike(f"%{module}%"))
+        stmt = stmt.where(SystemLog.module.ilike(_contains_pattern(module), escape="\\"))
     if search:
-        query = query.filter(SystemLog.message.ilike(f"%{search}%"))
+        stmt = stmt.where(SystemLog.message.ilike(_contains_pattern(search), escape="\\"))
     if start_time:
-        query = query.filter(SystemLog.timestamp >= start_time)
+        stmt = stmt.where(SystemLog.timestamp >= start_time)
     if end_time:
-        query = query.filter(SystemLog.timestamp <= end_time)
+        stmt = stmt.where(SystemLog.timestamp <= end_time)
+
+    total, total_is_estimate = count_rows(db, stmt, count)
+
+    ranked = sort == "relevance" and bool(search) and db.get_bind().dialect.name == "postgresql"
+    scores: dict[Any, float] = {}
+    if ranked:
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor is not supported with sort=relevance")
+        score = func.word_similarity(search, SystemLog.message).label("score")
+        rows = db.execute(
+            stmt.add_columns(score)
+            .order_by(desc(score), desc(SystemLog.timestamp), desc(SystemLog.id))
+            .offset(skip)
+            .limit(limit + 1)
+        ).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        items = [row[0] for row in rows]
+        scores = {row[0].id: float(row[1]) for row in rows}
+        next_cursor = None
+    elif cursor:
+        try:
+            items, next_cursor = keyset_page(
+                db, stmt, SystemLog.timestamp, SystemLog.id, limit, cursor=cursor
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        skip = 0
+        has_next = next_cursor is not None
+    else:
+        # Offset pagination (kompatibel); next_cursor tetap dikirim untuk halaman berikutnya
+        items = list(
+            db.execute(
+                stmt.order_by(desc(SystemLog.timestamp), desc(SystemLog.id))
+                .offset(skip)
+                .limit(limit + 1)
+            ).scalars().all()
+        )
+        has_next = len(items) > limit
+        items = items[:limit]
+        next_cursor = encode_cursor([items[-1].timestamp, items[-1].id]) if has_next else None
 
-    total = query.count()
-    items = query.order_by(desc(SystemLog.timestamp)).offset(skip).limit(limit).all()
+    responses = []
+    for item in items:
+        response = SystemLogResponse.model_validate(item)
+        response.score = scores.get(item.id)
+        responses.append(response)
 
     return SystemLogListResponse(
-        items=[SystemLogResponse.model_validate(item) for item in items],
+        items=responses,
         meta=SystemLogListMeta(
             total=total,
+            total_is_estimate=total_is_estimate,
             skip=skip,
             limit=limit,
-            has_next=(skip + len(items)) < total,
+            has_next=has_next,
+            next_cursor=next_cursor,
+            search_from=search_from,
         ),
     )
 
@@ -60,52 +138,62 @@ def clear_logs(
     keep_last: int = Query(default=1000, ge=0),
     older_than_days: Optional[int] = Query(default=None, ge=1),
 ):
+    # deleted_count = row yang dihapus per row (exact). Row di partisi yang di-drop /
+    # di-truncate hanya diketahui dari estimasi planner -> approx_deleted_count.
+    partition_service = get_system_log_partition_service(db)
+    partitioned = partition_service.is_partitioned()
+
     if older_than_days is not None:
         cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
-        query = db.query(SystemLog).filter(SystemLog.timestamp < cutoff)
-
-        if keep_last > 0:
-            keep_subquery = (
-                select(SystemLog.id)
-                .order_by(desc(SystemLog.timestamp))
-                .limit(keep_last)
-            )
-            query = query.filter(~SystemLog.id.in_(keep_subquery))
-
-        deleted = query.delete(synchronize_session=False)
-        db.commit()
+        if partitioned:
+            # DROP partisi harian yang seluruhnya < cutoff (granularitas 1 hari)
+            result = partition_service.drop_expired(cutoff, keep_last=keep_last)
+            deleted = result["default_deleted"]
+            approx_deleted = result["approx_deleted_count"]
+            dropped_partitions = result["dropped_partitions"]
+        else:
+            deleted = partition_service.delete_legacy(cutoff, keep_last)
+            approx_deleted = 0
+            dropped_partitions = []
         return {
             "message": (
                 f"Logs older than {older_than_days} day(s) cleaned "
                 f"(cutoff={cutoff.isoformat()})."
             ),
             "deleted_count": deleted,
+            "approx_deleted_count": approx_deleted,
             "kept_count": keep_last if keep_last > 0 else 0,
             "older_than_days": older_than_days,
+            "dropped_partitions": dropped_partitions,
         }
 
     if keep_last <= 0:
-        deleted = db.query(SystemLog).delete(synchronize_session=False)
-        db.commit()
+        if partitioned:
+            deleted = 0
+            approx_deleted = partition_service.truncate()
+        else:
+            deleted = partition_service.delete_legacy(None, 0)
+            approx_deleted = 0
         return {
             "message": "All logs cleared",
             "deleted_count": deleted,
+            "approx_deleted_count": approx_deleted,
             "kept_count": 0,
         }
 
-    keep_subquery = (
-        select(SystemLog.id)
-        .order_by(desc(SystemLog.timestamp))
-        .limit(keep_last)
-    )
-    deleted = (
-        db.query(SystemLog)
-        .filter(~SystemLog.id.in_(keep_subquery))
-        .delete(synchronize_session=False)
-    )
-    db.commit()
+    if partitioned:
+        result = partition_service.keep_latest(keep_last)
+        deleted = result["deleted"]
+        approx_deleted = result["approx_deleted_count"]
+        dropped_partitions = result["dropped_partitions"]
+    else:
+        deleted = partition_service.delete_legacy(None, keep_last)
+        approx_deleted = 0
+        dropped_partitions = []
     return {
         "message": f"Logs cleaned. Kept latest {keep_last} rows.",
         "deleted_count": deleted,
+        "approx_deleted_count": approx_deleted,
         "kept_count": keep_last,
+        "dropped_partitions": dropped_partitions,
     }
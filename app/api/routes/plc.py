@@ -11,8 +11,14 @@ from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.tablesmo_batch import TableSmoBatch
+from app.services.fins_async_client import get_async_fins_client
+from app.services.fins_session import get_fins_session
+from app.services.plc_handshake_service import get_handshake_service
+from app.services.plc_io_broker import PLCLane, get_plc_io_broker, plc_lane
+from app.services.plc_memory_image import get_plc_memory_image
 from app.services.plc_write_service import get_plc_write_service
 from app.services.plc_read_service import get_plc_read_service
+from app.services.plc_retry_policy import get_plc_circuit_breaker, get_plc_resilience_status
 from app.services.plc_sync_service import get_plc_sync_service
 
 logger = logging.getLogger(__name__)
@@ -54,7 +60,7 @@ async def write_field_to_plc(request: PLCWriteFieldRequest) -> Any:
     """
     try:
         service = get_plc_write_service()
-        service.write_field(
+        await service.write_field_async(
             batch_name=request.batch_name,
             field_name=request.field_name,
             value=request.value,
@@ -98,7 +104,7 @@ async def write_batch_to_plc(request: PLCWriteBatchRequest) -> Any:
     """
     try:
         service = get_plc_write_service()
-        service.write_batch(
+        await service.write_batch_async(
             batch_name=request.batch_name,
             data=request.data,
         )
@@ -185,7 +191,7 @@ async def write_mo_batch_to_plc(
         
         # Write to PLC
         service = get_plc_write_service()
-        service.write_mo_batch_to_plc(batch_data, request.plc_batch_slot)
+        await service.write_mo_batch_to_plc_async(batch_data, request.plc_batch_slot)
         
         return {
             "status": "success",
@@ -225,10 +231,76 @@ async def get_plc_config() -> Any:
             "batches_loaded": len(service.mapping),
             "read_batches_loaded": len(getattr(read_service, "batch_mappings", {})),
             "read_fields_per_batch": len(getattr(read_service, "mapping", [])),
+            "session": get_fins_session().get_health(),
+            "async_session": (await get_async_fins_client()).get_health(),
         },
     }
 
 
+def _coerce_unknown_flags(flags: Dict[str, Any]) -> Dict[str, Any]:
+    """Tampilan dashboard: flag unknown (None, gagal dibaca) ditampilkan sebagai 0."""
+    return {
+        key: (
+            {batch_no: flag or 0 for batch_no, flag in value.items()}
+            if isinstance(value, dict)
+            else value or 0
+        )
+        for key, value in flags.items()
+    }
+
+
+@router.get("/plc/handshake-status")
+async def get_handshake_status() -> Any:
+    """Read semua status_read_data handshake (READ, WRITE, failure, manual weighing) dalam satu frame."""
+    try:
+        with plc_lane(PLCLane.DASHBOARD):
+            flags = await get_handshake_service().read_all_status_flags_async()
+        return {"status": "success", "data": _coerce_unknown_flags(flags)}
+    except Exception as exc:
+        logger.exception("Error reading PLC handshake status: %s", str(exc))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to read PLC handshake status: {str(exc)}",
+        ) from exc
+
+
+@router.get("/plc/memory-image")
+async def get_memory_image_status(refresh: bool = Query(False, description="Bulk-scan semua region dulu")) -> Any:
+    """Status PLC memory image: umur tiap region, hit/miss, jumlah frame ke PLC."""
+    image = get_plc_memory_image()
+    if not refresh:
+        return {"status": "success", "data": image.get_status()}
+    try:
+        with plc_lane(PLCLane.DASHBOARD):
+            return {"status": "success", "data": await image.scan_async()}
+    except Exception as exc:
+        logger.exception("Error scanning PLC memory image: %s", str(exc))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to scan PLC memory image: {str(exc)}",
+        ) from exc
+
+
+@router.get("/plc/broker")
+async def get_plc_broker_status() -> Any:
+    """Metrics PLC I/O broker: in-flight, token bucket, antrian dan wait time per lane."""
+    return {"status": "success", "data": get_plc_io_broker().get_status()}
+
+
+@router.get("/plc/circuit-breaker")
+async def get_plc_circuit_breaker_status() -> Any:
+    """Status retry policy, cycle budget dan circuit breaker komunikasi PLC."""
+    return {"status": "success", "data": get_plc_resilience_status()}
+
+
+@router.post("/plc/circuit-breaker/reset")
+async def reset_plc_circuit_breaker() -> Any:
+    """Tutup circuit breaker secara manual (mis. setelah PLC selesai maintenance)."""
+    breaker = get_plc_circuit_breaker()
+    breaker.reset()
+    return {"status": "success", "data": breaker.get_status()}
+
+
 @router.get("/plc/read-field/{field_name}")
 async def read_field_from_plc(
     field_name: str,
@@ -242,7 +314,8 @@ async def read_field_from_plc(
     """
     try:
         service = get_plc_read_service()
-        value = service.read_field(field_name, batch_no=batch_no)
+        with plc_lane(PLCLane.DASHBOARD):
+            value = await service.read_field_async(field_name, batch_no=batch_no)
         
         return {
             "status": "success",
@@ -272,7 +345,8 @@ async def read_all_fields_from_plc(
     """
     try:
         service = get_plc_read_service()
-        data = service.read_all_fields(batch_no=batch_no)
+        with plc_lane(PLCLane.DASHBOARD):
+            data = await service.read_all_fields_async(batch_no=batch_no)
         
         return {
             "status": "success",
@@ -298,7 +372,8 @@ async def read_batch_from_plc(
     """
     try:
         service = get_plc_read_service()
-        batch_data = service.read_batch_data(batch_no=batch_no)
+        with plc_lane(PLCLane.DASHBOARD):
+            batch_data = await service.read_batch_data_async(batch_no=batch_no)
         
         return {
             "status": "success",
@@ -320,7 +395,8 @@ async def read_all_batches_from_plc() -> Any:
     """
     try:
         service = get_plc_read_service()
-        all_batches = service.read_all_batches_data()
+        with plc_lane(PLCLane.DASHBOARD):
+            all_batches = await service.read_all_batches_data_async()
 
         return {
             "status": "success",
@@ -336,7 +412,9 @@ async def read_all_batches_from_plc() -> Any:
 
 
 @router.post("/plc/sync-from-plc")
-async def sync_data_from_plc() -> Any:
+async def sync_data_from_plc(
+    full: bool = Query(False, description="Abaikan gating two-phase, baca semua batch"),
+) -> Any:
     """
     Read data dari PLC dan update mo_batch table berdasarkan MO_ID.
     
@@ -352,7 +430,7 @@ async def sync_data_from_plc() -> Any:
     """
     try:
         service = get_plc_sync_service()
-        result = await service.sync_from_plc()
+        result = await service.sync_from_plc(force_full=full)
         
         if result["success"]:
             return {
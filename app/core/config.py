@@ -30,6 +30,43 @@ class Settings(BaseSettings):
     plc_timeout_sec: float = Field(default=2.0, validation_alias="PLC_TIMEOUT_SEC")
     client_node: int = Field(default=1, validation_alias="CLIENT_NODE")
     plc_node: int = Field(default=2, validation_alias="PLC_NODE")
+    # Port lokal untuk socket FINS bersama (0 = ephemeral, tetap dipakai selama proses hidup)
+    plc_local_port: int = Field(default=0, validation_alias="PLC_LOCAL_PORT")
+    # Jumlah maksimal FINS request in-flight untuk pipelined read (1 = lockstep)
+    plc_pipeline_window: int = Field(default=4, validation_alias="PLC_PIPELINE_WINDOW")
+    # Gap maksimal (word) antar DM range yang masih digabung ke satu read frame
+    plc_read_max_gap_words: int = Field(default=128, validation_alias="PLC_READ_MAX_GAP_WORDS")
+    # PLC memory image: cache word DM bersama dengan staleness terbatas
+    plc_memory_image_enabled: bool = Field(default=True, validation_alias="PLC_MEMORY_IMAGE_ENABLED")
+    plc_memory_image_max_age_ms: float = Field(default=500.0, validation_alias="PLC_MEMORY_IMAGE_MAX_AGE_MS")
+    plc_memory_image_regions: str = Field(
+        default="READ:D6000-D6976,WRITE:D7000-D7976,FAILURE:D8000-D8022,MANUAL:D9000-D9013",
+        validation_alias="PLC_MEMORY_IMAGE_REGIONS",
+    )
+    # Interval bulk-scan oleh scheduler (detik, 0 = hanya refresh saat miss)
+    plc_memory_image_scan_interval_sec: int = Field(default=0, validation_alias="PLC_MEMORY_IMAGE_SCAN_INTERVAL_SEC")
+    # PLC I/O broker: batas concurrency + token bucket + priority lane untuk semua FINS traffic
+    plc_broker_enabled: bool = Field(default=True, validation_alias="PLC_BROKER_ENABLED")
+    plc_broker_max_in_flight: int = Field(default=4, validation_alias="PLC_BROKER_MAX_IN_FLIGHT")
+    # Frame per detik (0 = tanpa batas) dan burst token bucket
+    plc_broker_rate_per_sec: float = Field(default=200.0, validation_alias="PLC_BROKER_RATE_PER_SEC")
+    plc_broker_burst: int = Field(default=50, validation_alias="PLC_BROKER_BURST")
+    plc_broker_max_wait_sec: float = Field(default=30.0, validation_alias="PLC_BROKER_MAX_WAIT_SEC")
+    # Maksimal request route HTTP (dashboard) yang boleh antri; sisanya ditolak (0 = tanpa batas)
+    plc_broker_dashboard_max_queue: int = Field(default=16, validation_alias="PLC_BROKER_DASHBOARD_MAX_QUEUE")
+    # Retry PLC: back-off eksponensial + jitter (dipakai semua service PLC)
+    plc_retry_attempts: int = Field(default=3, validation_alias="PLC_RETRY_ATTEMPTS")
+    plc_retry_base_delay_sec: float = Field(default=0.1, validation_alias="PLC_RETRY_BASE_DELAY_SEC")
+    plc_retry_max_delay_sec: float = Field(default=2.0, validation_alias="PLC_RETRY_MAX_DELAY_SEC")
+    plc_retry_jitter: float = Field(default=0.5, validation_alias="PLC_RETRY_JITTER")
+    # Time budget komunikasi PLC per cycle scheduler (detik, 0 = tanpa budget)
+    plc_cycle_budget_sec: float = Field(default=30.0, validation_alias="PLC_CYCLE_BUDGET_SEC")
+    # Circuit breaker: buka setelah N kegagalan transport berturut-turut, fail fast selama cool-down
+    plc_breaker_enabled: bool = Field(default=True, validation_alias="PLC_BREAKER_ENABLED")
+    plc_breaker_failure_threshold: int = Field(default=5, validation_alias="PLC_BREAKER_FAILURE_THRESHOLD")
+    plc_breaker_cooldown_sec: float = Field(default=15.0, validation_alias="PLC_BREAKER_COOLDOWN_SEC")
+    # DM word yang dibaca (1 word) sebagai probe setelah cool-down
+    plc_breaker_probe_address: int = Field(default=7076, validation_alias="PLC_BREAKER_PROBE_ADDRESS")
 
     plc_read_map: str = "{}"
     plc_write_map: str = "{}"
@@ -39,6 +76,14 @@ class Settings(BaseSettings):
     odoo_db: str = Field(..., validation_alias="ODOO_DB")
     odoo_username: str = Field(..., validation_alias="ODOO_USERNAME")
     odoo_password: str = Field(..., validation_alias="ODOO_PASSWORD")
+    # Shared Odoo HTTP client: timeout, connection pool, keep-alive
+    odoo_http_timeout_sec: float = Field(default=30.0, validation_alias="ODOO_HTTP_TIMEOUT_SEC")
+    odoo_http_connect_timeout_sec: float = Field(default=10.0, validation_alias="ODOO_HTTP_CONNECT_TIMEOUT_SEC")
+    odoo_http_max_connections: int = Field(default=10, validation_alias="ODOO_HTTP_MAX_CONNECTIONS")
+    odoo_http_max_keepalive: int = Field(default=5, validation_alias="ODOO_HTTP_MAX_KEEPALIVE")
+    odoo_http_keepalive_expiry_sec: float = Field(default=60.0, validation_alias="ODOO_HTTP_KEEPALIVE_EXPIRY_SEC")
+    # Login ulang proaktif setelah umur session ini (detik, 0 = hanya saat Odoo bilang expired)
+    odoo_session_max_age_sec: float = Field(default=0.0, validation_alias="ODOO_SESSION_MAX_AGE_SEC")
 
     # Scheduler Master Control
     enable_auto_sync: bool = Field(default=False, validation_alias="ENABLE_AUTO_SYNC")
@@ -55,13 +100,35 @@ class Settings(BaseSettings):
     sync_interval_minutes: int = Field(default=60, validation_alias="SYNC_INTERVAL_MINUTES")
     sync_batch_limit: int = Field(default=10, validation_alias="SYNC_BATCH_LIMIT")
     plc_read_interval_minutes: int = Field(default=5, validation_alias="PLC_READ_INTERVAL_MINUTES")
+    # Task 2 two-phase polling: baca word gating dulu, full read hanya untuk batch yang berubah
+    plc_read_gating_enabled: bool = Field(default=True, validation_alias="PLC_READ_GATING_ENABLED")
+    # Full read semua batch tiap N cycle (update consumption yang sedang berjalan), 0 = tidak pernah
+    plc_read_gating_full_every: int = Field(default=6, validation_alias="PLC_READ_GATING_FULL_EVERY")
+    # Task 2 adaptive cadence: interval detik berdasarkan aktivitas batch (menggantikan PLC_READ_INTERVAL_MINUTES)
+    plc_read_adaptive_enabled: bool = Field(default=False, validation_alias="PLC_READ_ADAPTIVE_ENABLED")
+    plc_read_adaptive_min_sec: int = Field(default=5, validation_alias="PLC_READ_ADAPTIVE_MIN_SEC")
+    plc_read_adaptive_queued_sec: int = Field(default=30, validation_alias="PLC_READ_ADAPTIVE_QUEUED_SEC")
+    plc_read_adaptive_max_sec: int = Field(default=300, validation_alias="PLC_READ_ADAPTIVE_MAX_SEC")
+    # Batch belum selesai yang di-update dari PLC dalam window ini dianggap sedang dosing
+    plc_read_active_window_sec: int = Field(default=120, validation_alias="PLC_READ_ACTIVE_WINDOW_SEC")
     process_completed_interval_minutes: int = Field(default=3, validation_alias="PROCESS_COMPLETED_INTERVAL_MINUTES")
+    # Task 3: jumlah MO yang dikirim ke Odoo bersamaan (1 = berurutan)
+    task3_concurrency: int = Field(default=4, validation_alias="TASK3_CONCURRENCY")
     health_monitor_interval_minutes: int = Field(default=10, validation_alias="HEALTH_MONITOR_INTERVAL_MINUTES")
     batch_stuck_threshold_minutes: int = Field(default=15, validation_alias="BATCH_STUCK_THRESHOLD_MINUTES")
     equipment_failure_interval_minutes: int = Field(default=5, validation_alias="EQUIPMENT_FAILURE_INTERVAL_MINUTES")
     log_cleanup_interval_minutes: int = Field(default=1440, validation_alias="LOG_CLEANUP_INTERVAL_MINUTES")
     log_retention_days: int = Field(default=30, validation_alias="LOG_RETENTION_DAYS")
     log_cleanup_keep_last: int = Field(default=1000, validation_alias="LOG_CLEANUP_KEEP_LAST")
+    # Task 6: jumlah partisi harian system_log yang dibuat di depan (hari ini + N hari)
+    log_partition_premake_days: int = Field(default=7, validation_alias="LOG_PARTITION_PREMAKE_DAYS")
+    # /api/logs search/module tanpa start_time hanya mencari N hari terakhir (0 = tanpa batas)
+    log_search_window_days: int = Field(default=30, validation_alias="LOG_SEARCH_WINDOW_DAYS")
+    # DatabaseLogHandler: buffer in-memory + bulk INSERT oleh thread writer
+    db_log_queue_size: int = Field(default=10000, validation_alias="DB_LOG_QUEUE_SIZE")
+    db_log_batch_size: int = Field(default=200, validation_alias="DB_LOG_BATCH_SIZE")
+    db_log_flush_interval_sec: float = Field(default=2.0, validation_alias="DB_LOG_FLUSH_INTERVAL_SEC")
+    db_log_overflow_policy: str = Field(default="drop_oldest", validation_alias="DB_LOG_OVERFLOW_POLICY")
 
     # Batch capacity sanity warning thresholds (kg)
     expected_batch_max_kg: float = Field(default=1000.0, validation_alias="EXPECTED_BATCH_MAX_KG")
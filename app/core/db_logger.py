@@ -1,41 +1,248 @@
+"""
+Database log handler (table system_log).
+
+emit() hanya memformat record dan memasukkannya ke queue in-memory; thread
+writer di belakang menulis ke DB secara bulk (multi-row INSERT) setiap
+`batch_size` record atau setiap `flush_interval_sec`, mana yang lebih dulu.
+Dengan begitu log INFO/WARNING dari scheduler tidak lagi memakan satu
+round trip + commit per baris di event loop.
+
+Queue dibatasi `queue_size`; saat penuh berlaku `overflow_policy`:
+- drop_oldest: buang record tertua di queue, record baru tetap masuk
+- drop_newest: buang record yang baru datang
+Semua drop dihitung di get_stats().
+
+flush() menunggu sampai isi queue saat ini tertulis; close() (dipanggil
+lifespan shutdown / logging.shutdown) melakukan flush terakhir lalu
+menghentikan thread writer.
+"""
 import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.log_context import current_run_id, current_task_id
 from app.db.session import SessionLocal
 from app.models.system_log import SystemLog
 
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+# Jangan simpan log dari modul yang dipakai writer sendiri (hindari loop)
+_SKIPPED_LOGGER_PREFIXES = ("sqlalchemy", "uvicorn.access", __name__)
+
 
 class DatabaseLogHandler(logging.Handler):
-    """Logging handler that persists log records to table system_log."""
+    """Logging handler that persists log records to table system_log in batches."""
 
-    def __init__(self, level: int = logging.NOTSET):
+    def __init__(
+        self,
+        level: int = logging.NOTSET,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_sec: float = 2.0,
+        overflow_policy: str = "drop_oldest",
+    ):
         super().__init__(level)
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow_policy '{overflow_policy}'. Use one of: {', '.join(OVERFLOW_POLICIES)}"
+            )
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_sec = max(0.05, float(flush_interval_sec))
+        self.overflow_policy = overflow_policy
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        # Serialisasi flush dari thread writer dan flush() eksplisit
+        self._flush_lock = threading.Lock()
+
+        # Counters untuk get_stats()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped_overflow = 0
+        self.dropped_on_error = 0
+        self.dropped_after_close = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
 
+    # ------------------------------------------------------------------
+    # Producer side (thread pemanggil logger)
+    # ------------------------------------------------------------------
     def emit(self, record: logging.LogRecord) -> None:
-        if record.name.startswith("sqlalchemy"):
+        if record.name.startswith(_SKIPPED_LOGGER_PREFIXES):
             return
-        if record.name.startswith("uvicorn.access"):
+        if self._stopping.is_set():
+            self.dropped_after_close += 1
             return
 
-        session: Session = SessionLocal()
         try:
             msg = self.format(record)
-            batch_no = getattr(record, "batch_no", None)
-            mo_id = getattr(record, "mo_id", None)
-
-            session.add(
-                SystemLog(
-                    level=str(record.levelname).upper(),
-                    module=str(record.name),
-                    message=msg,
-                    batch_no=str(batch_no) if batch_no is not None else None,
-                    mo_id=str(mo_id) if mo_id is not None else None,
-                )
+        except Exception:
+            self.handleError(record)
+            return
+
+        batch_no = getattr(record, "batch_no", None)
+        mo_id = getattr(record, "mo_id", None)
+        # extra={"task_id": ...} menang; default dari context task scheduler yang sedang jalan
+        task_id = getattr(record, "task_id", None) or current_task_id.get()
+        run_id = getattr(record, "run_id", None) or current_run_id.get()
+        row = {
+            # Waktu record, bukan waktu flush (CURRENT_TIMESTAMP sama untuk satu batch)
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc),
+            "level": str(record.levelname).upper(),
+            "module": str(record.name),
+            "message": msg,
+            "batch_no": str(batch_no) if batch_no is not None else None,
+            "mo_id": str(mo_id) if mo_id is not None else None,
+            "task_id": str(task_id) if task_id is not None else None,
+            "run_id": str(run_id) if run_id is not None else None,
+        }
+
+        self._ensure_writer()
+        self._put(row)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _put(self, row: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(row)
+            self.enqueued += 1
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == "drop_newest":
+            self.dropped_overflow += 1
+            return
+
+        # drop_oldest: buang satu record tertua lalu coba lagi
+        try:
+            self._queue.get_nowait()
+            self.dropped_overflow += 1
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(row)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped_overflow += 1
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._writer = threading.Thread(
+                target=self._run_writer,
+                name="db-log-writer",
+                daemon=True,
             )
+            self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+    def _run_writer(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval_sec)
+            self._wakeup.clear()
+            self._drain()
+        self._drain()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _drain(self) -> None:
+        with self._flush_lock:
+            while True:
+                rows = self._take_batch()
+                if not rows:
+                    return
+                self._write_rows(rows)
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        session: Session = SessionLocal()
+        try:
+            # executemany -> multi-row INSERT (insertmanyvalues) di psycopg2
+            session.execute(insert(SystemLog), rows)
             session.commit()
-        except Exception:
+            self.written += len(rows)
+            self.flushes += 1
+            self.last_flush_at = datetime.now(timezone.utc)
+        except Exception as exc:
             # Keep application logging robust; never crash due to DB log failure.
-            pass
+            session.rollback()
+            self.flush_failures += 1
+            self.dropped_on_error += len(rows)
+            self.last_error = str(exc)
+            # Tidak lewat logging: record-nya akan kembali ke handler ini
+            print(
+                f"DatabaseLogHandler: failed to write {len(rows)} log row(s): {exc}",
+                file=sys.stderr,
+            )
         finally:
             session.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def flush(self) -> None:
+        """Tulis semua record yang sudah ada di queue (blocking)."""
+        self._drain()
+
+    def close(self) -> None:
+        """Flush terakhir dan hentikan thread writer."""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            self._wakeup.set()
+            writer = self._writer
+            if writer is not None and writer.is_alive() and writer is not threading.current_thread():
+                writer.join(timeout=max(5.0, self.flush_interval_sec * 2))
+            self._drain()
+        super().close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_sec": self.flush_interval_sec,
+            "overflow_policy": self.overflow_policy,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped_overflow": self.dropped_overflow,
+            "dropped_on_error": self.dropped_on_error,
+            "dropped_after_close": self.dropped_after_close,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+            "writer_alive": bool(self._writer is not None and self._writer.is_alive()),
+            "closed": self._stopping.is_set(),
+        }
+
+
+def get_database_log_stats() -> List[Dict[str, Any]]:
+    """Stats semua DatabaseLogHandler yang terpasang di root logger."""
+    return [
+        handler.get_stats()
+        for handler in logging.getLogger().handlers
+        if isinstance(handler, DatabaseLogHandler)
+    ]
@@ -0,0 +1,57 @@
+"""
+Context log per task scheduler.
+
+Setiap eksekusi task scheduler dibungkus `task_run_context(task_id)` (atau
+decorator `tagged_task`). Selama task berjalan, semua log record yang lewat
+DatabaseLogHandler (termasuk dari service yang dipanggil task, coroutine
+asyncio.gather dan asyncio.to_thread, karena contextvars ikut disalin)
+disimpan dengan kolom system_log.task_id dan run_id.
+
+Admin task monitor memfilter berdasarkan kolom ter-index tersebut, bukan
+message ILIKE '%[TASK n]%'.
+"""
+import functools
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+current_task_id: ContextVar[Optional[str]] = ContextVar("current_task_id", default=None)
+current_run_id: ContextVar[Optional[str]] = ContextVar("current_run_id", default=None)
+
+T = TypeVar("T")
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def task_run_context(task_id: str, run_id: Optional[str] = None) -> Iterator[str]:
+    """Set task_id/run_id untuk log record di dalam blok ini; yield run_id."""
+    run_id = run_id or new_run_id()
+    task_token = current_task_id.set(task_id)
+    run_token = current_run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        current_run_id.reset(run_token)
+        current_task_id.reset(task_token)
+
+
+def tagged_task(task_id: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorator untuk coroutine task scheduler: tiap panggilan = satu run baru."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with task_run_context(task_id):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_log_context() -> Dict[str, Optional[str]]:
+    return {"task_id": current_task_id.get(), "run_id": current_run_id.get()}
@@ -13,10 +13,11 @@ from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, List, cast
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import create_engine, desc, text, select
+from sqlalchemy import create_engine, text, select
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.log_context import tagged_task
 from app.db.session import SessionLocal
 from app.services.mo_batch_service import sync_mo_list_to_db
 from app.services.odoo_auth_service import fetch_mo_list_detailed
@@ -24,15 +25,19 @@ from app.services.plc_sync_service import get_plc_sync_service
 from app.services.mo_history_service import get_mo_history_service
 from app.services.odoo_consumption_service import get_consumption_service
 from app.services.plc_equipment_failure_service import get_equipment_failure_service
+from app.services.plc_memory_image import get_plc_memory_image
+from app.services.plc_retry_policy import plc_deadline
+from app.services.system_log_partition_service import get_system_log_partition_service
 from app.services.equipment_failure_db_service import EquipmentFailureDbService
 from app.services.equipment_failure_service import EquipmentFailureService
-from app.models.system_log import SystemLog
 from app.models.tablesmo_batch import TableSmoBatch
 
 logger = logging.getLogger(__name__)
 
 scheduler: AsyncIOScheduler | None = None
 scheduler_runtime_override: bool = False
+# State cadence adaptif Task 2 (PLC_READ_ADAPTIVE_ENABLED)
+task2_cadence: dict[str, Any] = {"activity": None, "interval_sec": None, "idle_cycles": 0, "updated_at": None}
 
 
 async def get_equipment_failure_api_service(db: "Session") -> EquipmentFailureService:
@@ -40,6 +45,7 @@ async def get_equipment_failure_api_service(db: "Session") -> EquipmentFailureSe
     return EquipmentFailureService(db=db)
 
 
+@tagged_task("task1")
 async def auto_sync_mo_task():
     """
     Task 1: Sync MO dari Odoo ke PLC dan mo_batch.
@@ -126,9 +132,9 @@ async def auto_sync_mo_task():
             
             # 4. WRITE batch data ke PLC memory
             logger.debug("[TASK 1-DEBUG-9] Starting PLC write operation...")
-            from app.services.mo_batch_service import write_mo_batch_queue_to_plc
+            from app.services.mo_batch_service import write_mo_batch_queue_to_plc_async
             
-            written = write_mo_batch_queue_to_plc(db, start_slot=1, limit=synced)
+            written = await write_mo_batch_queue_to_plc_async(db, start_slot=1, limit=synced)
             logger.info(f"[TASK 1] ? PLC write completed: {written} batches written to PLC")
             logger.debug(f"[TASK 1-DEBUG-10] Batches written count: {written}")
             if written != synced:
@@ -153,6 +159,73 @@ async def auto_sync_mo_task():
         logger.error(f"[TASK 1-ERROR] Exception type: {type(exc).__name__}")
 
 
+def _classify_task2_activity(
+    queued_batches: list[TableSmoBatch],
+    sync_result: dict[str, Any] | None,
+) -> str:
+    """
+    active: PLC sedang dosing (cycle ini ada block berubah/update DB, atau ada
+            batch belum selesai yang di-update dari PLC dalam ACTIVE_WINDOW)
+    queued: ada batch status_manufacturing=0 tapi tidak ada aktivitas PLC
+    idle:   mo_batch tidak punya batch yang belum selesai
+    """
+    if not queued_batches:
+        return "idle"
+    if sync_result and sync_result.get("success"):
+        if any(
+            int(sync_result.get(key, 0) or 0) > 0
+            for key in ("updated_batches", "changed_batches")
+        ):
+            return "active"
+    window = timedelta(seconds=get_settings().plc_read_active_window_sec)
+    cutoff = datetime.now(timezone.utc) - window
+    for batch in queued_batches:
+        last_read = batch.last_read_from_plc
+        if last_read is not None and last_read.tzinfo is None:
+            last_read = last_read.replace(tzinfo=timezone.utc)
+        if last_read is not None and last_read >= cutoff:
+            return "active"
+    return "queued"
+
+
+def _next_task2_interval_sec(activity: str) -> int:
+    settings = get_settings()
+    floor = max(1, int(settings.plc_read_adaptive_min_sec))
+    ceiling = max(floor, int(settings.plc_read_adaptive_max_sec))
+    if activity == "active":
+        task2_cadence["idle_cycles"] = 0
+        return floor
+    queued = min(max(int(settings.plc_read_adaptive_queued_sec), floor), ceiling)
+    if activity == "queued":
+        task2_cadence["idle_cycles"] = 0
+        return queued
+    # Idle: back-off eksponensial dari interval queued sampai ceiling
+    task2_cadence["idle_cycles"] += 1
+    return min(queued * (2 ** task2_cadence["idle_cycles"]), ceiling)
+
+
+def _update_task2_cadence(
+    queued_batches: list[TableSmoBatch],
+    sync_result: dict[str, Any] | None,
+) -> None:
+    """Hitung interval Task 2 berikutnya dan reschedule job jika berubah."""
+    activity = _classify_task2_activity(queued_batches, sync_result)
+    interval_sec = _next_task2_interval_sec(activity)
+    previous = task2_cadence["interval_sec"]
+    task2_cadence.update(
+        activity=activity,
+        interval_sec=interval_sec,
+        updated_at=datetime.now(timezone.utc).isoformat(),
+    )
+    if interval_sec == previous or not (scheduler and scheduler.running):
+        return
+    if scheduler.get_job("plc_read_sync") is None:
+        return
+    scheduler.reschedule_job("plc_read_sync", trigger="interval", seconds=interval_sec)
+    logger.info("[TASK 2] Adaptive cadence: %s -> every %ss", activity, interval_sec)
+
+
+@tagged_task("task2")
 async def plc_read_sync_task():
     """
     Task 2: Read PLC memory and update mo_batch database.
@@ -164,7 +237,12 @@ async def plc_read_sync_task():
     
     Note: Only update database, consumption data will be synced to Odoo by Task 3
     when status_manufacturing = 1 (completed).
+
+    PLC_READ_ADAPTIVE_ENABLED: setelah tiap cycle interval berikutnya dipilih
+    dari aktivitas batch (active/queued/idle), lihat _update_task2_cadence.
     """
+    active_batches: list[TableSmoBatch] = []
+    sync_result: dict[str, Any] | None = None
     try:
         logger.info("\n" + "="*80)
         logger.info("[TASK 2] PLC read sync task running at: %s", datetime.now())
@@ -200,7 +278,10 @@ async def plc_read_sync_task():
         
         try:
             logger.debug("[TASK 2-DEBUG-5] Calling sync_from_plc()...")
-            result = await plc_service.sync_from_plc()
+            # Time budget per cycle: PLC mati tidak boleh menahan Task 2 sampai cycle berikutnya
+            with plc_deadline(get_settings().plc_cycle_budget_sec):
+                result = await plc_service.sync_from_plc()
+            sync_result = result
             
             logger.debug(f"[TASK 2-DEBUG-6] PLC sync result: {result}")
             
@@ -209,6 +290,9 @@ async def plc_read_sync_task():
                 processed_batches = int(result.get("processed_batches", 0) or 0)
                 updated_batches = int(result.get("updated_batches", 0) or 0)
                 guard_skipped_values = int(result.get("guard_skipped_values", 0) or 0)
+                unchanged_batches = int(result.get("unchanged_batches", 0) or 0)
+                changed_batches = int(result.get("changed_batches", 0) or 0)
+                new_batches = int(result.get("new_batches", 0) or 0)
                 failed_batches = result.get("failed_batches", []) or []
                 failed_count = len(failed_batches) if isinstance(failed_batches, list) else 0
 
@@ -220,6 +304,13 @@ async def plc_read_sync_task():
                     failed_count,
                 )
 
+                logger.info(
+                    "[TASK 2] READ blocks: unchanged=%s changed=%s new=%s",
+                    unchanged_batches,
+                    changed_batches,
+                    new_batches,
+                )
+
                 if guard_skipped_values > 0:
                     logger.warning(
                         "[TASK 2] Guard skipped %s implausible PLC value(s) this cycle.",
@@ -258,8 +349,167 @@ async def plc_read_sync_task():
     except Exception as exc:
         logger.exception("[TASK 2] ERROR in PLC read sync task: %s", str(exc))
         logger.error(f"[TASK 2-ERROR] Exception type: {type(exc).__name__}")
+    finally:
+        if get_settings().plc_read_adaptive_enabled:
+            try:
+                _update_task2_cadence(list(active_batches), sync_result)
+            except Exception as exc:
+                logger.warning("[TASK 2] Adaptive cadence update failed: %s", exc)
+
+
+def _build_task3_payload(batch: TableSmoBatch) -> dict[str, Any]:
+    """Susun payload update-with-consumptions dari row mo_batch (DB field -> Odoo field)."""
+    batch_data: dict[str, Any] = {
+        "status_manufacturing": 1,
+        "actual_weight_quantity_finished_goods": (
+            float(batch.actual_weight_quantity_finished_goods)  # type: ignore
+            if batch.actual_weight_quantity_finished_goods is not None  # type: ignore
+            else 0.0
+        ),
+    }
+    logger.debug(f"[TASK 3-DEBUG-7] Weight: {batch_data['actual_weight_quantity_finished_goods']}")
+
+    # Map actual consumption (DB field -> Odoo payload field)
+    silo_consumption_count = 0
+    for letter in "abcdefghijklm":
+        actual_field = f"actual_consumption_silo_{letter}"
+        consumption_field = f"consumption_silo_{letter}"
+
+        if hasattr(batch, actual_field):
+            value = getattr(batch, actual_field)
+            if value is not None and value > 0:
+                batch_data[consumption_field] = float(value)
+                silo_consumption_count += 1
+                logger.debug(f"[TASK 3-DEBUG-8] Silo {letter.upper()}: {value}")
+
+    liquid_consumption_count = 0
+    liquid_map = {
+        "actual_consumption_lq_tetes": "consumption_lq_tetes",
+        "actual_consumption_lq_fml": "consumption_lq_fml",
+    }
+    for actual_field, consumption_field in liquid_map.items():
+        if hasattr(batch, actual_field):
+            value = getattr(batch, actual_field)
+            if value is not None and value > 0:
+                batch_data[consumption_field] = float(value)
+                liquid_consumption_count += 1
+                logger.debug(f"[TASK 3-DEBUG-8L] {consumption_field}: {value}")
+
+    logger.debug(
+        f"[TASK 3-DEBUG-9] Total silos with consumption: {silo_consumption_count}, "
+        f"liquids with consumption: {liquid_consumption_count}"
+    )
+    logger.debug(f"[TASK 3-DEBUG-10] Complete batch payload: {batch_data}")
+    return batch_data
+
+
+async def _sync_completed_batch(batch_id: Any) -> bool:
+    """
+    Sync satu completed batch ke Odoo lalu archive (Task 3).
+
+    Memakai SessionLocal sendiri supaya commit/rollback archive_batch() tidak
+    bercampur dengan batch lain yang diproses paralel. Return True jika batch
+    sudah synced & archived; False jika tetap di queue untuk cycle berikutnya.
+    """
+    db = SessionLocal()
+    batch_no: Any = None
+    try:
+        batch = db.get(TableSmoBatch, batch_id)
+        if batch is None or batch.update_odoo or not batch.status_manufacturing:
+            # Sudah diproses (atau dihapus) oleh pihak lain sejak query awal
+            logger.info("[TASK 3] Skip batch id=%s: no longer pending Odoo sync", batch_id)
+            return False
+
+        mo_id = str(batch.mo_id)
+        batch_no = batch.batch_no
+
+        logger.info(f"[TASK 3] Processing batch #{batch_no} (MO: {mo_id})...")
+        logger.debug(f"[TASK 3-DEBUG-5] Batch details: batch_no={batch_no}, mo_id={mo_id}, status={batch.status_manufacturing}, update_odoo={batch.update_odoo}")
+
+        # Prepare batch data untuk Odoo
+        logger.debug(f"[TASK 3-DEBUG-6] Preparing batch payload for Odoo...")
+        batch_data = _build_task3_payload(batch)
+
+        # Send to Odoo
+        equipment_id = str(batch.equipment_id_batch or "PLC01")
+        logger.info(f"[TASK 3] ? Sending Odoo sync request for batch #{batch_no} (MO: {mo_id}, Equipment: {equipment_id})...")
+        logger.debug(f"[TASK 3-DEBUG-11] Calling consumption_service.process_batch_consumption()")
+        logger.debug(f"[TASK 3-DEBUG-12] Parameters: mo_id={mo_id}, equipment_id={equipment_id}")
+        logger.debug(
+            f"[TASK 3-DEBUG-12b] status_mfg={batch.status_manufacturing}, "
+            f"actual_weight={batch.actual_weight_quantity_finished_goods}"
+        )
+        logger.debug(
+            f"[TASK 3-DEBUG-12c] actual_consumption nonzero count="
+            f"{sum(1 for k in batch_data if k.startswith('consumption_silo_'))}"
+        )
 
+        consumption_service = get_consumption_service(db)
+        result = await consumption_service.process_batch_consumption(
+            mo_id=mo_id,
+            equipment_id=equipment_id,
+            batch_data=batch_data
+        )
 
+        logger.debug(f"[TASK 3-DEBUG-13] Odoo response: {result}")
+
+        # Treat partial success as failure to avoid false archive
+        consumption_details = (
+            result.get("consumption", {}) or {}
+        ).get("consumption_details", {}) or {}
+        partial_success = consumption_details.get("partial_success", False)
+        errors = consumption_details.get("errors") or []
+        if partial_success or errors:
+            logger.error(
+                f"[TASK 3] ? Odoo sync PARTIAL/ERROR for batch #{batch_no} "
+                f"(MO: {mo_id}). errors={errors}"
+            )
+            logger.debug(f"[TASK 3-DEBUG-13b] Odoo partial response: {consumption_details}")
+            return False
+
+        if not result.get("success"):
+            # Odoo sync failed - keep batch in queue, will retry next cycle
+            error_msg = result.get("error", "Unknown error")
+            logger.warning(
+                f"[TASK 3] ? Odoo sync FAILED for batch #{batch_no} (MO: {mo_id}): {error_msg}"
+            )
+            logger.debug(f"[TASK 3-DEBUG-ERROR-3] Odoo sync failure details: {result}")
+            logger.debug(
+                f"[TASK 3-DEBUG-ERROR-4] Batch will remain in queue with update_odoo=False for retry"
+            )
+            return False
+
+        logger.info(f"[TASK 3] ? Odoo sync SUCCESS for batch #{batch_no} (MO: {mo_id})")
+        logger.debug(f"[TASK 3-DEBUG-14] Odoo response message: {result.get('message', 'N/A')}")
+
+        # Archive + delete in one transaction, and mark update_odoo=True atomically
+        logger.debug(f"[TASK 3-DEBUG-15] Archiving batch #{batch_no} to mo_histories...")
+        history_service = get_mo_history_service(db)
+        if not history_service.archive_batch(batch, status="completed", mark_synced=True):
+            logger.error(f"[TASK 3] ? Failed to archive batch #{batch_no}")
+            logger.debug(f"[TASK 3-DEBUG-ERROR-1] archive_batch() returned False")
+            return False
+
+        logger.info(
+            f"[TASK 3] ??? COMPLETE: Batch #{batch_no} "
+            f"(MO: {mo_id}) synced & archived"
+        )
+        logger.debug(f"[TASK 3-DEBUG-16] Batch archived and removed from mo_batch")
+        return True
+
+    except Exception as e:
+        logger.error(
+            f"[TASK 3] ? Exception processing batch #{batch_no} (id={batch_id}): {str(e)}",
+            exc_info=True
+        )
+        logger.error(f"[TASK 3-ERROR] Exception type: {type(e).__name__}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+@tagged_task("task3")
 async def process_completed_batches_task():
     """
     Task 3: Process completed batches for Odoo sync and archival.
@@ -279,6 +529,11 @@ async def process_completed_batches_task():
        - Will retry in next Task 3 cycle
     
     Safety: Batch only deleted from mo_batch if Odoo sync succeeds (prevents duplicate syncs)
+
+    Concurrency: hingga TASK3_CONCURRENCY batch dikirim ke Odoo bersamaan
+    (asyncio.gather + Semaphore). Tiap batch punya session DB sendiri, jadi
+    archive/delete tetap atomik per batch dan error satu MO tidak memengaruhi
+    MO lain. TASK3_CONCURRENCY=1 = berurutan.
     """
     try:
         logger.info("\n" + "="*80)
@@ -379,160 +634,48 @@ async def process_completed_batches_task():
             for idx, batch in enumerate(completed_batches, 1):
                 logger.debug(f"[TASK 3-DEBUG-4.{idx}] Batch: mo_id={batch.mo_id}, batch_no={batch.batch_no}, status={batch.status_manufacturing}, update_odoo={batch.update_odoo}")
             
-            consumption_service = get_consumption_service(db)
-            history_service = get_mo_history_service(db)
-            processed_count = 0
-            failed_count = 0
-            
-            for batch in completed_batches:
-                try:
-                    mo_id = str(batch.mo_id)
-                    batch_no = batch.batch_no
-                    
-                    logger.info(f"[TASK 3] Processing batch #{batch_no} (MO: {mo_id})...")
-                    logger.debug(f"[TASK 3-DEBUG-5] Batch details: batch_no={batch_no}, mo_id={mo_id}, status={batch.status_manufacturing}, update_odoo={batch.update_odoo}")
-                    
-                    # Prepare batch data untuk Odoo
-                    logger.debug(f"[TASK 3-DEBUG-6] Preparing batch payload for Odoo...")
-                    
-                    batch_data = {
-                        "status_manufacturing": 1,
-                        "actual_weight_quantity_finished_goods": (
-                            float(batch.actual_weight_quantity_finished_goods)  # type: ignore
-                            if batch.actual_weight_quantity_finished_goods is not None  # type: ignore
-                            else 0.0
-                        ),
-                    }
-                    
-                    logger.debug(f"[TASK 3-DEBUG-7] Weight: {batch_data['actual_weight_quantity_finished_goods']}")
-                    
-                    # Map actual consumption (DB field -> Odoo payload field)
-                    silo_consumption_count = 0
-                    for letter in "abcdefghijklm":
-                        actual_field = f"actual_consumption_silo_{letter}"
-                        consumption_field = f"consumption_silo_{letter}"
-                        
-                        if hasattr(batch, actual_field):
-                            value = getattr(batch, actual_field)
-                            if value is not None and value > 0:
-                                batch_data[consumption_field] = float(value)
-                                silo_consumption_count += 1
-                                logger.debug(f"[TASK 3-DEBUG-8] Silo {letter.upper()}: {value}")
-
-                    liquid_consumption_count = 0
-                    liquid_map = {
-                        "actual_consumption_lq_tetes": "consumption_lq_tetes",
-                        "actual_consumption_lq_fml": "consumption_lq_fml",
-                    }
-                    for actual_field, consumption_field in liquid_map.items():
-                        if hasattr(batch, actual_field):
-                            value = getattr(batch, actual_field)
-                            if value is not None and value > 0:
-                                batch_data[consumption_field] = float(value)
-                                liquid_consumption_count += 1
-                                logger.debug(
-                                    f"[TASK 3-DEBUG-8L] {consumption_field}: {value}"
-                                )
-                    
-                    logger.debug(
-                        f"[TASK 3-DEBUG-9] Total silos with consumption: {silo_consumption_count}, "
-                        f"liquids with consumption: {liquid_consumption_count}"
-                    )
-                    logger.debug(f"[TASK 3-DEBUG-10] Complete batch payload: {batch_data}")
-                    
-                    # Send to Odoo
-                    equipment_id = str(batch.equipment_id_batch or "PLC01")
-                    logger.info(f"[TASK 3] ? Sending Odoo sync request for batch #{batch_no} (MO: {mo_id}, Equipment: {equipment_id})...")
-                    logger.debug(f"[TASK 3-DEBUG-11] Calling consumption_service.process_batch_consumption()")
-                    logger.debug(f"[TASK 3-DEBUG-12] Parameters: mo_id={mo_id}, equipment_id={equipment_id}")
-                    logger.debug(
-                        f"[TASK 3-DEBUG-12b] status_mfg={batch.status_manufacturing}, "
-                        f"actual_weight={batch.actual_weight_quantity_finished_goods}"
-                    )
-                    logger.debug(
-                        f"[TASK 3-DEBUG-12c] actual_consumption nonzero count="
-                        f"{sum(1 for k in batch_data if k.startswith('consumption_silo_'))}"
-                    )
-                    
-                    result = await consumption_service.process_batch_consumption(
-                        mo_id=mo_id,
-                        equipment_id=equipment_id,
-                        batch_data=batch_data
-                    )
-                    
-                    logger.debug(f"[TASK 3-DEBUG-13] Odoo response: {result}")
-                    
-                    # Treat partial success as failure to avoid false archive
-                    consumption_details = (
-                        result.get("consumption", {}) or {}
-                    ).get("consumption_details", {}) or {}
-                    partial_success = consumption_details.get("partial_success", False)
-                    errors = consumption_details.get("errors") or []
-                    if partial_success or errors:
-                        logger.error(
-                            f"[TASK 3] ? Odoo sync PARTIAL/ERROR for batch #{batch_no} "
-                            f"(MO: {mo_id}). errors={errors}"
-                        )
-                        logger.debug(
-                            f"[TASK 3-DEBUG-13b] Odoo partial response: {consumption_details}"
-                        )
-                        failed_count += 1
-                        continue
-
-                    if result.get("success"):
-                        logger.info(f"[TASK 3] ? Odoo sync SUCCESS for batch #{batch_no} (MO: {mo_id})")
-                        logger.debug(f"[TASK 3-DEBUG-14] Odoo response message: {result.get('message', 'N/A')}")
-                        
-                        # Archive + delete in one transaction, and mark update_odoo=True atomically
-                        logger.debug(f"[TASK 3-DEBUG-15] Archiving batch #{batch_no} to mo_histories...")
-                        if history_service.archive_batch(batch, status="completed", mark_synced=True):
-                            processed_count += 1
-                            logger.info(
-                                f"[TASK 3] ??? COMPLETE: Batch #{batch_no} "
-                                f"(MO: {mo_id}) synced & archived"
-                            )
-                            logger.debug(f"[TASK 3-DEBUG-16] Batch archived and removed from mo_batch")
-                        else:
-                            logger.error(f"[TASK 3] ? Failed to archive batch #{batch_no}")
-                            logger.debug(f"[TASK 3-DEBUG-ERROR-1] archive_batch() returned False")
-                            failed_count += 1
-                    
-                    else:
-                        # Odoo sync failed - keep batch in queue, will retry next cycle
-                        error_msg = result.get("error", "Unknown error")
-                        logger.warning(
-                            f"[TASK 3] ? Odoo sync FAILED for batch #{batch_no} (MO: {mo_id}): {error_msg}"
-                        )
-                        logger.debug(f"[TASK 3-DEBUG-ERROR-3] Odoo sync failure details: {result}")
-                        logger.debug(
-                            f"[TASK 3-DEBUG-ERROR-4] Batch will remain in queue with update_odoo=False for retry"
-                        )
-                        failed_count += 1
-                
-                except Exception as e:
-                    logger.error(
-                        f"[TASK 3] ? Exception processing batch #{batch.batch_no}: {str(e)}",
-                        exc_info=True
-                    )
-                    logger.error(f"[TASK 3-ERROR] Exception type: {type(e).__name__}")
-                    logger.debug(f"[TASK 3-DEBUG-ERROR-5] Full traceback above")
-                    failed_count += 1
-                    continue
-            
-            # Summary log
-            total = len(completed_batches)
-            logger.info(
-                f"[TASK 3] Cycle complete: ? {processed_count} archived, ? {failed_count} failed, "
-                f"total {total} batches"
-            )
-            
+            batch_ids = [batch.id for batch in completed_batches]
         finally:
             db.close()
-            
+
+        # Tiap batch memakai session DB sendiri sehingga archive/delete tetap atomik per batch
+        # dan kegagalan satu MO tidak me-rollback MO lain. Lebar 1 = berurutan seperti dulu.
+        width = max(1, get_settings().task3_concurrency)
+        semaphore = asyncio.Semaphore(width)
+
+        async def _bounded(batch_id: Any) -> bool:
+            async with semaphore:
+                return await _sync_completed_batch(batch_id)
+
+        results = await asyncio.gather(
+            *(_bounded(batch_id) for batch_id in batch_ids),
+            return_exceptions=True,
+        )
+        processed_count = 0
+        failed_count = 0
+        for batch_id, outcome in zip(batch_ids, results):
+            if isinstance(outcome, BaseException):
+                logger.error(
+                    "[TASK 3] Unhandled exception for batch id=%s: %s", batch_id, outcome,
+                    exc_info=outcome,
+                )
+                failed_count += 1
+            elif outcome:
+                processed_count += 1
+            else:
+                failed_count += 1
+
+        # Summary log
+        logger.info(
+            f"[TASK 3] Cycle complete: ? {processed_count} archived, ? {failed_count} failed, "
+            f"total {len(batch_ids)} batches (concurrency={width})"
+        )
+
     except Exception as exc:
         logger.exception("[TASK 3] Error in process completed batches task: %s", str(exc))
 
 
+@tagged_task("task4")
 async def monitor_batch_health_task():
     """
     Task 4: Monitor batch health dan detect anomalies.
@@ -626,6 +769,7 @@ async def monitor_batch_health_task():
         logger.exception("[TASK 4] Error in batch health monitoring task: %s", str(exc))
 
 
+@tagged_task("task5")
 async def equipment_failure_monitoring_task():
     """
     Task 5: Monitor dan read equipment failure data dari PLC secara periodik.
@@ -657,7 +801,8 @@ async def equipment_failure_monitoring_task():
             # STEP 1: READ FROM PLC
             logger.info("[TASK 5] Step 1: Reading equipment failure from PLC...")
             failure_service = get_equipment_failure_service()
-            failure_data = await failure_service.read_equipment_failure_data()
+            with plc_deadline(get_settings().plc_cycle_budget_sec):
+                failure_data = await failure_service.read_equipment_failure_data()
             
             if failure_data:
                 equipment_code = failure_data.get("equipment_code")
@@ -773,6 +918,7 @@ async def equipment_failure_monitoring_task():
         logger.exception("[TASK 5] Error in equipment failure monitoring task: %s", str(exc))
 
 
+@tagged_task("task6")
 async def system_log_cleanup_task():
     """
     Task 6: Cleanup old logs from system_log table.
@@ -780,6 +926,11 @@ async def system_log_cleanup_task():
     Rules:
     - Delete logs older than LOG_RETENTION_DAYS
     - Keep latest LOG_CLEANUP_KEEP_LAST rows as safety
+
+    Jika system_log sudah dipartisi per hari: buat partisi hari ini +
+    LOG_PARTITION_PREMAKE_DAYS ke depan, lalu DROP partisi harian yang
+    seluruhnya lebih lama dari cutoff (granularitas 1 hari). Tanpa partisi:
+    DELETE per row seperti sebelumnya.
     """
     settings = get_settings()
     retention_days = settings.log_retention_days
@@ -796,17 +947,23 @@ async def system_log_cleanup_task():
 
     db = SessionLocal()
     try:
-        query = db.query(SystemLog).filter(SystemLog.timestamp < cutoff)
-        if keep_last > 0:
-            keep_subquery = (
-                select(SystemLog.id)
-                .order_by(desc(SystemLog.timestamp))
-                .limit(keep_last)
+        partition_service = get_system_log_partition_service(db)
+        if partition_service.is_partitioned():
+            created = partition_service.ensure_partitions(settings.log_partition_premake_days)
+            result = partition_service.drop_expired(cutoff, keep_last=keep_last)
+            logger.info(
+                "[TASK 6] Log partition maintenance completed. created=%s dropped=%s "
+                "approx_deleted=%s default_deleted=%s cutoff=%s keep_last=%s",
+                created,
+                result["dropped_partitions"],
+                result["approx_deleted_count"],
+                result["default_deleted"],
+                result["cutoff"].isoformat(),
+                keep_last,
             )
-            query = query.filter(~SystemLog.id.in_(keep_subquery))
+            return
 
-        deleted = query.delete(synchronize_session=False)
-        db.commit()
+        deleted = partition_service.delete_legacy(cutoff, keep_last)
         logger.info(
             "[TASK 6] Log cleanup completed. deleted=%s cutoff=%s keep_last=%s",
             deleted,
@@ -820,6 +977,15 @@ async def system_log_cleanup_task():
         db.close()
 
 
+async def plc_memory_image_scan_task():
+    """Bulk-scan semua region PLC memory image supaya reader lain kena cache hit."""
+    try:
+        with plc_deadline(get_settings().plc_cycle_budget_sec):
+            await get_plc_memory_image().scan_async()
+    except Exception as exc:
+        logger.warning("PLC memory image scan failed: %s", exc)
+
+
 def _create_scheduler_instance() -> AsyncIOScheduler:
     return AsyncIOScheduler(
         job_defaults={
@@ -887,11 +1053,32 @@ def _add_scheduler_jobs(current_scheduler: AsyncIOScheduler) -> int:
     settings = get_settings()
     task_count = 0
 
+    task2_cadence.update(activity=None, interval_sec=None, idle_cycles=0, updated_at=None)
+
     for task in _get_scheduler_task_configs():
         enabled = bool(getattr(settings, task["enabled_attr"]))
         interval_minutes = int(getattr(settings, task["interval_attr"]))
 
-        if enabled:
+        if enabled and task["id"] == "plc_read_sync" and settings.plc_read_adaptive_enabled:
+            # Cycle pertama pada floor; interval berikutnya diatur _update_task2_cadence
+            interval_sec = max(1, int(settings.plc_read_adaptive_min_sec))
+            current_scheduler.add_job(
+                task["func"],
+                trigger="interval",
+                seconds=interval_sec,
+                id=task["id"],
+                replace_existing=True,
+            )
+            task2_cadence["interval_sec"] = interval_sec
+            logger.info(
+                "? %s: %s added (adaptive interval: %s-%s seconds)",
+                task["label"],
+                task["description"],
+                interval_sec,
+                settings.plc_read_adaptive_max_sec,
+            )
+            task_count += 1
+        elif enabled:
             current_scheduler.add_job(
                 task["func"],
                 trigger="interval",
@@ -914,6 +1101,18 @@ def _add_scheduler_jobs(current_scheduler: AsyncIOScheduler) -> int:
                 task["enabled_attr"].upper(),
             )
 
+    scan_interval_sec = int(settings.plc_memory_image_scan_interval_sec)
+    if settings.plc_memory_image_enabled and scan_interval_sec > 0:
+        current_scheduler.add_job(
+            plc_memory_image_scan_task,
+            trigger="interval",
+            seconds=scan_interval_sec,
+            id="plc_memory_image_scan",
+            replace_existing=True,
+        )
+        logger.info("? PLC memory image scan added (interval: %s seconds)", scan_interval_sec)
+        task_count += 1
+
     return task_count
 
 
@@ -938,6 +1137,11 @@ def get_scheduler_status() -> dict[str, Any]:
                 "configured_enabled": bool(getattr(settings, task["enabled_attr"])),
                 "is_scheduled": job is not None,
                 "interval_minutes": interval_minutes,
+                "effective_interval_sec": (
+                    job.trigger.interval.total_seconds()
+                    if job is not None and hasattr(job.trigger, "interval")
+                    else None
+                ),
                 "next_run_at": (
                     job.next_run_time.isoformat()
                     if job is not None and job.next_run_time is not None
@@ -952,6 +1156,13 @@ def get_scheduler_status() -> dict[str, Any]:
         "enabled_from_env": settings.enable_auto_sync,
         "job_count": len(jobs_by_id),
         "tasks": tasks,
+        "task2_adaptive": {
+            "enabled": settings.plc_read_adaptive_enabled,
+            "min_sec": settings.plc_read_adaptive_min_sec,
+            "queued_sec": settings.plc_read_adaptive_queued_sec,
+            "max_sec": settings.plc_read_adaptive_max_sec,
+            **task2_cadence,
+        },
     }
 
 
@@ -0,0 +1,131 @@
+"""
+Keyset pagination dan estimasi jumlah row.
+
+OFFSET n LIMIT m + COUNT(*) makin lambat untuk halaman dalam dan table
+besar (system_log, mo_histories). Helper di sini:
+
+- keyset_page(): ORDER BY (sort_col DESC, id DESC) dan lanjut dari cursor
+  opaque `next_cursor` (base64 JSON [sort_value, id]) dengan WHERE
+  (sort_col, id) < (cursor), jadi setiap halaman = satu index range scan.
+- count_rows(): "exact" (COUNT(*)), "approx" (estimasi planner dari
+  EXPLAIN, waktu konstan; hanya Postgres, selain itu fallback ke exact)
+  atau "none".
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+COUNT_MODES = ("exact", "approx", "none")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = [str(value) if isinstance(value, uuid.UUID) else value for value in payload]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Raise ValueError jika cursor tidak valid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+
+def _coerce_sort_value(raw: Any) -> Optional[datetime]:
+    if raw is None:
+        return None
+    return datetime.fromisoformat(raw)
+
+
+def _coerce_id(column: Any, raw: Any) -> Any:
+    if getattr(column.type, "as_uuid", False):
+        return uuid.UUID(str(raw))
+    return raw
+
+
+def keyset_page(
+    db: Session,
+    stmt: Select,
+    sort_col: Any,
+    id_col: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    nullable: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Satu halaman `stmt` terurut (sort_col DESC [NULLS LAST], id_col DESC).
+
+    `nullable=True` untuk sort_col yang boleh NULL: row NULL ada di akhir
+    urutan. Return (rows, next_cursor); next_cursor None di halaman terakhir.
+    Raise ValueError jika cursor tidak valid.
+    """
+    if cursor:
+        raw_sort, raw_id = decode_cursor(cursor)
+        try:
+            sort_value = _coerce_sort_value(raw_sort)
+            id_value = _coerce_id(id_col, raw_id)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+        if sort_value is None:
+            stmt = stmt.where(sort_col.is_(None), id_col < id_value)
+        else:
+            # Row-value comparison -> satu index range (sort_col, id) pada Postgres
+            after = tuple_(sort_col, id_col) < tuple_(sort_value, id_value, types=[sort_col.type, id_col.type])
+            if nullable:
+                # sort_col <= sort_value redundant, tapi memberi planner batas
+                # index eksplisit; row NULL (di akhir urutan) tetap ikut
+                after = or_(and_(sort_col <= sort_value, after), sort_col.is_(None))
+            stmt = stmt.where(after)
+
+    sort_order = sort_col.desc().nullslast() if nullable else sort_col.desc()
+    stmt = stmt.order_by(sort_order, id_col.desc()).limit(limit + 1)
+    rows = list(db.execute(stmt).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, sort_col.key), getattr(last, id_col.key)])
+    return rows, next_cursor
+
+
+def estimate_count(db: Session, stmt: Select) -> Optional[int]:
+    """Estimasi jumlah row `stmt` dari planner (EXPLAIN). None jika bukan Postgres."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = stmt.compile(dialect=bind.dialect)
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}",
+        compiled.params,
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(db: Session, stmt: Select, mode: str = "exact") -> Tuple[Optional[int], bool]:
+    """
+    Jumlah row `stmt` (tanpa ORDER BY/LIMIT) sesuai mode.
+    Return (total, is_estimate); total None untuk mode "none".
+    """
+    if mode == "none":
+        return None, False
+    if mode == "approx":
+        estimate = estimate_count(db, stmt)
+        if estimate is not None:
+            return estimate, True
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return int(db.execute(count_stmt).scalar_one()), False
@@ -10,6 +10,9 @@ from app.core.config import get_settings
 from app.core.scheduler import start_scheduler, stop_scheduler
 from app.core.db_logger import DatabaseLogHandler
 from app.middleware.plc_middleware import PLCMiddleware
+from app.services.fins_async_client import close_async_fins_clients
+from app.services.fins_session import close_fins_session
+from app.services.odoo_client import close_odoo_clients
 
 logging.basicConfig(
     level=logging.INFO,  # Set level ke INFO atau DEBUG
@@ -26,8 +29,13 @@ logging.getLogger("apscheduler.executors.default").setLevel(logging.WARNING)
 settings = get_settings()
 
 # --- ADD DATABASE LOGGER ---
-# Ini akan menangkap log INFO ke atas dan simpan ke DB
-db_handler = DatabaseLogHandler()
+# Ini akan menangkap log INFO ke atas dan simpan ke DB (bulk, via thread writer)
+db_handler = DatabaseLogHandler(
+    queue_size=settings.db_log_queue_size,
+    batch_size=settings.db_log_batch_size,
+    flush_interval_sec=settings.db_log_flush_interval_sec,
+    overflow_policy=settings.db_log_overflow_policy,
+)
 db_handler.setLevel(logging.INFO)  # Set ke DEBUG jika ingin semua detail
 formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
 db_handler.setFormatter(formatter)
@@ -43,6 +51,13 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown: stop scheduler
     stop_scheduler()
+    # Shutdown: tutup socket FINS bersama
+    close_fins_session()
+    close_async_fins_clients()
+    # Shutdown: tutup connection pool Odoo
+    await close_odoo_clients()
+    # Shutdown: tulis sisa log yang masih di buffer
+    db_handler.flush()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
@@ -5,6 +5,12 @@ from app.db.base import Base
 
 
 class SystemLog(Base):
+    """
+    Application log. Di Postgres table ini di-partisi RANGE per hari pada
+    `timestamp` (lihat system_log_partition_service), sehingga primary key
+    mencakup kolom partisi: (id, timestamp).
+    """
+
     __tablename__ = "system_log"
 
     id = Column(
@@ -16,15 +22,34 @@ class SystemLog(Base):
         DateTime(timezone=True),
         nullable=False,
         server_default=text("CURRENT_TIMESTAMP"),
-        index=True,
+        primary_key=True,
     )
     level = Column(String(16), nullable=False, index=True)
     module = Column(String(255), nullable=False, index=True)
     message = Column(Text, nullable=False)
     batch_no = Column(String(64), nullable=True)
     mo_id = Column(String(64), nullable=True, index=True)
+    # Diisi dari app.core.log_context saat log berasal dari task scheduler
+    task_id = Column(String(32), nullable=True)
+    run_id = Column(String(32), nullable=True, index=True)
 
     __table_args__ = (
+        # Keyset pagination (timestamp DESC, id DESC)
+        Index("ix_system_log_timestamp_id", "timestamp", "id"),
         Index("ix_system_log_level_timestamp", "level", "timestamp"),
         Index("ix_system_log_module_timestamp", "module", "timestamp"),
+        Index("ix_system_log_task_id_timestamp", "task_id", "timestamp"),
+        # pg_trgm: ILIKE '%...%' dan word_similarity() untuk /api/logs search
+        Index(
+            "ix_system_log_message_trgm",
+            "message",
+            postgresql_using="gin",
+            postgresql_ops={"message": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_system_log_module_trgm",
+            "module",
+            postgresql_using="gin",
+            postgresql_ops={"module": "gin_trgm_ops"},
+        ),
     )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, Numeric, String, Text, text
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, Numeric, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
@@ -99,3 +99,12 @@ class TableSmoHistory(Base):
     # Values: 'completed', 'failed', 'cancelled'
     status = Column(String(20), nullable=False, server_default="completed", index=True)
     notes = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination (last_read_from_plc DESC NULLS LAST, id DESC)
+        Index(
+            "ix_mo_histories_last_read_id",
+            last_read_from_plc.desc().nullslast(),
+            id.desc(),
+        ),
+    )
@@ -13,16 +13,24 @@ class SystemLogResponse(BaseModel):
     message: str
     batch_no: Optional[str] = None
     mo_id: Optional[str] = None
+    task_id: Optional[str] = None
+    run_id: Optional[str] = None
+    # word_similarity(search, message), hanya untuk sort=relevance
+    score: Optional[float] = None
 
     class Config:
         from_attributes = True
 
 
 class SystemLogListMeta(BaseModel):
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     skip: int
     limit: int
     has_next: bool
+    next_cursor: Optional[str] = None
+    # Batas bawah waktu otomatis saat search tanpa start_time (LOG_SEARCH_WINDOW_DAYS)
+    search_from: Optional[datetime] = None
 
 
 class SystemLogListResponse(BaseModel):
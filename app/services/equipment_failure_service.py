@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.services.equipment_failure_db_service import EquipmentFailureDbService
+from app.services.odoo_client import OdooClient, get_odoo_client
 
 logger = logging.getLogger(__name__)
 
@@ -23,65 +24,20 @@ class EquipmentFailureService:
         self.settings = get_settings()
         self.db = db
     
-    async def _authenticate(self) -> Optional[httpx.AsyncClient]:
+    async def _authenticate(self) -> Optional[OdooClient]:
         """
-        Authenticate dengan Odoo dan return client dengan session cookie.
+        Ambil shared Odoo client yang sudah login (session di-cache, login
+        ulang otomatis saat expired).
         
         Returns:
-            AsyncClient dengan session authenticated, atau None jika gagal
+            OdooClient authenticated, atau None jika gagal
         """
         try:
-            base_url = self.settings.odoo_base_url.rstrip("/")
-            auth_url = f"{base_url}/api/scada/authenticate"
-            
-            auth_payload = {
-                "db": self.settings.odoo_db,
-                "login": self.settings.odoo_username,
-                "password": self.settings.odoo_password,
-            }
-            
-            logger.info(f"[Odoo Auth] Attempting authentication at: {auth_url}")
-            logger.debug(f"[Odoo Auth] Payload - db: {auth_payload.get('db')}, login: {auth_payload.get('login')}")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(auth_url, json=auth_payload)
-                
-                logger.debug(f"[Odoo Auth] Response status: {response.status_code}")
-                
-                response.raise_for_status()
-                
-                auth_data = response.json()
-                logger.debug(f"[Odoo Auth] Response data: {auth_data}")
-                
-                # Handle both direct status dan nested result.status
-                status = auth_data.get("status")
-                if not status:
-                    result = auth_data.get("result", {})
-                    status = result.get("status")
-                
-                if status != "success":
-                    logger.error(f"[Odoo Auth] ✗ Authentication failed: {auth_data}")
-                    return None
-                
-                # Create new client dengan cookies
-                cookies = response.cookies
-                new_client = httpx.AsyncClient(timeout=30.0)
-                new_client.cookies.update(cookies)
-                logger.info(f"[Odoo Auth] ✓ Successfully authenticated with Odoo (cookies set)")
-                logger.debug(f"[Odoo Auth] Cookies: {dict(new_client.cookies)}")
-                return new_client
-        
-        except httpx.HTTPError as e:
-            logger.error(f"[Odoo Auth] ✗ HTTP error during authentication: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"[Odoo Auth] Response status: {e.response.status_code}")
-                try:
-                    logger.error(f"[Odoo Auth] Response body: {e.response.text}")
-                except Exception:
-                    pass
-            return None
+            client = await get_odoo_client()
+            await client.authenticate()
+            return client
         except Exception as e:
-            logger.error(f"[Odoo Auth] ✗ Authentication error: {e}", exc_info=True)
+            logger.error(f"[Odoo Auth] ✗ Authentication error: {e}")
             return None
     
     async def create_failure_report(
@@ -114,11 +70,10 @@ class EquipmentFailureService:
                 }
             }
         """
-        client = None
         try:
             logger.info(f"[Odoo API] Starting create_failure_report: equipment={equipment_code}, description={description}")
             
-            # Authenticate dengan Odoo
+            # Shared Odoo client (login hanya jika session belum ada / expired)
             logger.info(f"[Odoo API] Step 1: Authenticating with Odoo...")
             client = await self._authenticate()
             if not client:
@@ -223,10 +178,6 @@ class EquipmentFailureService:
                 "status": "error",
                 "message": error_msg
             }
-        finally:
-            if client:
-                await client.aclose()
-                logger.debug(f"[Odoo API] Client closed")
 
     def _format_failure_report_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -360,9 +311,6 @@ class EquipmentFailureService:
                 "status": "error",
                 "message": f"Error fetching failure reports: {str(e)}"
             }
-        finally:
-            if client:
-                await client.aclose()
 
 
 def get_equipment_failure_service(db: Optional[Session] = None) -> EquipmentFailureService:
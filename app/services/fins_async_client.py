@@ -0,0 +1,492 @@
+"""
+Async FINS Client
+
+FINS/UDP client berbasis asyncio DatagramProtocol untuk dipakai dari
+coroutine (scheduler task dan route FastAPI) tanpa memblokir event loop.
+
+- Response dicocokkan ke request berdasarkan SID (sama seperti FinsSession).
+- Beberapa request boleh in-flight sekaligus, dibatasi PLC_PIPELINE_WINDOW.
+- Retry lewat RetryPolicy bersama (asyncio.sleep, back-off eksponensial +
+  jitter, sadar cycle budget); setiap exchange lewat circuit breaker PLC.
+
+Transport mengikuti PLC_PROTOCOL: UDP (AsyncFinsClient) atau TCP
+(AsyncFinsTcpClient, asyncio streams dengan node-address handshake).
+Satu client dibuat per event loop (lazy) lewat get_async_fins_client().
+"""
+import asyncio
+import logging
+import socket
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.services.fins_frames import (
+    FINS_TCP_CMD_FRAME,
+    FINS_TCP_ERRORS,
+    FINS_TCP_HEADER_SIZE,
+    MAX_MULTI_READ_ITEMS,
+    MemoryReadRequest,
+    build_fins_tcp_node_request,
+    build_memory_read_frame,
+    build_memory_write_frame,
+    build_multiple_memory_read_frame,
+    parse_memory_read_response,
+    parse_multiple_memory_read_response,
+    parse_fins_tcp_header,
+    parse_fins_tcp_node_response,
+    parse_memory_write_response,
+    parse_response_sid,
+    with_nodes,
+    with_sid,
+    wrap_fins_tcp_frame,
+)
+from app.services.fins_session import notify_write
+from app.services.plc_io_broker import PLCLane, get_plc_io_broker
+from app.services.plc_retry_policy import (
+    CircuitBreaker,
+    PLCUnavailableError,
+    RetryPolicy,
+    clip_timeout,
+    get_plc_circuit_breaker,
+    get_plc_retry_policy,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _FinsDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner: "AsyncFinsClient") -> None:
+        self._owner = owner
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._owner._on_datagram(data)
+
+    def error_received(self, exc: Exception) -> None:
+        self._owner._on_error(exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._owner._on_connection_lost(exc)
+
+
+class AsyncFinsClient:
+    """Awaitable FINS read/write/multi-read dengan SID matching dan async back-off."""
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        timeout_sec: float,
+        client_node: int,
+        plc_node: int,
+        pipeline_window: int = 4,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        self.ip = ip
+        self.port = port
+        self.timeout_sec = timeout_sec
+        self.client_node = client_node
+        self.plc_node = plc_node
+        self.pipeline_window = max(1, min(int(pipeline_window), 64))
+        self.retry_policy = retry_policy or get_plc_retry_policy()
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._window: Optional[asyncio.Semaphore] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._sid = 0
+
+        # Health counters
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.stale_discarded = 0
+        self.last_ok_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+    @property
+    def is_connected(self) -> bool:
+        return self._transport is not None and not self._transport.is_closing()
+
+    async def connect(self) -> None:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+            self._window = asyncio.Semaphore(self.pipeline_window)
+
+        async with self._connect_lock:
+            if self.is_connected:
+                return
+            await self._open_transport()
+
+    async def _open_transport(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Port lokal ephemeral: PLC_LOCAL_PORT sudah dipakai oleh FinsSession (sync)
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _FinsDatagramProtocol(self),
+            remote_addr=(self.ip, self.port),
+        )
+        self._transport = transport
+
+    def _send(self, frame: bytes) -> None:
+        if self._transport is None:
+            raise ConnectionError("FINS async transport not connected")
+        self._transport.sendto(frame)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._fail_pending(ConnectionError("FINS async client closed"))
+
+    def _on_datagram(self, data: bytes) -> None:
+        if len(data) < 10:
+            self.stale_discarded += 1
+            return
+        future = self._pending.pop(parse_response_sid(data), None)
+        if future is None or future.done():
+            self.stale_discarded += 1
+            return
+        future.set_result(data)
+
+    def _on_error(self, exc: Exception) -> None:
+        # ICMP port unreachable dsb: biarkan request yang pending timeout/retry
+        logger.debug("FINS async transport error: %s", exc)
+
+    def _on_connection_lost(self, exc: Optional[Exception]) -> None:
+        self._transport = None
+        self._fail_pending(exc or ConnectionError("FINS async transport lost"))
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def _next_sid(self) -> int:
+        for _ in range(0xFF):
+            self._sid = (self._sid % 0xFF) + 1
+            if self._sid not in self._pending:
+                return self._sid
+        raise RuntimeError("No free FINS SID available")
+
+    def _record_failure(self, exc: BaseException) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(exc).__name__}: {exc}"
+
+    def _record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.last_ok_at = datetime.now(timezone.utc)
+
+    # ------------------------------------------------------------------
+    # Exchange
+    # ------------------------------------------------------------------
+    async def _send_and_wait(self, frame: bytes, timeout_sec: float) -> bytes:
+        loop = asyncio.get_running_loop()
+        sid = self._next_sid()
+        future: asyncio.Future = loop.create_future()
+        self._pending[sid] = future
+        self.total_requests += 1
+        try:
+            self._send(with_sid(frame, sid))
+            return await asyncio.wait_for(future, timeout=timeout_sec)
+        except asyncio.TimeoutError as exc:
+            timeout_error = socket.timeout("timed out")
+            self._record_failure(timeout_error)
+            raise timeout_error from exc
+        except OSError as exc:
+            self._record_failure(exc)
+            raise
+        finally:
+            self._pending.pop(sid, None)
+
+    async def _probe(self, breaker: CircuitBreaker, timeout_sec: float) -> None:
+        """Probe breaker half-open: read 1 word di PLC_BREAKER_PROBE_ADDRESS."""
+        frame = build_memory_read_frame(
+            req=MemoryReadRequest(area="DM", address=breaker.probe_address, count=1),
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        try:
+            parse_memory_read_response(await self._send_and_wait(frame, timeout_sec), expected_count=1)
+        except (OSError, ValueError) as exc:
+            breaker.probe_finished(False, exc)
+            raise PLCUnavailableError(f"PLC probe at D{breaker.probe_address} failed: {exc}") from exc
+        breaker.probe_finished(True)
+
+    async def exchange(self, frame: bytes, default_lane: PLCLane = PLCLane.POLL) -> bytes:
+        """
+        Kirim satu frame dan tunggu response dengan SID yang sama (satu attempt).
+
+        Lewat circuit breaker PLC (fail fast saat terbuka) dan timeout dipotong
+        ke sisa cycle budget.
+        """
+        breaker = get_plc_circuit_breaker()
+        timeout_sec = clip_timeout(self.timeout_sec)
+        probing = breaker.before_request()
+        try:
+            try:
+                await self.connect()
+            except OSError as exc:
+                self._record_failure(exc)
+                if probing:
+                    # Connect gagal = probe gagal: cool-down dimulai lagi
+                    probing = False
+                    breaker.probe_finished(False, exc)
+                else:
+                    breaker.record_failure(exc)
+                raise
+            assert self._window is not None
+
+            async with get_plc_io_broker().slot_async(default_lane), self._window:
+                if not self.is_connected:
+                    await self.connect()
+                if probing:
+                    await self._probe(breaker, timeout_sec)
+                    probing = False
+                try:
+                    raw = await self._send_and_wait(frame, timeout_sec)
+                except OSError as exc:
+                    breaker.record_failure(exc)
+                    raise
+        finally:
+            if probing:
+                breaker.release_probe()
+
+        self._record_success()
+        breaker.record_success()
+        return raw
+
+    async def _exchange_with_retry(
+        self,
+        frame: bytes,
+        parse,
+        label: str,
+        default_lane: PLCLane = PLCLane.POLL,
+    ) -> Any:
+        async def _attempt() -> Any:
+            raw = await self.exchange(frame, default_lane=default_lane)
+            try:
+                return parse(raw)
+            except ValueError as exc:
+                self._record_failure(exc)
+                raise
+
+        return await self.retry_policy.run_async(_attempt, f"PLC async {label}")
+
+    async def read_words(self, address: int, count: int, area: str = "DM") -> List[int]:
+        """Awaitable Memory Area Read dengan retry."""
+        frame = build_memory_read_frame(
+            req=MemoryReadRequest(area=area, address=address, count=count),
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        return await self._exchange_with_retry(
+            frame,
+            lambda raw: parse_memory_read_response(raw, expected_count=count),
+            f"read at D{address} (count={count})",
+        )
+
+    async def write_words(self, address: int, values: List[int], area: str = "DM") -> None:
+        """Awaitable Memory Area Write dengan retry."""
+        frame = build_memory_write_frame(
+            area=area,
+            address=address,
+            values=values,
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        try:
+            await self._exchange_with_retry(
+                frame,
+                parse_memory_write_response,
+                f"write at D{address} (count={len(values)})",
+                default_lane=PLCLane.WRITE,
+            )
+        finally:
+            notify_write(area, address, len(values))
+
+    async def read_many(
+        self,
+        ranges: Sequence[Tuple[int, int]],
+        area: str = "DM",
+    ) -> List[Optional[List[int]]]:
+        """
+        Baca beberapa (address, count) secara concurrent (dibatasi window).
+
+        Entry bernilai None jika tetap gagal setelah retry.
+        """
+        async def _read_one(address: int, count: int) -> Optional[List[int]]:
+            try:
+                return await self.read_words(address, count, area=area)
+            except Exception as exc:
+                logger.warning("PLC async multi-read failed at D%s count=%s: %s", address, count, exc)
+                return None
+
+        return list(await asyncio.gather(*(_read_one(address, count) for address, count in ranges)))
+
+    async def read_multiple(self, addresses: Sequence[int], area: str = "DM") -> List[int]:
+        """Awaitable Multiple Memory Area Read (0x0104), satu word per address."""
+        values: List[int] = []
+        for offset in range(0, len(addresses), MAX_MULTI_READ_ITEMS):
+            items = [(area, address) for address in addresses[offset:offset + MAX_MULTI_READ_ITEMS]]
+            frame = build_multiple_memory_read_frame(
+                items=items,
+                client_node=self.client_node,
+                plc_node=self.plc_node,
+                sid=0x00,
+            )
+            values.extend(
+                await self._exchange_with_retry(
+                    frame,
+                    lambda raw, items=items: parse_multiple_memory_read_response(raw, items),
+                    f"multi-read of {len(items)} address(es)",
+                )
+            )
+        return values
+
+    def get_health(self) -> Dict[str, Any]:
+        return {
+            "protocol": "udp",
+            "connected": self.is_connected,
+            "pipeline_window": self.pipeline_window,
+            "in_flight": len(self._pending),
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "stale_discarded": self.stale_discarded,
+            "last_ok_at": self.last_ok_at.isoformat() if self.last_ok_at else None,
+            "last_error": self.last_error,
+        }
+
+
+class AsyncFinsTcpClient(AsyncFinsClient):
+    """FINS/TCP variant: satu koneksi stream, reader task men-dispatch response per SID."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self.assigned_client_node: Optional[int] = None
+        self.server_node: Optional[int] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _read_message(self) -> bytes:
+        assert self._reader is not None
+        header = await self._reader.readexactly(FINS_TCP_HEADER_SIZE)
+        length, _, _ = parse_fins_tcp_header(header)
+        body = await self._reader.readexactly(max(length - 8, 0))
+        return header + body
+
+    async def _open_transport(self) -> None:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip, self.port),
+            timeout=self.timeout_sec,
+        )
+        self._reader, self._writer = reader, writer
+        try:
+            writer.write(build_fins_tcp_node_request(0))
+            await writer.drain()
+            response = await asyncio.wait_for(self._read_message(), timeout=self.timeout_sec)
+            self.assigned_client_node, self.server_node = parse_fins_tcp_node_response(response)
+        except BaseException:
+            writer.close()
+            self._reader = self._writer = None
+            raise
+
+        logger.info(
+            "FINS/TCP (async) connected to %s:%s (client_node=%s, server_node=%s)",
+            self.ip,
+            self.port,
+            self.assigned_client_node,
+            self.server_node,
+        )
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                message = await self._read_message()
+                _, command, error_code = parse_fins_tcp_header(message)
+                if error_code:
+                    detail = FINS_TCP_ERRORS.get(error_code, f"Unknown error code: 0x{error_code:02X}")
+                    raise ConnectionError(f"FINS/TCP error: {detail}")
+                if command == FINS_TCP_CMD_FRAME:
+                    self._on_datagram(message[FINS_TCP_HEADER_SIZE:])
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError, ValueError) as exc:
+            logger.warning("FINS/TCP (async) connection lost: %s", exc)
+            self._drop_stream(exc)
+
+    def _drop_stream(self, exc: BaseException) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self._fail_pending(exc)
+
+    def _send(self, frame: bytes) -> None:
+        if self._writer is None:
+            raise ConnectionError("FINS/TCP async stream not connected")
+        if self.assigned_client_node is not None and self.server_node is not None:
+            frame = with_nodes(frame, self.assigned_client_node, self.server_node)
+        self._writer.write(wrap_fins_tcp_frame(frame))
+
+    def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._drop_stream(ConnectionError("FINS async client closed"))
+
+    def get_health(self) -> Dict[str, Any]:
+        health = super().get_health()
+        health["protocol"] = "tcp"
+        health["client_node"] = self.assigned_client_node
+        health["server_node"] = self.server_node
+        return health
+
+
+# One client per event loop (transport/future terikat ke loop pembuatnya)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncFinsClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_async_fins_client() -> AsyncFinsClient:
+    """Get (lazy) AsyncFinsClient untuk event loop yang sedang berjalan."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        settings = get_settings()
+        protocol = (settings.plc_protocol or "udp").strip().lower()
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unsupported PLC protocol: {settings.plc_protocol} (expected 'udp' or 'tcp')")
+        client_cls = AsyncFinsTcpClient if protocol == "tcp" else AsyncFinsClient
+        client = client_cls(
+            ip=settings.plc_ip,
+            port=settings.plc_port,
+            timeout_sec=settings.plc_timeout_sec,
+            client_node=settings.client_node,
+            plc_node=settings.plc_node,
+            pipeline_window=settings.plc_pipeline_window,
+        )
+        _async_clients[loop] = client
+    await client.connect()
+    return client
+
+
+def close_async_fins_clients() -> None:
+    """Tutup semua AsyncFinsClient (dipanggil saat shutdown aplikasi)."""
+    for client in list(_async_clients.values()):
+        client.close()
+    _async_clients.clear()
@@ -2,8 +2,20 @@ from __future__ import annotations
 
 import binascii
 import socket
+import time
 from dataclasses import dataclass
 
+from app.services.fins_frames import (
+    FINS_TCP_CMD_FRAME,
+    FINS_TCP_ERRORS,
+    FINS_TCP_HEADER_SIZE,
+    build_fins_tcp_node_request,
+    parse_fins_tcp_header,
+    parse_fins_tcp_node_response,
+    with_nodes,
+    wrap_fins_tcp_frame,
+)
+
 
 @dataclass
 class FinsResponse:
@@ -15,17 +27,31 @@ class FinsResponse:
 
 
 class FinsUdpClient:
-    def __init__(self, ip: str, port: int = 9600, timeout_sec: float = 2.0) -> None:
+    def __init__(
+        self,
+        ip: str,
+        port: int = 9600,
+        timeout_sec: float = 2.0,
+        local_port: int = 0,
+    ) -> None:
         self.ip = ip
         self.port = port
         self.timeout_sec = timeout_sec
+        self.local_port = local_port
         self._sock: socket.socket | None = None
 
     def connect(self) -> None:
         if self._sock is not None:
             return
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(self.timeout_sec)
+        try:
+            if self.local_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(("", self.local_port))
+            sock.settimeout(self.timeout_sec)
+        except OSError:
+            sock.close()
+            raise
         self._sock = sock
 
     def close(self) -> None:
@@ -38,21 +64,218 @@ class FinsUdpClient:
     def is_connected(self) -> bool:
         return self._sock is not None
 
+    def send(self, frame: bytes | bytearray | memoryview) -> None:
+        """Kirim satu FINS frame apa adanya (tanpa konversi hex)."""
+        if self._sock is None:
+            raise RuntimeError("Socket not connected")
+        self._sock.sendto(frame, (self.ip, self.port))
+
     def send_raw_hex(self, hex_str: str) -> None:
+        self.send(binascii.unhexlify(hex_str))
+
+    def recv_into(self, buffer: bytearray | memoryview, timeout_sec: float | None = None) -> int:
+        """Terima satu datagram langsung ke buffer milik caller; return jumlah byte."""
         if self._sock is None:
             raise RuntimeError("Socket not connected")
-        payload = binascii.unhexlify(hex_str)
-        self._sock.sendto(payload, (self.ip, self.port))
+        if timeout_sec is None:
+            nbytes, _ = self._sock.recvfrom_into(buffer)
+            return nbytes
+        self._sock.settimeout(max(timeout_sec, 0.001))
+        try:
+            nbytes, _ = self._sock.recvfrom_into(buffer)
+        finally:
+            self._sock.settimeout(self.timeout_sec)
+        return nbytes
 
-    def recv(self, max_bytes: int = 2048) -> FinsResponse:
+    def recv(self, max_bytes: int = 2048, timeout_sec: float | None = None) -> FinsResponse:
         if self._sock is None:
             raise RuntimeError("Socket not connected")
-        data, _ = self._sock.recvfrom(max_bytes)
+        if timeout_sec is None:
+            data, _ = self._sock.recvfrom(max_bytes)
+            return FinsResponse(raw=data)
+        self._sock.settimeout(max(timeout_sec, 0.001))
+        try:
+            data, _ = self._sock.recvfrom(max_bytes)
+        finally:
+            self._sock.settimeout(self.timeout_sec)
         return FinsResponse(raw=data)
 
+    def drain(self, max_datagrams: int = 64) -> int:
+        """Discard datagrams already queued on the socket (late replies from timed-out requests)."""
+        if self._sock is None:
+            return 0
+        dropped = 0
+        self._sock.setblocking(False)
+        try:
+            while dropped < max_datagrams:
+                try:
+                    self._sock.recvfrom(2048)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except ConnectionResetError:
+                    # Windows melaporkan ICMP port-unreachable sebagai error pada recv berikutnya
+                    pass
+                dropped += 1
+        finally:
+            self._sock.settimeout(self.timeout_sec)
+        return dropped
+
     def __enter__(self) -> "FinsUdpClient":
         self.connect()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
+
+
+class FinsTcpClient:
+    """
+    FINS/TCP client: satu koneksi stream persisten dengan node-address handshake.
+
+    Interface sama dengan FinsUdpClient (connect/send/recv_into/recv/drain/close)
+    sehingga FinsSession bisa memakai keduanya. Node yang di-assign PLC saat
+    handshake dipasang ke DA1/SA1 setiap frame yang dikirim.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(
+        self,
+        ip: str,
+        port: int = 9600,
+        timeout_sec: float = 2.0,
+        client_node: int = 0,
+    ) -> None:
+        self.ip = ip
+        self.port = port
+        self.timeout_sec = timeout_sec
+        self.requested_client_node = client_node
+        self.client_node: int | None = None
+        self.server_node: int | None = None
+        self._sock: socket.socket | None = None
+        self._buffer = bytearray()
+        self._chunk = bytearray(self.CHUNK_SIZE)
+
+    def connect(self) -> None:
+        if self._sock is not None:
+            return
+        sock = socket.create_connection((self.ip, self.port), timeout=self.timeout_sec)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.timeout_sec)
+            self._sock = sock
+            self._buffer.clear()
+            sock.sendall(build_fins_tcp_node_request(self.requested_client_node))
+            total, _, _ = self._fill_message(time.monotonic() + self.timeout_sec)
+            response = bytes(self._buffer[:total])
+            del self._buffer[:total]
+            self.client_node, self.server_node = parse_fins_tcp_node_response(response)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        try:
+            self._sock.close()
+        finally:
+            self._sock = None
+            self._buffer.clear()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._sock is not None
+
+    def send(self, frame: bytes | bytearray | memoryview) -> None:
+        if self._sock is None:
+            raise RuntimeError("Socket not connected")
+        if self.client_node is not None and self.server_node is not None:
+            frame = with_nodes(frame, self.client_node, self.server_node)
+        self._sock.sendall(wrap_fins_tcp_frame(frame))
+
+    def send_raw_hex(self, hex_str: str) -> None:
+        self.send(binascii.unhexlify(hex_str))
+
+    def _fill_message(self, deadline: float) -> tuple[int, int, int]:
+        """
+        Tunggu sampai satu FINS/TCP message lengkap ada di awal buffer stream.
+
+        Returns (total_length, command, error_code); caller wajib membuang
+        `total_length` byte dari buffer setelah memakainya.
+        """
+        if self._sock is None:
+            raise RuntimeError("Socket not connected")
+        while True:
+            if len(self._buffer) >= FINS_TCP_HEADER_SIZE:
+                with memoryview(self._buffer) as view:
+                    length, command, error_code = parse_fins_tcp_header(view[:FINS_TCP_HEADER_SIZE])
+                total = 8 + length
+                if len(self._buffer) >= total:
+                    return total, command, error_code
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Data parsial tetap di buffer; stream tidak desync saat timeout
+                raise socket.timeout("timed out")
+            self._sock.settimeout(remaining)
+            try:
+                nbytes = self._sock.recv_into(self._chunk)
+            finally:
+                self._sock.settimeout(self.timeout_sec)
+            if not nbytes:
+                raise ConnectionResetError("FINS/TCP connection closed by PLC")
+            with memoryview(self._chunk) as chunk:
+                self._buffer += chunk[:nbytes]
+
+    def recv_into(self, buffer: bytearray | memoryview, timeout_sec: float | None = None) -> int:
+        """Salin FINS frame berikutnya (tanpa header FINS/TCP) ke buffer caller; return jumlah byte."""
+        timeout = self.timeout_sec if timeout_sec is None else max(timeout_sec, 0.001)
+        deadline = time.monotonic() + timeout
+        while True:
+            total, command, error_code = self._fill_message(deadline)
+            try:
+                if error_code:
+                    detail = FINS_TCP_ERRORS.get(error_code, f"Unknown error code: 0x{error_code:02X}")
+                    raise ConnectionError(f"FINS/TCP error: {detail}")
+                if command == FINS_TCP_CMD_FRAME:
+                    nbytes = total - FINS_TCP_HEADER_SIZE
+                    if nbytes > len(buffer):
+                        raise ValueError(f"FINS/TCP frame of {nbytes} bytes exceeds receive buffer")
+                    with memoryview(self._buffer) as view:
+                        buffer[:nbytes] = view[FINS_TCP_HEADER_SIZE:total]
+                    return nbytes
+            finally:
+                del self._buffer[:total]
+
+    def recv(self, max_bytes: int = 2048, timeout_sec: float | None = None) -> FinsResponse:
+        buffer = bytearray(max(max_bytes, 2048))
+        nbytes = self.recv_into(buffer, timeout_sec=timeout_sec)
+        return FinsResponse(raw=bytes(buffer[:nbytes]))
+
+    def drain(self, max_datagrams: int = 64) -> int:
+        # Stream ter-frame: response lama dibuang lewat SID matching, bukan drain
+        return 0
+
+    def __enter__(self) -> "FinsTcpClient":
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def create_fins_client(
+    protocol: str,
+    ip: str,
+    port: int = 9600,
+    timeout_sec: float = 2.0,
+    local_port: int = 0,
+) -> FinsUdpClient | FinsTcpClient:
+    """Create a FINS client for PLC_PROTOCOL ("udp" or "tcp")."""
+    normalized = (protocol or "udp").strip().lower()
+    if normalized == "udp":
+        return FinsUdpClient(ip=ip, port=port, timeout_sec=timeout_sec, local_port=local_port)
+    if normalized == "tcp":
+        return FinsTcpClient(ip=ip, port=port, timeout_sec=timeout_sec)
+    raise ValueError(f"Unsupported PLC protocol: {protocol} (expected 'udp' or 'tcp')")
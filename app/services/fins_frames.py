@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import struct
+import sys
+from array import array
 from dataclasses import dataclass
+from functools import lru_cache
 
 
+FINS_HEADER_SIZE = 10
+FINS_SID_OFFSET = 9
+
 AREA_CODES = {
     "CIO": 0x30,
     "WR": 0x31,
@@ -11,6 +17,50 @@ AREA_CODES = {
     "DM": 0x82,
 }
 
+# CS/CJ: max item per Multiple Memory Area Read (0x0104)
+MAX_MULTI_READ_ITEMS = 167
+
+FINS_END_CODES = {
+    0x0101: "Local node not in network",
+    0x0102: "Token timeout",
+    0x0103: "Retries failed",
+    0x0104: "Too many send frames",
+    0x0105: "Node address range error",
+    0x0106: "Node address duplication",
+    0x0201: "Destination node not in network",
+    0x0202: "Unit missing",
+    0x0203: "Third node missing",
+    0x0204: "Destination node busy",
+    0x0205: "Response timeout",
+    0x0301: "Communications controller error",
+    0x0302: "CPU Unit error",
+    0x0303: "Controller error",
+    0x0304: "Unit number error",
+    0x0401: "Undefined command",
+    0x0402: "Not supported by model/version",
+    0x1001: "Command too long",
+    0x1002: "Command too short",
+    0x1003: "Elements/data don't match",
+    0x1004: "Command format error",
+    0x1005: "Header error",
+    0x1101: "Area classification missing",
+    0x1102: "Access size error",
+    0x1103: "Address range error",
+    0x1104: "Address range exceeded",
+    0x1106: "Program missing",
+    0x1109: "Relational error",
+    0x110A: "Duplicate data access",
+    0x110B: "Response too long",
+    0x110C: "Parameter error",
+    0x2002: "Protected",
+    0x2003: "Table missing",
+    0x2004: "Data missing",
+    0x2005: "Program missing",
+    0x2006: "File missing",
+    0x2007: "Data mismatch",
+    0x9005: "Address/area not available or access denied",
+}
+
 
 @dataclass(frozen=True)
 class MemoryReadRequest:
@@ -19,23 +69,123 @@ class MemoryReadRequest:
     count: int
 
 
-def build_fins_header(
-    client_node: int,
-    plc_node: int,
-    sid: int = 0x00,
-) -> bytes:
+@lru_cache(maxsize=64)
+def _header_template(client_node: int, plc_node: int) -> bytes:
+    """Header FINS per (client_node, plc_node) dengan SID 0; dibangun sekali lalu di-cache."""
     icf = 0x80  # response required
     rsv = 0x00
     gct = 0x02
     dna = 0x00
-    da1 = plc_node & 0xFF
+    da1 = plc_node
     da2 = 0x00
     sna = 0x00
-    sa1 = client_node & 0xFF
+    sa1 = client_node
     sa2 = 0x00
-    sid = sid & 0xFF
 
-    return bytes([icf, rsv, gct, dna, da1, da2, sna, sa1, sa2, sid])
+    return bytes([icf, rsv, gct, dna, da1, da2, sna, sa1, sa2, 0x00])
+
+
+def build_fins_header(
+    client_node: int,
+    plc_node: int,
+    sid: int = 0x00,
+) -> bytes:
+    header = _header_template(client_node & 0xFF, plc_node & 0xFF)
+    if not sid & 0xFF:
+        return header
+    return header[:FINS_SID_OFFSET] + bytes([sid & 0xFF])
+
+
+# MRC, SRC, area(1) + address(2) + bit(1) + count(2)
+_MEMORY_AREA_COMMAND = struct.Struct(">BBBHBH")
+
+
+def with_sid(frame: bytes, sid: int) -> bytes:
+    """Return a copy of a FINS frame with its SID byte replaced."""
+    if len(frame) < FINS_HEADER_SIZE:
+        raise ValueError("Frame too short for FINS header")
+    patched = bytearray(frame)
+    patched[FINS_SID_OFFSET] = sid & 0xFF
+    return bytes(patched)
+
+
+def stamp_sid(frame: bytearray, sid: int) -> bytearray:
+    """Patch the SID byte of a mutable FINS frame in place."""
+    if len(frame) < FINS_HEADER_SIZE:
+        raise ValueError("Frame too short for FINS header")
+    frame[FINS_SID_OFFSET] = sid & 0xFF
+    return frame
+
+
+def parse_response_sid(raw: bytes | memoryview) -> int:
+    """Extract the SID echoed back in a FINS response header."""
+    if len(raw) < FINS_HEADER_SIZE:
+        raise ValueError("Response too short for FINS header")
+    return raw[FINS_SID_OFFSET]
+
+
+def with_nodes(frame: bytes, client_node: int, plc_node: int) -> bytes:
+    """Return a copy of a FINS frame with DA1 (PLC node) and SA1 (client node) replaced."""
+    if len(frame) < FINS_HEADER_SIZE:
+        raise ValueError("Frame too short for FINS header")
+    patched = bytearray(frame)
+    patched[4] = plc_node & 0xFF
+    patched[7] = client_node & 0xFF
+    return bytes(patched)
+
+
+# ----------------------------------------------------------------------
+# FINS/TCP framing
+# ----------------------------------------------------------------------
+FINS_TCP_MAGIC = b"FINS"
+FINS_TCP_HEADER_SIZE = 16
+FINS_TCP_CMD_NODE_REQUEST = 0
+FINS_TCP_CMD_NODE_RESPONSE = 1
+FINS_TCP_CMD_FRAME = 2
+
+FINS_TCP_ERRORS = {
+    0x01: "Header is not 'FINS'",
+    0x02: "Data length too long",
+    0x03: "Command not supported",
+    0x20: "All connections are in use",
+    0x21: "Specified node is already connected",
+    0x22: "Attempt to access a protected node from an unspecified IP address",
+    0x23: "Client FINS node address out of range",
+    0x24: "Same FINS node address used by client and server",
+    0x25: "All node addresses available for allocation are in use",
+}
+
+
+def build_fins_tcp_node_request(client_node: int = 0) -> bytes:
+    """FINS/TCP node address data send (client -> server). Node 0 = auto-assign."""
+    return FINS_TCP_MAGIC + struct.pack(">IIII", 12, FINS_TCP_CMD_NODE_REQUEST, 0, client_node & 0xFF)
+
+
+def parse_fins_tcp_header(raw: bytes) -> tuple[int, int, int]:
+    """Parse a 16-byte FINS/TCP header into (length, command, error_code)."""
+    if len(raw) < FINS_TCP_HEADER_SIZE:
+        raise ValueError("FINS/TCP header too short")
+    if raw[:4] != FINS_TCP_MAGIC:
+        raise ValueError(f"Invalid FINS/TCP magic: {raw[:4]!r}")
+    length, command, error_code = struct.unpack(">III", raw[4:16])
+    return length, command, error_code
+
+
+def parse_fins_tcp_node_response(raw: bytes) -> tuple[int, int]:
+    """Parse FINS/TCP node address response into (client_node, server_node)."""
+    length, command, error_code = parse_fins_tcp_header(raw)
+    if error_code:
+        message = FINS_TCP_ERRORS.get(error_code, f"Unknown error code: 0x{error_code:02X}")
+        raise ConnectionError(f"FINS/TCP handshake rejected: {message}")
+    if command != FINS_TCP_CMD_NODE_RESPONSE or len(raw) < 24:
+        raise ValueError(f"Unexpected FINS/TCP handshake response (command={command}, length={length})")
+    client_node, server_node = struct.unpack(">II", raw[16:24])
+    return client_node & 0xFF, server_node & 0xFF
+
+
+def wrap_fins_tcp_frame(frame: bytes | bytearray | memoryview) -> bytes:
+    """Wrap a FINS frame in a FINS/TCP 'frame send' envelope."""
+    return b"".join((FINS_TCP_MAGIC, struct.pack(">III", 8 + len(frame), FINS_TCP_CMD_FRAME, 0), frame))
 
 
 def build_memory_read_command(req: MemoryReadRequest) -> bytes:
@@ -54,12 +204,7 @@ def build_memory_read_command(req: MemoryReadRequest) -> bytes:
 
     # FINS command: MRC=0x01, SRC=0x01 (Memory Area Read)
     # Command format: area(1) + address(2) + bit(1) + count(2)
-    return bytes([0x01, 0x01, area_code]) + struct.pack(
-        ">HBH",
-        address,
-        bit_address,
-        count,
-    )
+    return _MEMORY_AREA_COMMAND.pack(0x01, 0x01, area_code, address, bit_address, count)
 
 
 def build_memory_read_frame(
@@ -102,12 +247,7 @@ def build_memory_write_command(area: str, address: int, values: list[int]) -> by
             raise ValueError(f"Value {v} out of range for 16-bit integer")
     
     data = b"".join(data_parts)
-    return bytes([0x01, 0x02, area_code]) + struct.pack(
-        ">HBH",
-        address,
-        bit_address,
-        count,
-    ) + data
+    return _MEMORY_AREA_COMMAND.pack(0x01, 0x02, area_code, address, bit_address, count) + data
 
 
 def build_memory_write_frame(
@@ -123,7 +263,7 @@ def build_memory_write_frame(
     return header + command
 
 
-def parse_memory_write_response(raw: bytes) -> None:
+def parse_memory_write_response(raw: bytes | memoryview) -> None:
     if len(raw) < 14:
         raise ValueError(f"Response too short: expected at least 14 bytes, got {len(raw)} bytes. Hex: {raw.hex()}")
 
@@ -132,107 +272,107 @@ def parse_memory_write_response(raw: bytes) -> None:
     end_code = raw[12:14]
     if end_code != b"\x00\x00":
         error_code = int.from_bytes(end_code, byteorder="big")
-        error_messages = {
-            0x0101: "Local node not in network",
-            0x0102: "Token timeout",
-            0x0103: "Retries failed",
-            0x0104: "Too many send frames",
-            0x0105: "Node address range error",
-            0x0106: "Node address duplication",
-            0x0201: "Destination node not in network",
-            0x0202: "Unit missing",
-            0x0203: "Third node missing",
-            0x0204: "Destination node busy",
-            0x0205: "Response timeout",
-            0x0301: "Communications controller error",
-            0x0302: "CPU Unit error",
-            0x0303: "Controller error",
-            0x0304: "Unit number error",
-            0x0401: "Undefined command",
-            0x0402: "Not supported by model/version",
-            0x1001: "Command too long",
-            0x1002: "Command too short",
-            0x1003: "Elements/data don't match",
-            0x1004: "Command format error",
-            0x1005: "Header error",
-            0x1101: "Area classification missing",
-            0x1102: "Access size error",
-            0x1103: "Address range error",
-            0x1104: "Address range exceeded",
-            0x1106: "Program missing",
-            0x1109: "Relational error",
-            0x110A: "Duplicate data access",
-            0x110B: "Response too long",
-            0x110C: "Parameter error",
-            0x2002: "Protected",
-            0x2003: "Table missing",
-            0x2004: "Data missing",
-            0x2005: "Program missing",
-            0x2006: "File missing",
-            0x2007: "Data mismatch",
-        }
-        error_msg = error_messages.get(error_code, f"Unknown error code: 0x{error_code:04X}")
+        error_msg = FINS_END_CODES.get(error_code, f"Unknown error code: 0x{error_code:04X}")
         raise ValueError(f"FINS write error: {error_msg} (end code: {end_code.hex()})")
 
 
-def parse_memory_read_response(raw: bytes, expected_count: int) -> list[int]:
+def parse_memory_read_response(raw: bytes | memoryview, expected_count: int) -> list[int]:
+    # Compat API: list[int]; decode-nya sendiri bulk lewat parse_memory_read_array
+    return parse_memory_read_array(raw, expected_count).tolist()
+
+
+def parse_memory_read_array(raw: bytes | memoryview, expected_count: int) -> array:
+    """Parse respons 0x0101 menjadi array('H') dalam satu panggilan (tanpa loop per word)."""
     if len(raw) < 14:
         raise ValueError("Response too short")
 
     # Header (10) + MRC (1) + SRC (1) + End Code (2)
-    end_code = raw[12:14]
+    end_code = bytes(raw[12:14])
     if end_code != b"\x00\x00":
         error_code = int.from_bytes(end_code, byteorder="big")
-        error_messages = {
-            0x0101: "Local node not in network",
-            0x0102: "Token timeout",
-            0x0103: "Retries failed",
-            0x0104: "Too many send frames",
-            0x0105: "Node address range error",
-            0x0106: "Node address duplication",
-            0x0201: "Destination node not in network",
-            0x0202: "Unit missing",
-            0x0203: "Third node missing",
-            0x0204: "Destination node busy",
-            0x0205: "Response timeout",
-            0x0301: "Communications controller error",
-            0x0302: "CPU Unit error",
-            0x0303: "Controller error",
-            0x0304: "Unit number error",
-            0x0401: "Undefined command",
-            0x0402: "Not supported by model/version",
-            0x1001: "Command too long",
-            0x1002: "Command too short",
-            0x1003: "Elements/data don't match",
-            0x1004: "Command format error",
-            0x1005: "Header error",
-            0x1101: "Area classification missing",
-            0x1102: "Access size error",
-            0x1103: "Address range error",
-            0x1104: "Address range exceeded",
-            0x1106: "Program missing",
-            0x1109: "Relational error",
-            0x110A: "Duplicate data access",
-            0x110B: "Response too long",
-            0x110C: "Parameter error",
-            0x2002: "Protected",
-            0x2003: "Table missing",
-            0x2004: "Data missing",
-            0x2005: "Program missing",
-            0x2006: "File missing",
-            0x2007: "Data mismatch",
-            0x9005: "Address/area not available or access denied",
-        }
-        error_msg = error_messages.get(error_code, f"Unknown error code: 0x{error_code:04X}")
+        error_msg = FINS_END_CODES.get(error_code, f"Unknown error code: 0x{error_code:04X}")
         raise ValueError(f"FINS error: {error_msg} (end code: {end_code.hex()})")
 
-    data = raw[14:]
-    if len(data) < expected_count * 2:
+    if len(raw) - 14 < expected_count * 2:
         raise ValueError("Not enough data words in response")
 
-    values: list[int] = []
-    for i in range(expected_count):
-        word = data[i * 2 : i * 2 + 2]
-        values.append(int.from_bytes(word, byteorder="big"))
+    return words_from_bytes(raw[14 : 14 + expected_count * 2])
+
+
+def words_from_bytes(data: bytes | bytearray | memoryview) -> array:
+    """Decode big-endian word data sekaligus (array('H') + byteswap di host little-endian)."""
+    words = array("H")
+    words.frombytes(data)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+
+def words_to_bytes(words) -> bytes:
+    """Encode word list/array ke bytes big-endian dalam satu panggilan."""
+    block = array("H", words)
+    if sys.byteorder == "little":
+        block.byteswap()
+    return block.tobytes()
+
+
+@lru_cache(maxsize=32)
+def _multi_read_struct(item_count: int) -> struct.Struct:
+    # Per item: area(1) + word(2), tanpa padding
+    return struct.Struct(">" + "BH" * item_count)
+
+
+def build_multiple_memory_read_command(items: list[tuple[str, int]]) -> bytes:
+    """
+    Multiple Memory Area Read (MRC=0x01, SRC=0x04).
+
+    items: list (area, address), masing-masing membaca satu word.
+    Command format per item: area(1) + address(2) + bit(1)
+    """
+    if not items:
+        raise ValueError("Items cannot be empty")
+    if len(items) > MAX_MULTI_READ_ITEMS:
+        raise ValueError(f"Too many items: {len(items)} (max {MAX_MULTI_READ_ITEMS})")
+
+    parts = [bytes([0x01, 0x04])]
+    for area, address in items:
+        if area not in AREA_CODES:
+            raise ValueError(f"Unsupported area: {area}")
+        if address < 0 or address > 0xFFFF:
+            raise ValueError("Address must be 0..65535")
+        parts.append(struct.pack(">BHB", AREA_CODES[area], address, 0x00))
+    return b"".join(parts)
+
+
+def build_multiple_memory_read_frame(
+    items: list[tuple[str, int]],
+    client_node: int,
+    plc_node: int,
+    sid: int = 0x00,
+) -> bytes:
+    header = build_fins_header(client_node, plc_node, sid)
+    command = build_multiple_memory_read_command(items)
+    return header + command
+
+
+def parse_multiple_memory_read_response(raw: bytes | memoryview, items: list[tuple[str, int]]) -> list[int]:
+    """Parse response 0x0104: per item area(1) + word(2), urutan sama dengan request."""
+    if len(raw) < 14:
+        raise ValueError("Response too short")
+
+    end_code = raw[12:14]
+    if end_code != b"\x00\x00":
+        error_code = int.from_bytes(end_code, byteorder="big")
+        error_msg = FINS_END_CODES.get(error_code, f"Unknown error code: 0x{error_code:04X}")
+        raise ValueError(f"FINS multi-read error: {error_msg} (end code: {end_code.hex()})")
+
+    if len(raw) - 14 < len(items) * 3:
+        raise ValueError("Not enough data items in response")
 
-    return values
+    unpacked = _multi_read_struct(len(items)).unpack_from(raw, 14)
+    for i, (area, address) in enumerate(items):
+        if unpacked[2 * i] != AREA_CODES[area]:
+            raise ValueError(
+                f"Multi-read area mismatch at item {i} ({area}{address}): got 0x{unpacked[2 * i]:02X}"
+            )
+    return list(unpacked[1::2])
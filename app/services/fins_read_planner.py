@@ -0,0 +1,150 @@
+"""
+FINS Read Planner
+
+Menggabungkan sekumpulan DM range (dari reference JSON) menjadi sesedikit
+mungkin Memory Area Read (0x0101), lalu memecah hasil word buffer kembali
+per range/field.
+
+Dua range digabung jika jarak (gap) di antaranya <= max_gap word dan total
+block tidak melebihi max_words. Membaca beberapa word ekstra di gap jauh
+lebih murah daripada satu round trip tambahan ke PLC.
+
+Contoh:
+- 10 READ batch (D6000-D6076 ... D6900-D6976, gap 23 word) -> 1 frame D6000-D6976
+- Equipment failure (D8000-D8022, per field) -> 1 frame
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# CS/CJ: max 999 word per Memory Area Read; sisakan margin untuk header
+MAX_READ_WORDS = 990
+
+
+@dataclass(frozen=True)
+class ReadRange:
+    key: Hashable
+    address: int
+    count: int
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+
+@dataclass(frozen=True)
+class ReadBlock:
+    address: int
+    count: int
+    members: Tuple[ReadRange, ...]
+
+
+@dataclass(frozen=True)
+class ReadPlan:
+    blocks: Tuple[ReadBlock, ...]
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def block_ranges(self) -> List[Tuple[int, int]]:
+        return [(block.address, block.count) for block in self.blocks]
+
+    def split(self, block_words: Sequence[Optional[Sequence[int]]]) -> Dict[Hashable, List[int]]:
+        """Pecah word buffer per block kembali menjadi slice per key."""
+        result: Dict[Hashable, List[int]] = {}
+        for block, words in zip(self.blocks, block_words):
+            if words is None:
+                continue
+            for member in block.members:
+                start = member.address - block.address
+                result[member.key] = list(words[start:start + member.count])
+        return result
+
+
+def plan_reads(
+    ranges: Iterable[ReadRange],
+    max_words: int = MAX_READ_WORDS,
+    max_gap: Optional[int] = None,
+) -> ReadPlan:
+    """Gabungkan range yang berdekatan menjadi block read minimal."""
+    if max_gap is None:
+        max_gap = get_settings().plc_read_max_gap_words
+    max_words = max(1, min(int(max_words), MAX_READ_WORDS))
+
+    ordered = sorted(ranges, key=lambda item: (item.address, -item.count))
+    blocks: List[ReadBlock] = []
+    current: List[ReadRange] = []
+    block_start = 0
+    block_end = 0
+
+    for item in ordered:
+        if item.count <= 0:
+            raise ValueError(f"Invalid read range count for {item.key}: {item.count}")
+        if item.count > max_words:
+            raise ValueError(
+                f"Read range {item.key} (D{item.address}, count={item.count}) exceeds max {max_words} words"
+            )
+
+        if current:
+            gap = item.address - block_end
+            new_end = max(block_end, item.end)
+            if gap <= max_gap and (new_end - block_start) <= max_words:
+                current.append(item)
+                block_end = new_end
+                continue
+            blocks.append(ReadBlock(block_start, block_end - block_start, tuple(current)))
+
+        current = [item]
+        block_start = item.address
+        block_end = item.end
+
+    if current:
+        blocks.append(ReadBlock(block_start, block_end - block_start, tuple(current)))
+
+    return ReadPlan(blocks=tuple(blocks))
+
+
+def execute_plan(plan: ReadPlan) -> Dict[Hashable, List[int]]:
+    """Jalankan ReadPlan lewat FinsSession bersama (pipelined, retry per block lewat RetryPolicy)."""
+    from app.services.fins_session import get_fins_session
+    from app.services.plc_retry_policy import NON_RETRYABLE_ERRORS, get_plc_retry_policy
+
+    session = get_fins_session()
+    ranges = plan.block_ranges
+    try:
+        block_words: List[Optional[List[int]]] = list(session.read_many(ranges))
+    except NON_RETRYABLE_ERRORS:
+        # Breaker terbuka / budget habis: retry serial hanya membuang waktu
+        raise
+    except Exception as exc:
+        logger.warning("Planned pipelined read failed, retrying blocks serially: %s", exc)
+        block_words = [None] * len(ranges)
+
+    policy = get_plc_retry_policy()
+    for index, (address, count) in enumerate(ranges):
+        if block_words[index] is not None:
+            continue
+        block_words[index] = policy.run(
+            lambda address=address, count=count: session.read_words(address, count),
+            f"Planned read at D{address} (count={count})",
+        )
+
+    return plan.split(block_words)
+
+
+async def execute_plan_async(plan: ReadPlan) -> Dict[Hashable, List[int]]:
+    """Jalankan ReadPlan lewat async FINS client (retry/back-off di client)."""
+    from app.services.fins_async_client import get_async_fins_client
+
+    client = await get_async_fins_client()
+    block_words = await asyncio.gather(
+        *(client.read_words(address, count) for address, count in plan.block_ranges)
+    )
+    return plan.split(block_words)
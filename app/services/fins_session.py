@@ -0,0 +1,517 @@
+"""
+FINS Session Manager
+
+Satu session FINS jangka panjang yang di-share oleh semua service PLC
+(read, write, handshake, equipment failure, manual weighing).
+
+Sebelumnya setiap read/write membuat FinsUdpClient baru (socket baru, port
+ephemeral baru) lalu menutupnya lagi. Session ini menyimpan satu socket yang
+tetap terbuka, melacak kesehatannya, dan membuka ulang socket ketika terjadi
+error transport.
+
+Setiap frame diberi SID bergulir (1..255) dan response dicocokkan berdasarkan
+SID, sehingga balasan terlambat dari request yang timeout dibuang dan tidak
+tertukar dengan request berikutnya. exchange_many() mengirim beberapa frame
+sekaligus (maksimal PLC_PIPELINE_WINDOW in-flight) supaya latency jaringan
+tumpang tindih, bukan dibayar serial per request.
+
+Frame dikirim sebagai bytes apa adanya dan response diterima ke satu
+bytearray yang dipakai ulang (recv_into); parser membaca langsung dari
+memoryview di dalam lock session, jadi tidak ada konversi hex atau salinan
+per request.
+
+Transport dipilih dari PLC_PROTOCOL: "udp" (FinsUdpClient) atau "tcp"
+(FinsTcpClient, satu koneksi stream persisten dengan node-address handshake).
+"""
+import logging
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from app.core.config import get_settings
+from app.services.fins_client import FinsTcpClient, FinsUdpClient, create_fins_client
+from app.services.fins_frames import (
+    FINS_HEADER_SIZE,
+    MAX_MULTI_READ_ITEMS,
+    MemoryReadRequest,
+    build_memory_read_frame,
+    build_memory_write_frame,
+    build_multiple_memory_read_frame,
+    parse_memory_read_response,
+    parse_multiple_memory_read_response,
+    parse_memory_write_response,
+    parse_response_sid,
+    stamp_sid,
+)
+from app.services.plc_io_broker import PLCLane, get_plc_io_broker
+from app.services.plc_retry_policy import (
+    CircuitBreaker,
+    PLCUnavailableError,
+    clip_timeout,
+    get_plc_circuit_breaker,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# FINS frame maksimal ~2012 byte; satu buffer receive dipakai ulang per session
+RX_BUFFER_SIZE = 4096
+
+
+class FinsSession:
+    """Process-wide FINS session dengan health tracking dan reconnect-on-error."""
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        timeout_sec: float,
+        client_node: int,
+        plc_node: int,
+        local_port: int = 0,
+        pipeline_window: int = 1,
+        protocol: str = "udp",
+    ) -> None:
+        self.protocol = (protocol or "udp").strip().lower()
+        self.ip = ip
+        self.port = port
+        self.timeout_sec = timeout_sec
+        self.client_node = client_node
+        self.plc_node = plc_node
+        self.local_port = local_port
+        self.pipeline_window = max(1, min(int(pipeline_window), 64))
+
+        self._client: Optional[FinsUdpClient | FinsTcpClient] = None
+        self._lock = threading.RLock()
+        self._sid = 0
+        self._rx_buffer = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_buffer)
+
+        # Health counters
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.reconnects = 0
+        self.stale_discarded = 0
+        self.last_ok_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime] = None
+        self.opened_at: Optional[datetime] = None
+
+    def _ensure_client(self) -> FinsUdpClient | FinsTcpClient:
+        if self._client is not None and self._client.is_connected:
+            return self._client
+
+        client = create_fins_client(
+            self.protocol,
+            ip=self.ip,
+            port=self.port,
+            timeout_sec=self.timeout_sec,
+            local_port=self.local_port,
+        )
+        client.connect()
+        if isinstance(client, FinsTcpClient):
+            logger.info(
+                "FINS/TCP connected to %s:%s (client_node=%s, server_node=%s)",
+                self.ip,
+                self.port,
+                client.client_node,
+                client.server_node,
+            )
+        if self.opened_at is not None:
+            self.reconnects += 1
+            logger.info(
+                "FINS session reopened to %s:%s via %s (reconnects=%s)",
+                self.ip,
+                self.port,
+                self.protocol,
+                self.reconnects,
+            )
+        self._client = client
+        self.opened_at = datetime.now(timezone.utc)
+        return client
+
+    def _drop_client(self) -> None:
+        if self._client is None:
+            return
+        try:
+            self._client.close()
+        except OSError:
+            pass
+        self._client = None
+
+    def _record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.last_ok_at = datetime.now(timezone.utc)
+
+    def _record_failure(self, exc: BaseException) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(exc).__name__}: {exc}"
+        self.last_error_at = datetime.now(timezone.utc)
+
+    def _next_sid(self) -> int:
+        # SID 0 dibiarkan untuk frame legacy; session memakai 1..255
+        self._sid = (self._sid % 0xFF) + 1
+        return self._sid
+
+    def _recv_response(self, client: FinsUdpClient | FinsTcpClient, timeout_sec: float) -> memoryview:
+        """
+        Receive one frame into the shared buffer; frames too short to carry a
+        SID are discarded. The returned view is only valid until the next receive.
+        """
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            nbytes = client.recv_into(self._rx_buffer, timeout_sec=remaining)
+            if nbytes >= FINS_HEADER_SIZE:
+                return self._rx_view[:nbytes]
+            self.stale_discarded += 1
+
+    def _send_and_wait(self, client: FinsUdpClient | FinsTcpClient, packet: bytearray, timeout_sec: float) -> memoryview:
+        """Kirim satu frame (SID baru) dan tunggu response dengan SID yang sama."""
+        self.total_requests += 1
+        sid = self._next_sid()
+        client.send(stamp_sid(packet, sid))
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            raw = self._recv_response(client, deadline - time.monotonic())
+            if parse_response_sid(raw) == sid:
+                return raw
+            self.stale_discarded += 1
+
+    def _probe_locked(self, breaker: CircuitBreaker, timeout_sec: float) -> None:
+        """Probe breaker half-open: read 1 word di PLC_BREAKER_PROBE_ADDRESS."""
+        frame = build_memory_read_frame(
+            req=MemoryReadRequest(area="DM", address=breaker.probe_address, count=1),
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        try:
+            client = self._ensure_client()
+            parse_memory_read_response(
+                self._send_and_wait(client, bytearray(frame), timeout_sec),
+                expected_count=1,
+            )
+        except (OSError, ValueError) as exc:
+            self._record_failure(exc)
+            if not isinstance(exc, (TimeoutError, socket.timeout)):
+                self._drop_client()
+            breaker.probe_finished(False, exc)
+            raise PLCUnavailableError(f"PLC probe at D{breaker.probe_address} failed: {exc}") from exc
+        breaker.probe_finished(True)
+
+    def exchange(
+        self,
+        frame: bytes | bytearray,
+        parse: Optional[Callable[[memoryview], T]] = None,
+        default_lane: PLCLane = PLCLane.POLL,
+    ) -> T | bytes:
+        """
+        Kirim satu FINS frame dan tunggu response dengan SID yang sama.
+
+        Response dengan SID lain (sisa request yang timeout) dibuang. Socket
+        error selain timeout menutup socket supaya request berikutnya memakai
+        socket bersih. Retry tetap tanggung jawab caller.
+
+        Jika `parse` diberikan, response di-parse langsung dari buffer receive
+        (memoryview) di dalam lock dan hasil parse yang dikembalikan; tanpa
+        `parse`, response dikembalikan sebagai salinan bytes.
+
+        Setiap exchange mengambil slot PLC I/O broker (lane dari context,
+        fallback `default_lane`) sebelum mengunci session, dan lewat circuit
+        breaker PLC: saat breaker terbuka langsung PLCUnavailableError. Timeout
+        dipotong ke sisa cycle budget (plc_deadline).
+        """
+        packet = frame if isinstance(frame, bytearray) else bytearray(frame)
+        breaker = get_plc_circuit_breaker()
+        timeout_sec = clip_timeout(self.timeout_sec)
+        probing = breaker.before_request()
+        try:
+            with get_plc_io_broker().slot(default_lane), self._lock:
+                if probing:
+                    self._probe_locked(breaker, timeout_sec)
+                    probing = False
+                try:
+                    client = self._ensure_client()
+                    raw = self._send_and_wait(client, packet, timeout_sec)
+                except (TimeoutError, socket.timeout) as exc:
+                    self._record_failure(exc)
+                    breaker.record_failure(exc)
+                    raise
+                except (OSError, ValueError) as exc:
+                    # Socket error atau stream FINS/TCP rusak: buka ulang koneksi
+                    self._record_failure(exc)
+                    breaker.record_failure(exc)
+                    self._drop_client()
+                    raise
+
+                # PLC menjawab: breaker reset walaupun end code error
+                breaker.record_success()
+                if parse is None:
+                    self._record_success()
+                    return bytes(raw)
+                try:
+                    result = parse(raw)
+                except ValueError as exc:
+                    # Response FINS valid tapi end code error / data kurang: socket tetap dipakai
+                    self._record_failure(exc)
+                    raise
+                self._record_success()
+                return result
+        finally:
+            if probing:
+                # Slot broker tidak didapat / probe batal: request berikutnya boleh probe lagi
+                breaker.release_probe()
+
+    def exchange_many(
+        self,
+        frames: Sequence[bytes],
+        window: Optional[int] = None,
+        default_lane: PLCLane = PLCLane.POLL,
+    ) -> List[Optional[bytes]]:
+        """
+        Pipelined exchange: kirim beberapa frame dengan SID unik, maksimal
+        `window` frame in-flight, lalu cocokkan response berdasarkan SID.
+
+        Returns list response sesuai urutan `frames`. Entry bernilai None jika
+        response tidak datang sebelum timeout; caller bisa mengulang entry
+        tersebut lewat exchange() biasa. Breaker terbuka atau probe gagal
+        raise PLCUnavailableError sebelum frame apa pun dikirim.
+        """
+        results: List[Optional[bytes]] = [None] * len(frames)
+        if not frames:
+            return results
+
+        window = max(1, min(int(window or self.pipeline_window), 64))
+        breaker = get_plc_circuit_breaker()
+        timeout_sec = clip_timeout(self.timeout_sec)
+        probing = breaker.before_request()
+        try:
+            # Satu slot broker untuk seluruh pipeline, token sebanyak jumlah frame
+            with get_plc_io_broker().slot(default_lane, tokens=len(frames)), self._lock:
+                if probing:
+                    self._probe_locked(breaker, timeout_sec)
+                    probing = False
+                self._exchange_many_locked(frames, window, timeout_sec, breaker, results)
+        finally:
+            if probing:
+                breaker.release_probe()
+        return results
+
+    def _exchange_many_locked(
+        self,
+        frames: Sequence[bytes],
+        window: int,
+        timeout_sec: float,
+        breaker: CircuitBreaker,
+        results: List[Optional[bytes]],
+    ) -> None:
+        try:
+            client = self._ensure_client()
+            pending: Dict[int, int] = {}
+            next_index = 0
+
+            while next_index < len(frames) or pending:
+                while next_index < len(frames) and len(pending) < window:
+                    sid = self._next_sid()
+                    client.send(stamp_sid(bytearray(frames[next_index]), sid))
+                    pending[sid] = next_index
+                    next_index += 1
+                    self.total_requests += 1
+
+                try:
+                    raw = self._recv_response(client, timeout_sec)
+                except (TimeoutError, socket.timeout) as exc:
+                    # Tidak ada progress dalam satu timeout: hentikan pipeline,
+                    # sisa request dikembalikan sebagai None.
+                    for _ in pending:
+                        self._record_failure(exc)
+                    breaker.record_failure(exc)
+                    logger.warning(
+                        "FINS pipeline timeout: %s in-flight and %s unsent of %s frames",
+                        len(pending),
+                        len(frames) - next_index,
+                        len(frames),
+                    )
+                    break
+
+                index = pending.pop(parse_response_sid(raw), None)
+                if index is None:
+                    self.stale_discarded += 1
+                    continue
+                # Buffer receive dipakai ulang: simpan salinan
+                results[index] = bytes(raw)
+                self._record_success()
+                breaker.record_success()
+        except (OSError, ValueError) as exc:
+            if not isinstance(exc, (TimeoutError, socket.timeout)):
+                self._record_failure(exc)
+                breaker.record_failure(exc)
+                self._drop_client()
+            logger.warning("FINS pipeline aborted: %s", exc)
+
+    def read_many(
+        self,
+        ranges: Sequence[Tuple[int, int]],
+        area: str = "DM",
+        window: Optional[int] = None,
+    ) -> List[Optional[List[int]]]:
+        """
+        Pipelined Memory Area Read untuk beberapa (address, count).
+
+        Entry bernilai None jika response hilang atau tidak valid.
+        """
+        frames = [
+            build_memory_read_frame(
+                req=MemoryReadRequest(area=area, address=address, count=count),
+                client_node=self.client_node,
+                plc_node=self.plc_node,
+                sid=0x00,
+            )
+            for address, count in ranges
+        ]
+        responses = self.exchange_many(frames, window=window)
+
+        results: List[Optional[List[int]]] = []
+        for (address, count), raw in zip(ranges, responses):
+            if raw is None:
+                results.append(None)
+                continue
+            try:
+                results.append(parse_memory_read_response(raw, expected_count=count))
+            except ValueError as exc:
+                self._record_failure(exc)
+                logger.warning("FINS pipelined read at D%s count=%s invalid: %s", address, count, exc)
+                results.append(None)
+        return results
+
+    def read_words(self, address: int, count: int, area: str = "DM") -> List[int]:
+        """Memory Area Read lewat session bersama."""
+        req = MemoryReadRequest(area=area, address=address, count=count)
+        frame = build_memory_read_frame(
+            req=req,
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        return self.exchange(frame, parse=lambda raw: parse_memory_read_response(raw, expected_count=count))
+
+    def read_multiple(self, addresses: Sequence[int], area: str = "DM") -> List[int]:
+        """
+        Multiple Memory Area Read (0x0104): satu word per address, alamat boleh
+        tersebar. Maksimal MAX_MULTI_READ_ITEMS address per frame; lebih dari
+        itu dipecah ke beberapa frame.
+        """
+        values: List[int] = []
+        for offset in range(0, len(addresses), MAX_MULTI_READ_ITEMS):
+            items = [(area, address) for address in addresses[offset:offset + MAX_MULTI_READ_ITEMS]]
+            frame = build_multiple_memory_read_frame(
+                items=items,
+                client_node=self.client_node,
+                plc_node=self.plc_node,
+                sid=0x00,
+            )
+            values.extend(
+                self.exchange(frame, parse=lambda raw, items=items: parse_multiple_memory_read_response(raw, items))
+            )
+        return values
+
+    def write_words(self, address: int, values: List[int], area: str = "DM") -> None:
+        """Memory Area Write lewat session bersama."""
+        frame = build_memory_write_frame(
+            area=area,
+            address=address,
+            values=values,
+            client_node=self.client_node,
+            plc_node=self.plc_node,
+            sid=0x00,
+        )
+        try:
+            self.exchange(frame, parse=parse_memory_write_response, default_lane=PLCLane.WRITE)
+        finally:
+            # Sukses atau gagal (timeout = status tidak pasti): cache di atas session harus tahu
+            notify_write(area, address, len(values))
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop_client()
+
+    def get_health(self) -> Dict[str, Any]:
+        """Snapshot status session untuk endpoint monitoring."""
+        def _iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {
+            "protocol": self.protocol,
+            "plc_ip": self.ip,
+            "plc_port": self.port,
+            "local_port": self.local_port,
+            "pipeline_window": self.pipeline_window,
+            "connected": self._client is not None and self._client.is_connected,
+            "healthy": self.consecutive_failures == 0,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "reconnects": self.reconnects,
+            "stale_discarded": self.stale_discarded,
+            "opened_at": _iso(self.opened_at),
+            "last_ok_at": _iso(self.last_ok_at),
+            "last_error": self.last_error,
+            "last_error_at": _iso(self.last_error_at),
+        }
+
+
+# Listener write (area, address, count), dipanggil setelah setiap Memory Area Write
+_write_listeners: List[Callable[[str, int, int], None]] = []
+
+
+def add_write_listener(listener: Callable[[str, int, int], None]) -> None:
+    """Daftarkan callback yang dipanggil setiap ada write ke PLC (sync maupun async)."""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def notify_write(area: str, address: int, count: int) -> None:
+    for listener in list(_write_listeners):
+        try:
+            listener(area, address, count)
+        except Exception as exc:
+            logger.warning("PLC write listener failed for %s%s (count=%s): %s", area, address, count, exc)
+
+
+# Singleton instance
+_fins_session: Optional[FinsSession] = None
+_fins_session_lock = threading.Lock()
+
+
+def get_fins_session() -> FinsSession:
+    """Get singleton FinsSession yang di-share semua service PLC."""
+    global _fins_session
+    if _fins_session is None:
+        with _fins_session_lock:
+            if _fins_session is None:
+                settings = get_settings()
+                _fins_session = FinsSession(
+                    ip=settings.plc_ip,
+                    port=settings.plc_port,
+                    timeout_sec=settings.plc_timeout_sec,
+                    client_node=settings.client_node,
+                    plc_node=settings.plc_node,
+                    local_port=settings.plc_local_port,
+                    pipeline_window=settings.plc_pipeline_window,
+                    protocol=settings.plc_protocol,
+                )
+    return _fins_session
+
+
+def close_fins_session() -> None:
+    """Tutup socket session bersama (dipanggil saat shutdown aplikasi)."""
+    if _fins_session is not None:
+        _fins_session.close()
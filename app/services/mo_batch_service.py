@@ -1,7 +1,7 @@
 import re
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Union, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
 
 import json
 
@@ -220,59 +220,106 @@ def write_mo_batch_queue_to_plc(
             "Wait for PLC to read previous data first."
         )
 
-    written = 0
-    plc_slot = start_slot
+    # Slot berurutan di-pack ke block write (BATCH01..BATCH10 = satu frame)
+    written: List[str] = []
     try:
-        for batch in batches:
-            if plc_slot > 30:
-                break
-
-            consumption_val = cast(Optional[NumericValue], batch.consumption)
-            actual_weight_val = cast(
-                Optional[NumericValue], batch.actual_weight_quantity_finished_goods
-            )
-
-            batch_data = {
-                "mo_id": batch.mo_id,
-                "consumption": _to_float(consumption_val),
-                "equipment_id_batch": batch.equipment_id_batch,
-                "finished_goods": batch.finished_goods,
-                "status_manufacturing": bool(batch.status_manufacturing),
-                "status_operation": bool(batch.status_operation),
-                "actual_weight_quantity_finished_goods": (
-                    _to_float(actual_weight_val)
-                ),
-            }
-
-            for letter in "abcdefghijklm":
-                batch_data[f"silo_{letter}"] = getattr(batch, f"silo_{letter}", None)
-                batch_data[f"component_silo_{letter}_name"] = getattr(
-                    batch, f"component_silo_{letter}_name", None
-                )
-                batch_data[f"consumption_silo_{letter}"] = getattr(
-                    batch, f"consumption_silo_{letter}", None
-                )
-
-            batch_data["lq114"] = getattr(batch, "lq114", None) or 114
-            batch_data["lq115"] = getattr(batch, "lq115", None) or 115
-            batch_data["component_lq_tetes_name"] = getattr(batch, "component_lq_tetes_name", None)
-            batch_data["component_lq_fml_name"] = getattr(batch, "component_lq_fml_name", None)
-            batch_data["consumption_lq_tetes"] = getattr(batch, "consumption_lq_tetes", None)
-            batch_data["consumption_lq_fml"] = getattr(batch, "consumption_lq_fml", None)
-
-            plc_service.write_mo_batch_to_plc(
-                batch_data,
-                batch_number=plc_slot,
-                skip_handshake_check=True,
-            )
-            written += 1
-            plc_slot += 1
+        plc_service.write_mo_batches_to_plc(
+            _batch_queue_slots(batches, start_slot),
+            written=written,
+        )
     finally:
         # If any batch has been written, mark WRITE area as unread by PLC.
-        if written > 0:
+        if written:
             handshake.reset_write_area_status()
 
-    return written
+    return len(written)
+
+
+async def write_mo_batch_queue_to_plc_async(
+    db: Session,
+    start_slot: int = 1,
+    limit: int = 30,
+) -> int:
+    """Async variant of write_mo_batch_queue_to_plc (PLC I/O tanpa memblokir event loop)."""
+    if start_slot < 1 or start_slot > 30:
+        raise ValueError(f"start_slot must be 1-30, got {start_slot}")
+
+    if limit < 1:
+        return 0
+
+    batches = (
+        db.query(TableSmoBatch)
+        .order_by(TableSmoBatch.batch_no)
+        .limit(limit)
+        .all()
+    )
+
+    plc_service = get_plc_write_service()
+    handshake = get_handshake_service()
+
+    plc_ready = await handshake.check_write_area_status_async()
+    if not plc_ready:
+        raise RuntimeError(
+            "Cannot write batch queue: PLC handshake not ready (D7076=0). "
+            "Wait for PLC to read previous data first."
+        )
+
+    written: List[str] = []
+    try:
+        await plc_service.write_mo_batches_to_plc_async(
+            _batch_queue_slots(batches, start_slot),
+            written=written,
+        )
+    finally:
+        if written:
+            await handshake.reset_write_area_status_async()
+
+    return len(written)
+
+
+def _batch_queue_slots(
+    batches: List[TableSmoBatch],
+    start_slot: int,
+) -> List[Tuple[Dict[str, Any], int]]:
+    """Pasangkan batch queue ke slot PLC start_slot..30 (sisanya tidak ditulis)."""
+    slots = range(start_slot, 31)
+    return [(_batch_to_plc_write_data(batch), plc_slot) for batch, plc_slot in zip(batches, slots)]
+
+
+def _batch_to_plc_write_data(batch: TableSmoBatch) -> Dict[str, Any]:
+    consumption_val = cast(Optional[NumericValue], batch.consumption)
+    actual_weight_val = cast(
+        Optional[NumericValue], batch.actual_weight_quantity_finished_goods
+    )
+
+    batch_data = {
+        "mo_id": batch.mo_id,
+        "consumption": _to_float(consumption_val),
+        "equipment_id_batch": batch.equipment_id_batch,
+        "finished_goods": batch.finished_goods,
+        "status_manufacturing": bool(batch.status_manufacturing),
+        "status_operation": bool(batch.status_operation),
+        "actual_weight_quantity_finished_goods": (
+            _to_float(actual_weight_val)
+        ),
+    }
+
+    for letter in "abcdefghijklm":
+        batch_data[f"silo_{letter}"] = getattr(batch, f"silo_{letter}", None)
+        batch_data[f"component_silo_{letter}_name"] = getattr(
+            batch, f"component_silo_{letter}_name", None
+        )
+        batch_data[f"consumption_silo_{letter}"] = getattr(
+            batch, f"consumption_silo_{letter}", None
+        )
+
+    batch_data["lq114"] = getattr(batch, "lq114", None) or 114
+    batch_data["lq115"] = getattr(batch, "lq115", None) or 115
+    batch_data["component_lq_tetes_name"] = getattr(batch, "component_lq_tetes_name", None)
+    batch_data["component_lq_fml_name"] = getattr(batch, "component_lq_fml_name", None)
+    batch_data["consumption_lq_tetes"] = getattr(batch, "consumption_lq_tetes", None)
+    batch_data["consumption_lq_fml"] = getattr(batch, "consumption_lq_fml", None)
+    return batch_data
 
 
 def move_finished_batches_to_history(db: Session) -> int:
@@ -7,11 +7,12 @@ Handle proses move dari mo_batch ke mo_histories setelah update ke Odoo.
 
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import select, and_
 from sqlalchemy.orm import Session
 
+from app.db.pagination import encode_cursor, keyset_page
 from app.models.tablesmo_batch import TableSmoBatch
 from app.models.tablesmo_history import TableSmoHistory
 
@@ -364,6 +365,60 @@ class MOHistoryService:
             logger.error(f"Error getting history: {e}")
             return []
 
+    def get_history_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[TableSmoHistory], Optional[str]]:
+        """
+        Get satu halaman history terurut (last_read_from_plc DESC NULLS LAST, id DESC).
+
+        Args:
+            limit: Maximum records to return
+            offset: Offset for pagination (diabaikan jika cursor diisi)
+            cursor: next_cursor dari halaman sebelumnya (keyset pagination)
+            status: Filter by status (optional)
+
+        Returns:
+            (history records, next_cursor); next_cursor None di halaman terakhir
+
+        Raises:
+            ValueError: cursor tidak valid
+        """
+        stmt = select(TableSmoHistory)
+        if status:
+            stmt = stmt.where(TableSmoHistory.status == status)
+
+        if cursor:
+            histories, next_cursor = keyset_page(
+                self.db,
+                stmt,
+                TableSmoHistory.last_read_from_plc,
+                TableSmoHistory.id,
+                limit,
+                cursor=cursor,
+                nullable=True,
+            )
+        else:
+            stmt = (
+                stmt.order_by(
+                    TableSmoHistory.last_read_from_plc.desc().nullslast(),
+                    TableSmoHistory.id.desc(),
+                )
+                .limit(limit + 1)
+                .offset(offset)
+            )
+            histories = list(self.db.execute(stmt).scalars().all())
+            next_cursor = None
+            if len(histories) > limit:
+                histories = histories[:limit]
+                next_cursor = encode_cursor([histories[-1].last_read_from_plc, histories[-1].id])
+
+        logger.info(f"Retrieved {len(histories)} history records")
+        return histories, next_cursor
+
     def get_history_by_mo_id(self, mo_id: str) -> Optional[TableSmoHistory]:
         """
         Get history record by MO ID.
@@ -0,0 +1,260 @@
+"""
+Shared Odoo HTTP Client
+
+Sebelumnya setiap panggilan ke Odoo (update consumption, mark done, cancel,
+equipment failure, fetch MO list) login ulang dan membuat httpx.AsyncClient
+baru: satu auth round trip tambahan per request dan koneksi TCP baru tiap
+kali.
+
+OdooClient menyimpan satu httpx.AsyncClient per event loop dengan:
+- connection pool + keep-alive (ODOO_HTTP_MAX_CONNECTIONS, ODOO_HTTP_MAX_KEEPALIVE)
+- session cookie Odoo yang di-cache di cookie jar client
+- login ulang otomatis saat 401/403 atau response "Session Expired", lalu
+  request diulang satu kali; opsional login ulang proaktif setelah
+  ODOO_SESSION_MAX_AGE_SEC
+- timeout yang bisa dikonfigurasi (ODOO_HTTP_TIMEOUT_SEC, ODOO_HTTP_CONNECT_TIMEOUT_SEC)
+
+Dapatkan lewat `await get_odoo_client()`; ditutup saat shutdown lewat
+close_odoo_clients().
+"""
+import asyncio
+import logging
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Marker di body JSON-RPC Odoo saat session sudah tidak valid (HTTP 200)
+_SESSION_EXPIRED_MARKERS = (b"session expired", b"sessionexpired")
+
+
+class OdooClient:
+    """httpx.AsyncClient bersama dengan session Odoo yang di-cache dan re-auth transparan."""
+
+    def __init__(
+        self,
+        base_url: str,
+        db: str,
+        username: str,
+        password: str,
+        timeout_sec: float = 30.0,
+        connect_timeout_sec: float = 10.0,
+        max_connections: int = 10,
+        max_keepalive: int = 5,
+        keepalive_expiry_sec: float = 60.0,
+        session_max_age_sec: float = 0.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.db = db
+        self.username = username
+        self.password = password
+        self.session_max_age_sec = max(0.0, float(session_max_age_sec))
+
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_sec, connect=connect_timeout_sec),
+            limits=httpx.Limits(
+                max_connections=max(1, int(max_connections)),
+                max_keepalive_connections=max(0, int(max_keepalive)),
+                keepalive_expiry=keepalive_expiry_sec,
+            ),
+        )
+        self._auth_lock = asyncio.Lock()
+        # Naik setiap login sukses; caller yang melihat generation lama tidak login dua kali
+        self._auth_generation = 0
+        self._authenticated_at: Optional[float] = None
+        self.session_info: Dict[str, Any] = {}
+
+        # Counters untuk endpoint status
+        self.total_requests = 0
+        self.total_logins = 0
+        self.reauths = 0
+        self.last_login_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+    def _auth_attempts(self) -> List[Tuple[str, Dict[str, Any]]]:
+        credentials = {"db": self.db, "login": self.username, "password": self.password}
+        return [
+            (f"{self.base_url}/api/scada/authenticate", credentials),
+            (
+                f"{self.base_url}/web/session/authenticate",
+                {"jsonrpc": "2.0", "method": "call", "params": credentials},
+            ),
+        ]
+
+    @property
+    def is_authenticated(self) -> bool:
+        if self._authenticated_at is None:
+            return False
+        if self.session_max_age_sec and time.monotonic() - self._authenticated_at > self.session_max_age_sec:
+            return False
+        return True
+
+    async def authenticate(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Login ke Odoo (SCADA endpoint, fallback /web/session/authenticate).
+
+        Session cookie tersimpan di cookie jar client. Tanpa `force`, login
+        hanya dilakukan jika belum ada session yang valid. Raise RuntimeError
+        jika semua endpoint auth gagal.
+        """
+        generation = self._auth_generation
+        async with self._auth_lock:
+            if not force and self.is_authenticated:
+                return self.session_info
+            if force and generation != self._auth_generation:
+                # Coroutine lain sudah login ulang selagi kita menunggu lock
+                return self.session_info
+            return await self._login()
+
+    async def _login(self) -> Dict[str, Any]:
+        errors: List[str] = []
+        for auth_url, auth_payload in self._auth_attempts():
+            logger.info("Odoo auth attempt: url=%s db=%s user=%s", auth_url, self.db, self.username)
+            try:
+                response = await self._http.post(auth_url, json=auth_payload)
+            except httpx.HTTPError as exc:
+                errors.append(f"{auth_url}: {exc}")
+                logger.warning("Odoo auth attempt failed at %s: %s", auth_url, exc)
+                continue
+
+            if response.status_code >= 400:
+                errors.append(f"{auth_url}: HTTP {response.status_code}")
+                logger.warning("Odoo auth endpoint failed (%s): status=%s", auth_url, response.status_code)
+                continue
+
+            try:
+                auth_data = response.json()
+            except ValueError:
+                errors.append(f"{auth_url}: non-JSON response")
+                continue
+
+            result = auth_data.get("result") or {}
+            status = auth_data.get("status") or result.get("status")
+            if status != "success" and not result.get("uid"):
+                errors.append(f"{auth_url}: {auth_data.get('error') or auth_data}")
+                logger.warning("Odoo auth not successful at %s: %s", auth_url, auth_data)
+                continue
+
+            if self._authenticated_at is not None:
+                self.reauths += 1
+            self._authenticated_at = time.monotonic()
+            self._auth_generation += 1
+            self.total_logins += 1
+            self.last_login_at = datetime.now(timezone.utc)
+            self.session_info = result or auth_data
+            logger.info("Authenticated with Odoo via %s", auth_url)
+            return self.session_info
+
+        self._authenticated_at = None
+        self.last_error = "; ".join(errors)
+        raise RuntimeError(f"Odoo authentication failed: {self.last_error}")
+
+    def invalidate_session(self) -> None:
+        """Paksa login ulang pada request berikutnya."""
+        self._authenticated_at = None
+
+    @staticmethod
+    def _is_session_expired(response: httpx.Response) -> bool:
+        if response.status_code in (401, 403):
+            return True
+        if response.status_code != 200:
+            return False
+        content = response.content.lower()
+        return any(marker in content for marker in _SESSION_EXPIRED_MARKERS)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _url(self, path_or_url: str) -> str:
+        if path_or_url.startswith(("http://", "https://")):
+            return path_or_url
+        return f"{self.base_url}/{path_or_url.lstrip('/')}"
+
+    async def request(self, method: str, path_or_url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Request terautentikasi ke Odoo.
+
+        Login dilakukan sekali dan dipakai ulang; jika Odoo menjawab session
+        expired (401/403 atau error JSON-RPC), login ulang lalu request diulang
+        satu kali.
+        """
+        url = self._url(path_or_url)
+        if not self.is_authenticated:
+            await self.authenticate()
+        generation = self._auth_generation
+
+        self.total_requests += 1
+        response = await self._http.request(method, url, **kwargs)
+        if not self._is_session_expired(response):
+            return response
+
+        logger.info("Odoo session expired (%s %s status=%s), re-authenticating", method, url, response.status_code)
+        async with self._auth_lock:
+            if generation == self._auth_generation:
+                await self._login()
+        self.total_requests += 1
+        return await self._http.request(method, url, **kwargs)
+
+    async def post(self, path_or_url: str, json: Any = None, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", path_or_url, json=json, **kwargs)
+
+    async def get(self, path_or_url: str, params: Any = None, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", path_or_url, params=params, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "authenticated": self.is_authenticated,
+            "session_max_age_sec": self.session_max_age_sec,
+            "total_requests": self.total_requests,
+            "total_logins": self.total_logins,
+            "reauths": self.reauths,
+            "last_login_at": self.last_login_at.isoformat() if self.last_login_at else None,
+            "last_error": self.last_error,
+            "closed": self._http.is_closed,
+        }
+
+
+# One client per event loop (koneksi httpx terikat ke loop pembuatnya)
+_odoo_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OdooClient]" = weakref.WeakKeyDictionary()
+
+
+async def get_odoo_client() -> OdooClient:
+    """Get (lazy) OdooClient bersama untuk event loop yang sedang berjalan."""
+    loop = asyncio.get_running_loop()
+    client = _odoo_clients.get(loop)
+    if client is None or client._http.is_closed:
+        settings = get_settings()
+        client = OdooClient(
+            base_url=settings.odoo_base_url,
+            db=settings.odoo_db,
+            username=settings.odoo_username,
+            password=settings.odoo_password,
+            timeout_sec=settings.odoo_http_timeout_sec,
+            connect_timeout_sec=settings.odoo_http_connect_timeout_sec,
+            max_connections=settings.odoo_http_max_connections,
+            max_keepalive=settings.odoo_http_max_keepalive,
+            keepalive_expiry_sec=settings.odoo_http_keepalive_expiry_sec,
+            session_max_age_sec=settings.odoo_session_max_age_sec,
+        )
+        _odoo_clients[loop] = client
+    return client
+
+
+async def close_odoo_clients() -> None:
+    """Tutup OdooClient milik event loop ini (dipanggil saat shutdown aplikasi)."""
+    client = _odoo_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -24,6 +24,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.models.tablesmo_batch import TableSmoBatch
+from app.services.odoo_client import OdooClient, get_odoo_client
 
 logger = logging.getLogger(__name__)
 
@@ -98,84 +99,20 @@ class OdooConsumptionService:
                 response.text,
             )
 
-    async def _authenticate(self) -> Optional[httpx.AsyncClient]:
+    async def _authenticate(self) -> Optional[OdooClient]:
         """
-        Authenticate dengan Odoo dan return client dengan session cookie.
+        Ambil shared Odoo client yang sudah login.
+
+        Session di-cache di OdooClient; login ulang hanya jika belum ada
+        session atau Odoo menjawab session expired.
 
         Returns:
-            AsyncClient dengan session authenticated, atau None jika gagal
+            OdooClient authenticated, atau None jika gagal
         """
         try:
-            base_url = self.settings.odoo_base_url.rstrip("/")
-            auth_attempts = [
-                (
-                    f"{base_url}/api/scada/authenticate",
-                    {
-                        "db": self.settings.odoo_db,
-                        "login": self.settings.odoo_username,
-                        "password": self.settings.odoo_password,
-                    },
-                ),
-                (
-                    f"{base_url}/web/session/authenticate",
-                    {
-                        "jsonrpc": "2.0",
-                        "method": "call",
-                        "params": {
-                            "db": self.settings.odoo_db,
-                            "login": self.settings.odoo_username,
-                            "password": self.settings.odoo_password,
-                        },
-                    },
-                ),
-            ]
-
-            for auth_url, auth_payload in auth_attempts:
-                logger.info(
-                    "Odoo auth attempt: url=%s db=%s user=%s",
-                    auth_url,
-                    self.settings.odoo_db,
-                    self.settings.odoo_username,
-                )
-
-                try:
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        response = await client.post(auth_url, json=auth_payload)
-                        self._log_odoo_response(auth_url, response)
-
-                        if response.status_code >= 400:
-                            logger.warning(
-                                "Odoo auth endpoint failed (%s): status=%s",
-                                auth_url,
-                                response.status_code,
-                            )
-                            continue
-
-                        auth_data = response.json()
-                        status = auth_data.get("status")
-                        if not status:
-                            status = (auth_data.get("result") or {}).get("status")
-
-                        is_success = status == "success" or bool((auth_data.get("result") or {}).get("uid"))
-                        if not is_success:
-                            logger.warning(
-                                "Odoo auth not successful at %s: %s",
-                                auth_url,
-                                auth_data,
-                            )
-                            continue
-
-                        new_client = httpx.AsyncClient(timeout=30.0)
-                        new_client.cookies.update(response.cookies)
-                        logger.info("✓ Authenticated with Odoo successfully via %s", auth_url)
-                        return new_client
-
-                except Exception as auth_exc:
-                    logger.warning("Odoo auth attempt failed at %s: %s", auth_url, auth_exc)
-
-            logger.error("Authentication failed for all configured Odoo auth endpoints")
-            return None
-
+            client = await get_odoo_client()
+            await client.authenticate()
+            return client
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return None
@@ -369,8 +306,6 @@ class OdooConsumptionService:
                 "success": False,
                 "error": str(e),
             }
-        finally:
-            await client.aclose()
 
     def _convert_scada_tag_to_equipment_code(self, scada_tag: str) -> Optional[str]:
         """
@@ -599,8 +534,6 @@ class OdooConsumptionService:
                 "success": False,
                 "error": str(e),
             }
-        finally:
-            await client.aclose()
 
     def _save_mark_done_to_db(
         self,
@@ -751,8 +684,6 @@ class OdooConsumptionService:
                 "success": False,
                 "error": str(e),
             }
-        finally:
-            await client.aclose()
 
     async def process_batch_consumption(
         self,
@@ -946,11 +877,10 @@ class OdooConsumptionService:
                 "mo_state": str ("cancel" if successful)
             }
         """
-        client = None
         try:
             logger.info(f"Attempting to cancel MO {mo_id} in Odoo...")
             
-            # Authenticate dengan Odoo
+            # Shared Odoo client (session di-cache)
             client = await self._authenticate()
             if not client:
                 return {
@@ -966,7 +896,7 @@ class OdooConsumptionService:
             logger.debug(f"Sending cancel request to Odoo: {cancel_url}")
             logger.debug(f"Payload: {payload}")
             
-            response = await client.post(cancel_url, json=payload, timeout=30.0)
+            response = await client.post(cancel_url, json=payload)
             
             self._log_odoo_response(cancel_url, response)
             
@@ -1008,9 +938,6 @@ class OdooConsumptionService:
                 "error": str(e),
                 "mo_id": mo_id,
             }
-        finally:
-            if client:
-                await client.aclose()
 
     def get_silo_mapping(self) -> Dict[int, Dict[str, str]]:
         """Get current silo mapping"""
@@ -0,0 +1,284 @@
+"""
+PLC Decode Plan
+
+Mapping BATCH_READ_xx di READ_DATA_PLC_MAPPING.json dikompilasi sekali saat
+load menjadi plan immutable: offset di dalam block, jumlah word, tipe data
+(enum), scale, dan normalizer per field, di-index berdasarkan nama field.
+
+Decode per cycle cukup satu pass lurus atas entry yang sudah dihitung, tanpa
+regex parse DM string, upper-case tipe data, atau linear scan mapping.
+
+Setiap plan juga membawa struct.Struct untuk seluruh block (77 word), sehingga
+semua field mentah (INT/REAL 16/32-bit, ASCII bytes) ter-decode dalam satu
+unpack; ASCII difilter lewat bytes.translate.
+"""
+import hashlib
+import logging
+import re
+import struct
+from dataclasses import dataclass, field
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.services.fins_frames import words_to_bytes
+
+logger = logging.getLogger(__name__)
+
+_DM_SINGLE_RE = re.compile(r"D(\d+)")
+_DM_RANGE_RE = re.compile(r"D(\d+)-D?(\d+)")
+_EQUIPMENT_ID_RE = re.compile(r"(?:SILO\s+ID|LQ\s+ID)\s*(\d+)")
+
+# Byte non-printable (di luar 32..126) dibuang saat decode ASCII
+_ASCII_DELETE = bytes(b for b in range(256) if not 32 <= b <= 126)
+
+
+class DataType(str, Enum):
+    BOOLEAN = "BOOLEAN"
+    INT = "INT"
+    REAL = "REAL"
+    ASCII = "ASCII"
+
+    @classmethod
+    def parse(cls, raw: Any) -> "DataType":
+        if isinstance(raw, cls):
+            return raw
+        try:
+            return cls(str(raw or "").strip().upper())
+        except ValueError:
+            raise ValueError(f"Unsupported data type: {raw}") from None
+
+
+class Normalizer(str, Enum):
+    """Hook normalisasi setelah decode mentah (dijalankan oleh PLCReadService)."""
+    NONE = "none"
+    BATCH = "batch"            # BATCH: koreksi byte-swap / fallback ke batch_no
+    EQUIPMENT_ID = "equipment_id"  # SILO/LQ ID: koreksi noise word ke ID yang diharapkan
+    REAL_RANGE = "real_range"  # CONSUMPTION/QUANTITY/WEIGHT: koreksi torn-read/word-order
+    MO_ID = "mo_id"            # NO-MO: ekstrak pola MO ID dari ASCII
+
+
+@dataclass(frozen=True)
+class DecodeEntry:
+    name: str
+    dm: str
+    address: int
+    offset: int
+    count: int
+    data_type: DataType
+    scale: Optional[float]
+    normalizer: Normalizer = Normalizer.NONE
+    expected_id: Optional[int] = None
+    value_limit: Optional[float] = None
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.count
+
+    def slice(self, words: List[int]) -> List[int]:
+        return words[self.offset:self.end]
+
+    def convert_raw(self, raw: Any) -> Any:
+        """Konversi nilai hasil unpack block struct menjadi nilai Python field."""
+        if self.data_type == DataType.ASCII:
+            return decode_ascii_bytes(raw)
+        if self.data_type == DataType.BOOLEAN:
+            return bool(raw)
+        if self.data_type == DataType.REAL:
+            return float(raw) / (self.scale if self.scale else 1.0)
+        return int(raw)
+
+
+@dataclass(frozen=True)
+class BatchDecodePlan:
+    batch_no: int
+    start_address: int
+    word_count: int
+    entries: Tuple[DecodeEntry, ...]
+    # Field yang gagal dikompilasi (DM/tipe tidak valid); di-decode sebagai None
+    invalid_fields: Tuple[str, ...] = ()
+    by_name: Mapping[str, DecodeEntry] = field(default_factory=lambda: MappingProxyType({}))
+    # Struct seluruh block + urutan entry sesuai offset; None jika ada field overlap
+    block_struct: Optional[struct.Struct] = None
+    struct_order: Tuple[int, ...] = ()
+    # Offset word gating untuk two-phase polling (BATCH, NO-MO, status, weight)
+    gate_offsets: Tuple[int, ...] = ()
+
+    def get(self, field_name: str) -> Optional[DecodeEntry]:
+        return self.by_name.get(field_name)
+
+    def decode_block(self, words: List[int]) -> Optional[List[Any]]:
+        """
+        Decode nilai mentah semua entry dalam satu struct unpack.
+
+        Return list sejajar dengan entries, atau None jika block tidak bisa
+        di-decode sekaligus (struct tidak tersedia / panjang block berbeda).
+        """
+        if self.block_struct is None or len(words) != self.word_count:
+            return None
+        try:
+            raw_values = self.block_struct.unpack(words_to_bytes(words))
+        except (OverflowError, TypeError, struct.error):
+            return None
+
+        values: List[Any] = [None] * len(self.entries)
+        for raw, index in zip(raw_values, self.struct_order):
+            values[index] = self.entries[index].convert_raw(raw)
+        return values
+
+
+def block_digest(words: List[int]) -> bytes:
+    """Content hash (blake2b 128-bit) word image satu block untuk change detection."""
+    return hashlib.blake2b(words_to_bytes(words), digest_size=16).digest()
+
+
+def decode_ascii_bytes(raw: bytes) -> str:
+    """Decode ASCII PLC (high byte dulu), hanya karakter printable 32..126."""
+    return raw.translate(None, _ASCII_DELETE).decode("ascii")
+
+
+def _entry_format(entry: DecodeEntry) -> str:
+    """Format struct satu field; word sisa setelah 1/2 word pertama di-skip."""
+    if entry.data_type == DataType.ASCII:
+        return f"{entry.count * 2}s"
+    if entry.data_type == DataType.BOOLEAN or entry.count == 1:
+        code, used = ("h" if entry.data_type == DataType.INT else "H"), 1
+    else:
+        code, used = ("i" if entry.data_type == DataType.INT else "I"), 2
+    pad = (entry.count - used) * 2
+    return code + (f"{pad}x" if pad else "")
+
+
+def _build_block_struct(
+    entries: Tuple[DecodeEntry, ...],
+    word_count: int,
+) -> Tuple[Optional[struct.Struct], Tuple[int, ...]]:
+    order = tuple(sorted(range(len(entries)), key=lambda index: entries[index].offset))
+    parts = [">"]
+    cursor = 0
+    for index in order:
+        entry = entries[index]
+        if entry.offset < cursor:
+            # Field overlap tidak bisa direpresentasikan satu struct; decode per field
+            return (None, ())
+        if entry.offset > cursor:
+            parts.append(f"{(entry.offset - cursor) * 2}x")
+        parts.append(_entry_format(entry))
+        cursor = entry.end
+    if cursor < word_count:
+        parts.append(f"{(word_count - cursor) * 2}x")
+    return (struct.Struct("".join(parts)), order)
+
+
+def _gate_offsets(entries: Tuple[DecodeEntry, ...]) -> Tuple[int, ...]:
+    """
+    Word yang pasti berubah saat batch berganti MO, selesai, gagal, atau sudah
+    di-handshake. Consumption tidak termasuk: 15 REAL x 2 word per batch tidak
+    muat dalam satu frame 0x0104 bersama 10 batch.
+    """
+    offsets = set()
+    for entry in entries:
+        if (
+            entry.normalizer in (Normalizer.BATCH, Normalizer.MO_ID)
+            or entry.data_type == DataType.BOOLEAN
+            or "WEIGHT" in entry.name.upper()
+        ):
+            offsets.update(range(entry.offset, entry.end))
+    return tuple(sorted(offsets))
+
+
+def parse_dm_range(dm_str: str) -> Tuple[int, int]:
+    """Parse DM string ("D6001", "D6001-6008", "D6001-D6008") menjadi (address, count)."""
+    dm_str = dm_str.strip().upper().replace(" ", "")
+
+    if "-" not in dm_str:
+        match = _DM_SINGLE_RE.match(dm_str)
+        if not match:
+            raise ValueError(f"Invalid DM address format: {dm_str}")
+        return (int(match.group(1)), 1)
+
+    match = _DM_RANGE_RE.match(dm_str)
+    if not match:
+        raise ValueError(f"Invalid DM range format: {dm_str}")
+
+    start = int(match.group(1))
+    count = int(match.group(2)) - start + 1
+    if count <= 0:
+        raise ValueError(f"Invalid DM range: {dm_str} (count={count})")
+    return (start, count)
+
+
+def _classify(name: str, data_type: DataType) -> Tuple[Normalizer, Optional[int]]:
+    upper = name.upper()
+    if name == "BATCH":
+        return Normalizer.BATCH, None
+    if data_type == DataType.INT:
+        match = _EQUIPMENT_ID_RE.search(upper)
+        if match:
+            return Normalizer.EQUIPMENT_ID, int(match.group(1))
+    if data_type == DataType.REAL and any(token in upper for token in ("CONSUMPTION", "QUANTITY", "WEIGHT")):
+        return Normalizer.REAL_RANGE, None
+    if data_type == DataType.ASCII and name == "NO-MO":
+        return Normalizer.MO_ID, None
+    return Normalizer.NONE, None
+
+
+def compile_batch_plan(
+    batch_no: int,
+    fields: Iterable[Dict[str, Any]],
+    start_address: int,
+    word_count: int,
+    real_limit_for: Callable[[str], float],
+) -> BatchDecodePlan:
+    """Kompilasi satu mapping BATCH_READ_xx menjadi BatchDecodePlan."""
+    entries: List[DecodeEntry] = []
+    invalid: List[str] = []
+
+    for field_def in fields:
+        name = str(field_def.get("Informasi") or "")
+        if not name:
+            continue
+        try:
+            dm = field_def.get("DM") or field_def.get("DM - Memory")
+            if not isinstance(dm, str) or not dm.strip():
+                raise ValueError(f"Missing DM address in field definition: {field_def}")
+            address, count = parse_dm_range(dm)
+            offset = address - start_address
+            if offset < 0 or offset + count > word_count:
+                raise ValueError(f"Field '{name}' DM={dm} out of snapshot range for batch {batch_no}")
+            data_type = DataType.parse(field_def.get("Data Type", ""))
+        except ValueError as exc:
+            logger.error("Cannot compile READ field '%s' for batch %s: %s", name, batch_no, exc)
+            invalid.append(name)
+            continue
+
+        scale = field_def.get("scale")
+        normalizer, expected_id = _classify(name, data_type)
+        entries.append(
+            DecodeEntry(
+                name=name,
+                dm=dm,
+                address=address,
+                offset=offset,
+                count=count,
+                data_type=data_type,
+                scale=float(scale) if scale not in (None, "") else None,
+                normalizer=normalizer,
+                expected_id=expected_id,
+                value_limit=real_limit_for(name.upper()) if normalizer == Normalizer.REAL_RANGE else None,
+            )
+        )
+
+    compiled = tuple(entries)
+    block_struct, struct_order = _build_block_struct(compiled, word_count)
+    return BatchDecodePlan(
+        batch_no=batch_no,
+        start_address=start_address,
+        word_count=word_count,
+        entries=compiled,
+        invalid_fields=tuple(invalid),
+        by_name=MappingProxyType({entry.name: entry for entry in entries}),
+        block_struct=block_struct,
+        struct_order=struct_order,
+        gate_offsets=_gate_offsets(compiled),
+    )
@@ -8,16 +8,11 @@ import logging
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.config import get_settings
-from app.services.fins_client import FinsUdpClient
-from app.services.fins_frames import (
-    MemoryReadRequest,
-    build_memory_read_frame,
-    parse_memory_read_response,
-)
 from app.services.plc_handshake_service import get_handshake_service
+from app.services.plc_memory_image import get_plc_memory_image
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +51,7 @@ class PLCEquipmentFailureService:
         Examples:
             "D6001" -> (6001, 1)
             "D6001-6008" -> (6001, 8)
+            "D8000-D8007" -> (8000, 8)
         """
         dm_str = dm_str.strip().upper().replace(" ", "")
         
@@ -67,8 +63,8 @@ class PLCEquipmentFailureService:
             address = int(match.group(1))
             return (address, 1)
         
-        # Range address: D6001-6008
-        match = re.match(r"D(\d+)-(\d+)", dm_str)
+        # Range address: D6001-6008 atau D6001-D6008
+        match = re.match(r"D(\d+)-D?(\d+)$", dm_str)
         if not match:
             raise ValueError(f"Invalid DM range format: {dm_str}")
         
@@ -208,65 +204,50 @@ class PLCEquipmentFailureService:
             result = {}
             raw_data = {}
 
-            with FinsUdpClient(
-                ip=self.settings.plc_ip,
-                port=self.settings.plc_port,
-                timeout_sec=self.settings.plc_timeout_sec,
-            ) as client:
-                # Read all addresses dari mapping
-                for field in self.mapping:
-                    field_name = field.get("Informasi", "")
-                    dm_address = field.get("DM - Memory", "")
-                    data_type = field.get("Data Type", "")
-                    length = field.get("length")
-                    scale = field.get("scale")  # Get scale from mapping
+            # Region FAILURE memory image (D8000-D8022 = 1 frame saat stale)
+            ranges: Dict[int, Tuple[int, int]] = {}
+            for index, field in enumerate(self.mapping):
+                dm_address = field.get("DM - Memory", "")
+                if not dm_address:
+                    continue
+                try:
+                    start_addr, word_count = self._parse_dm_address(dm_address)
+                except ValueError as e:
+                    logger.error(f"Error parsing address for {field.get('Informasi', '')}: {e}")
+                    continue
+                ranges[index] = (start_addr, word_count)
+
+            words_by_field = await get_plc_memory_image().read_ranges_async(ranges)
+
+            for index, field in enumerate(self.mapping):
+                field_name = field.get("Informasi", "")
+                data_type = field.get("Data Type", "")
+                length = field.get("length")
+                scale = field.get("scale")  # Get scale from mapping
+
+                words = words_by_field.get(index)
+                if not words:
+                    continue
+
+                try:
+                    # Convert to appropriate data type with scale support
+                    value = self._convert_from_words(words, data_type, length, scale)
+
+                    # Store di result
+                    if field_name:
+                        result[field_name] = value
+                        raw_data[field_name] = {
+                            "value": value,
+                            "data_type": data_type,
+                            "raw_words": words,
+                        }
+
+                    logger.debug(f"✓ Read {field_name}: {value}")
+
+                except Exception as e:
+                    logger.error(f"Error reading {field_name}: {e}")
+                    continue
 
-                    if not dm_address:
-                        continue
-
-                    try:
-                        start_addr, word_count = self._parse_dm_address(dm_address)
-
-                        # Build dan send FINS read request
-                        request = MemoryReadRequest(
-                            area="DM",
-                            address=start_addr,
-                            count=word_count,
-                        )
-
-                        frame = build_memory_read_frame(
-                            request,
-                            client_node=self.settings.client_node,
-                            plc_node=self.settings.plc_node,
-                        )
-
-                        client.send_raw_hex(frame.hex())
-                        response = client.recv()
-
-                        # Parse response
-                        words = parse_memory_read_response(response.raw, word_count)
-                        if not words:
-                            logger.warning(f"Failed to parse response for {field_name}")
-                            continue
-
-                        # Convert to appropriate data type with scale support
-                        value = self._convert_from_words(words, data_type, length, scale)
-
-                        # Store di result
-                        if field_name:
-                            result[field_name] = value
-                            raw_data[field_name] = {
-                                "value": value,
-                                "data_type": data_type,
-                                "raw_words": words,
-                            }
-
-                        logger.debug(f"✓ Read {field_name}: {value}")
-
-                    except Exception as e:
-                        logger.error(f"Error reading {field_name}: {e}")
-                        continue
-            
             # Combine timestamp fields
             equipment_failure_data = {
                 "equipment_code": result.get("equipment_code"),
@@ -289,7 +270,7 @@ class PLCEquipmentFailureService:
 
             # Mark equipment failure area as read only for valid failure event
             handshake = get_handshake_service()
-            handshake.mark_equipment_failure_as_read()  # Set D8022 = 1
+            await handshake.mark_equipment_failure_as_read_async()  # Set D8022 = 1
 
             return equipment_failure_data
         
@@ -26,19 +26,14 @@ import json
 import logging
 from pathlib import Path
 import re
-import socket
-import time
-from typing import Dict, Literal, Optional
+from typing import Any, ContextManager, Dict, Literal, Optional
 
 from app.core.config import get_settings
-from app.services.fins_client import FinsUdpClient
-from app.services.fins_frames import (
-    build_memory_read_frame,
-    build_memory_write_frame,
-    parse_memory_read_response,
-    parse_memory_write_response,
-    MemoryReadRequest,
-)
+from app.services.fins_async_client import get_async_fins_client
+from app.services.fins_session import get_fins_session
+from app.services.plc_io_broker import PLCLane, current_lane, plc_lane
+from app.services.plc_memory_image import get_plc_memory_image
+from app.services.plc_retry_policy import TRANSPORT_ERRORS, get_plc_retry_policy
 
 logger = logging.getLogger(__name__)
 
@@ -111,39 +106,89 @@ class PLCHandshakeService:
         
         Returns:
             True: PLC has read (D7076 = 1), safe to write new batch
-            False: PLC hasn't read yet (D7076 = 0), should NOT write
+            False: PLC hasn't read yet (D7076 = 0) or status unknown, should NOT write
         """
         try:
-            primary_status = self._read_status_flag(self.WRITE_AREA_STATUS_ADDRESS)
+            # D7076 + seluruh status_read_data WRITE dalam satu multi-read frame
+            flags = self.read_all_status_flags()
+            # NO-MO hanya dibutuhkan untuk fallback D7076=0
+            mo_words = self._read_write_mo_words() if flags["write_area"] == 0 else []
+            return self._evaluate_write_area(flags, mo_words)
 
-            if primary_status == 1:
-                logger.info(
-                    "WRITE area handshake: PLC has read batch data (D7076=1). Safe to write."
-                )
-                return True
+        except Exception as exc:
+            logger.error(f"Error checking WRITE area status: {exc}", exc_info=True)
+            # Default to False (safer - don't write if status unknown)
+            return False
 
-            status_map = self._read_all_write_status_flags()
-            occupied_slots = self._get_non_empty_write_mo_slots()
-            has_any_status_read = any(flag == 1 for flag in status_map.values())
+    async def check_write_area_status_async(self) -> bool:
+        """Async variant of check_write_area_status."""
+        try:
+            flags = await self.read_all_status_flags_async()
+            mo_words: list[Optional[list[int]]] = []
+            if flags["write_area"] == 0:
+                with self._handshake_lane():
+                    mo_words = await self._read_words_many_async([field for _, field in self._write_mo_items()])
+            return self._evaluate_write_area(flags, mo_words)
 
-            if not occupied_slots and not has_any_status_read:
-                logger.warning(
-                    "WRITE area handshake: D7076=0 but WRITE queue appears empty/clean "
-                    "(all status_read_data=0 and NO-MO empty). Treating as READY for initial write."
-                )
-                return True
+        except Exception as exc:
+            logger.error(f"Error checking WRITE area status: {exc}", exc_info=True)
+            return False
+
+    def _evaluate_write_area(self, flags: Dict[str, Any], mo_words: list[Optional[list[int]]]) -> bool:
+        """
+        Keputusan WRITE readiness dari hasil read (dipakai versi sync dan async).
+
+        mo_words: word NO-MO per slot, urutan _write_mo_items(); hanya dipakai
+        saat D7076=0.
+        """
+        if flags["write_area"] is None:
+            logger.warning("WRITE area handshake: D7076 unreadable, status unknown. Not writing.")
+            return False
+
+        if flags["write_area"] == 1:
+            logger.info(
+                "WRITE area handshake: PLC has read batch data (D7076=1). Safe to write."
+            )
+            return True
 
+        return self._evaluate_write_area_fallback(flags["write"], self._occupied_write_slots(mo_words))
+
+    def _evaluate_write_area_fallback(
+        self,
+        status_map: Dict[int, Optional[int]],
+        occupied_slots: Optional[list[int]],
+    ) -> bool:
+        """
+        Decide WRITE readiness when D7076=0 from per-slot flags and NO-MO occupancy.
+
+        Flag slot yang None (gagal dibaca) atau occupied_slots None (ada NO-MO
+        yang gagal dibaca) berarti status unknown -> False.
+        """
+        unknown_slots = [batch_no for batch_no, flag in status_map.items() if flag is None]
+        if unknown_slots or occupied_slots is None:
             logger.warning(
-                "WRITE area handshake: not ready (D7076=0). occupied_slots=%s, any_status_read=%s",
-                occupied_slots,
-                has_any_status_read,
+                "WRITE area handshake: D7076=0 and WRITE queue status unknown "
+                "(unreadable status_read_data slots=%s, NO-MO unreadable=%s). Not writing.",
+                unknown_slots,
+                occupied_slots is None,
             )
             return False
 
-        except Exception as exc:
-            logger.error(f"Error checking WRITE area status: {exc}", exc_info=True)
-            # Default to False (safer - don't write if status unknown)
-            return False
+        has_any_status_read = any(flag == 1 for flag in status_map.values())
+
+        if not occupied_slots and not has_any_status_read:
+            logger.warning(
+                "WRITE area handshake: D7076=0 but WRITE queue appears empty/clean "
+                "(all status_read_data=0 and NO-MO empty). Treating as READY for initial write."
+            )
+            return True
+
+        logger.warning(
+            "WRITE area handshake: not ready (D7076=0). occupied_slots=%s, any_status_read=%s",
+            occupied_slots,
+            has_any_status_read,
+        )
+        return False
 
     def _load_write_addresses_from_mapping(self) -> None:
         """Load WRITE status_read_data and NO-MO addresses from MASTER_BATCH_REFERENCE.json."""
@@ -265,66 +310,130 @@ class PLCHandshakeService:
 
     def _read_words(self, address: int, count: int) -> list[int]:
         """Read multiple words from PLC DM area with retry."""
-        max_attempts = 3
-        last_error: Exception | None = None
+        def _attempt() -> list[int]:
+            words = get_fins_session().read_words(address, count)
+            if len(words) != count:
+                raise ValueError(
+                    f"Unexpected word count from D{address}: expected={count}, got={len(words)}"
+                )
+            return words
 
-        for attempt in range(1, max_attempts + 1):
-            try:
-                with FinsUdpClient(
-                    ip=self.settings.plc_ip,
-                    port=self.settings.plc_port,
-                    timeout_sec=self.settings.plc_timeout_sec,
-                ) as client:
-                    request = MemoryReadRequest(area="DM", address=address, count=count)
-                    frame = build_memory_read_frame(
-                        request,
-                        self.settings.client_node,
-                        self.settings.plc_node,
-                        sid=0x00,
-                    )
-
-                    client.send_raw_hex(frame.hex())
-                    response = client.recv()
-                    words = parse_memory_read_response(response.raw, expected_count=count)
-
-                    if len(words) != count:
-                        raise ValueError(
-                            f"Unexpected word count from D{address}: expected={count}, got={len(words)}"
-                        )
-                    return words
-            except (TimeoutError, socket.timeout, ValueError) as exc:
-                last_error = exc
-                if attempt < max_attempts:
-                    logger.warning(
-                        "Handshake multi-read timeout/error at D%s count=%s (attempt %s/%s). Retrying...",
-                        address,
-                        count,
-                        attempt,
-                        max_attempts,
-                    )
-                    time.sleep(0.1)
-                    continue
-                break
+        return get_plc_retry_policy().run(_attempt, f"Handshake read at D{address} (count={count})")
+
+    def _read_words_many(self, ranges: list[tuple[int, int]]) -> list[Optional[list[int]]]:
+        """
+        Coalesced read untuk beberapa (address, count) sekaligus.
 
-        raise RuntimeError(
-            f"Handshake multi-read failed at D{address} (count={count}) after {max_attempts} attempts"
-        ) from last_error
+        Dilayani dari PLC memory image (region WRITE D7000-D7976 dll, satu
+        frame per region saat stale); range di luar region dibaca lewat read
+        planner. Entry yang gagal diulang satu per satu lewat _read_words
+        (dengan retry); entry yang tetap gagal bernilai None.
+        """
+        try:
+            words_by_index = get_plc_memory_image().read_ranges(dict(enumerate(ranges)))
+        except Exception as exc:
+            logger.warning("Handshake planned read failed, falling back to serial: %s", exc)
+            words_by_index = {}
+        results: list[Optional[list[int]]] = [words_by_index.get(index) for index in range(len(ranges))]
 
-    def _read_all_write_status_flags(self) -> Dict[int, int]:
+        for index, (address, count) in enumerate(ranges):
+            if results[index] is not None and len(results[index]) == count:
+                continue
+            try:
+                results[index] = self._read_words(address, count)
+            except Exception as exc:
+                logger.warning("Handshake read failed at D%s count=%s: %s", address, count, exc)
+                results[index] = None
+        return results
+
+    def _read_all_write_status_flags(self) -> Dict[int, Optional[int]]:
         """Read all mapped WRITE status_read_data flags by batch number."""
-        statuses: Dict[int, int] = {}
-        for batch_no, address in sorted(self._write_status_by_batch.items()):
+        return self.read_all_status_flags()["write"]
+
+    def _status_flag_items(self) -> list[tuple[str, Optional[int], int]]:
+        """Semua status word handshake sebagai (group, batch_no, address)."""
+        items: list[tuple[str, Optional[int], int]] = [
+            ("write_area", None, self.WRITE_AREA_STATUS_ADDRESS),
+        ]
+        items.extend(("write", batch_no, address) for batch_no, address in sorted(self._write_status_by_batch.items()))
+        items.extend(
+            ("read", batch_no, self._get_read_status_address(batch_no))
+            for batch_no in range(self.READ_BATCH_MIN, self.READ_BATCH_MAX + 1)
+        )
+        items.append(("equipment_failure", None, self.EQUIPMENT_FAILURE_STATUS_ADDRESS))
+        items.append(("manual_weighing", None, self._manual_weighing_status_address))
+        return items
+
+    def _assemble_status_flags(
+        self,
+        items: list[tuple[str, Optional[int], int]],
+        words: list[Optional[int]],
+    ) -> Dict[str, Any]:
+        """Word yang gagal dibaca (None) tetap None: status unknown, bukan 0."""
+        flags: Dict[str, Any] = {"write_area": None, "write": {}, "read": {}, "equipment_failure": None, "manual_weighing": None}
+        for (group, batch_no, address), word in zip(items, words):
+            value: Optional[int]
+            if word is None:
+                logger.warning("Failed reading %s status_read_data at D%s", group, address)
+                value = None
+            else:
+                value = 1 if word else 0
+            if batch_no is None:
+                flags[group] = value
+            else:
+                flags[group][batch_no] = value
+        return flags
+
+    def read_all_status_flags(self) -> Dict[str, Any]:
+        """
+        Read every handshake status word in one round trip.
+
+        Memakai Multiple Memory Area Read (0x0104) untuk D7076, status WRITE per
+        slot, status READ per batch, D8022, dan status manual weighing. Jika
+        semua word ada di region PLC memory image yang masih fresh, dilayani
+        dari cache tanpa I/O; region stale tidak di-refresh utuh hanya untuk
+        flag. Jika PLC menolak 0x0104, fallback ke coalesced Memory Area Read.
+
+        Returns:
+            {"write_area": 0|1, "write": {batch: 0|1}, "read": {batch: 0|1},
+             "equipment_failure": 0|1, "manual_weighing": 0|1}
+            Word yang gagal dibaca bernilai None (unknown).
+        """
+        items = self._status_flag_items()
+        addresses = [address for _, _, address in items]
+        words: list[Optional[int]]
+        with self._handshake_lane():
+            if self._status_words_fresh_in_image(addresses):
+                words = [
+                    result[0] if result else None
+                    for result in self._read_words_many([(address, 1) for address in addresses])
+                ]
+                return self._assemble_status_flags(items, words)
             try:
-                statuses[batch_no] = self._read_status_flag(address)
+                words = list(self._read_multiple(addresses))
             except Exception as exc:
-                logger.warning(
-                    "Failed reading WRITE status_read_data for batch %s at D%s: %s",
-                    batch_no,
-                    address,
-                    exc,
-                )
-                statuses[batch_no] = 0
-        return statuses
+                logger.warning("Handshake multi-read (0x0104) failed, falling back to range reads: %s", exc)
+                words = [
+                    result[0] if result else None
+                    for result in self._read_words_many([(address, 1) for address in addresses])
+                ]
+        return self._assemble_status_flags(items, words)
+
+    def _status_words_fresh_in_image(self, addresses: list[int]) -> bool:
+        """
+        True jika semua status word ada di region PLC memory image yang masih
+        fresh (umur <= PLC_MEMORY_IMAGE_MAX_AGE_MS), jadi bisa dilayani tanpa I/O.
+        """
+        image = get_plc_memory_image()
+        return all(image.is_fresh(address) for address in addresses)
+
+    def _read_multiple(self, addresses: list[int]) -> list[int]:
+        """Multiple Memory Area Read dengan retry."""
+        return get_plc_retry_policy().run(
+            lambda: get_fins_session().read_multiple(addresses),
+            f"Handshake multi-read of {len(addresses)} address(es)",
+            retry_on=TRANSPORT_ERRORS,
+        )
 
     def _decode_ascii_words(self, words: list[int]) -> str:
         """Decode ASCII words (big-endian 2 chars/word) to trimmed text."""
@@ -334,23 +443,31 @@ class PLCHandshakeService:
             raw_bytes.append(word & 0xFF)
         return raw_bytes.decode("ascii", errors="ignore").replace("\x00", "").strip()
 
-    def _get_non_empty_write_mo_slots(self) -> list[int]:
-        """Return WRITE batch numbers whose NO-MO field is not empty."""
+    def _write_mo_items(self) -> list[tuple[int, tuple[int, int]]]:
+        """WRITE NO-MO field per slot sebagai (batch_no, (address, word_count)), urut batch."""
+        return sorted(self._write_mo_field_by_batch.items())
+
+    def _read_write_mo_words(self) -> list[Optional[list[int]]]:
+        """Read word NO-MO semua slot WRITE (urutan _write_mo_items()); gagal = None."""
+        with self._handshake_lane():
+            return self._read_words_many([field for _, field in self._write_mo_items()])
+
+    def _occupied_write_slots(self, mo_words: list[Optional[list[int]]]) -> Optional[list[int]]:
+        """
+        Return WRITE batch numbers whose NO-MO field is not empty.
+
+        None jika ada NO-MO yang gagal dibaca (occupancy unknown).
+        """
         occupied: list[int] = []
-        for batch_no, (address, word_count) in sorted(self._write_mo_field_by_batch.items()):
-            try:
-                words = self._read_words(address, word_count)
-                mo_text = self._decode_ascii_words(words)
-                if mo_text:
-                    occupied.append(batch_no)
-            except Exception as exc:
-                logger.warning(
-                    "Failed reading WRITE NO-MO for batch %s at D%s: %s",
-                    batch_no,
-                    address,
-                    exc,
-                )
-        return occupied
+        unknown = False
+        for (batch_no, (address, word_count)), words in zip(self._write_mo_items(), mo_words):
+            if words is None:
+                unknown = True
+                logger.warning("Failed reading WRITE NO-MO for batch %s at D%s (count=%s)", batch_no, address, word_count)
+                continue
+            if self._decode_ascii_words(words):
+                occupied.append(batch_no)
+        return None if unknown else occupied
     
     def _get_read_status_address(self, batch_no: int) -> int:
         """Resolve READ status_read_data address for batch number (1..10)."""
@@ -552,6 +669,15 @@ class PLCHandshakeService:
         except Exception as exc:
             logger.error(f"Error resetting equipment failure status: {exc}", exc_info=True)
             return False
+
+    @staticmethod
+    def _handshake_lane() -> ContextManager[None]:
+        """
+        Lane HANDSHAKE untuk read/write flag handshake, kecuali caller sudah memilih
+        lane sendiri (mis. route dashboard memakai DASHBOARD).
+        """
+        return plc_lane(current_lane(PLCLane.HANDSHAKE))
+
     def _read_status_flag(self, address: int) -> int:
         """
         Read a single status flag from PLC.
@@ -562,7 +688,8 @@ class PLCHandshakeService:
         Returns:
             0 or 1 (status flag value)
         """
-        words = self._read_words(address, 1)
+        with self._handshake_lane():
+            words = self._read_words(address, 1)
         if not words:
             raise RuntimeError(f"Handshake read failed: empty response at D{address}")
         return 1 if words[0] != 0 else 0
@@ -578,45 +705,94 @@ class PLCHandshakeService:
         if value not in (0, 1):
             raise ValueError(f"Status flag must be 0 or 1, got {value}")
         
-        max_attempts = 3
-        last_error: Exception | None = None
+        with self._handshake_lane():
+            get_plc_retry_policy().run(
+                lambda: get_fins_session().write_words(address, [value]),
+                f"Handshake write at D{address}",
+                retry_on=TRANSPORT_ERRORS,
+            )
+
+    # ------------------------------------------------------------------
+    # Async variants (dipakai dari coroutine supaya event loop tidak terblokir)
+    # ------------------------------------------------------------------
+    async def _read_words_async(self, address: int, count: int) -> list[int]:
+        client = await get_async_fins_client()
+        words = await client.read_words(address, count)
+        if len(words) != count:
+            raise ValueError(
+                f"Unexpected word count from D{address}: expected={count}, got={len(words)}"
+            )
+        return words
 
-        for attempt in range(1, max_attempts + 1):
+    async def _read_words_many_async(self, ranges: list[tuple[int, int]]) -> list[Optional[list[int]]]:
+        try:
+            words_by_index = await get_plc_memory_image().read_ranges_async(dict(enumerate(ranges)))
+        except Exception as exc:
+            logger.warning("Async handshake planned read failed, falling back per range: %s", exc)
+            client = await get_async_fins_client()
+            return await client.read_many(ranges)
+        return [words_by_index.get(index) for index in range(len(ranges))]
+
+    async def read_all_status_flags_async(self) -> Dict[str, Any]:
+        """Async variant of read_all_status_flags."""
+        items = self._status_flag_items()
+        addresses = [address for _, _, address in items]
+        words: list[Optional[int]]
+        with self._handshake_lane():
+            if self._status_words_fresh_in_image(addresses):
+                words = [
+                    result[0] if result else None
+                    for result in await self._read_words_many_async([(address, 1) for address in addresses])
+                ]
+                return self._assemble_status_flags(items, words)
             try:
-                with FinsUdpClient(
-                    ip=self.settings.plc_ip,
-                    port=self.settings.plc_port,
-                    timeout_sec=self.settings.plc_timeout_sec,
-                ) as client:
-                    frame = build_memory_write_frame(
-                        area="DM",
-                        address=address,
-                        values=[value],
-                        client_node=self.settings.client_node,
-                        plc_node=self.settings.plc_node,
-                        sid=0x00,
-                    )
-
-                    client.send_raw_hex(frame.hex())
-                    response = client.recv()
-                    parse_memory_write_response(response.raw)
-                return
-            except (TimeoutError, socket.timeout) as exc:
-                last_error = exc
-                if attempt < max_attempts:
-                    logger.warning(
-                        "Handshake write timeout at D%s (attempt %s/%s). Retrying...",
-                        address,
-                        attempt,
-                        max_attempts,
-                    )
-                    time.sleep(0.1)
-                    continue
-                break
+                client = await get_async_fins_client()
+                words = list(await client.read_multiple(addresses))
+            except Exception as exc:
+                logger.warning("Async handshake multi-read (0x0104) failed, falling back to range reads: %s", exc)
+                words = [
+                    result[0] if result else None
+                    for result in await self._read_words_many_async([(address, 1) for address in addresses])
+                ]
+        return self._assemble_status_flags(items, words)
+
+    async def _write_status_flag_async(self, address: int, value: int) -> None:
+        if value not in (0, 1):
+            raise ValueError(f"Status flag must be 0 or 1, got {value}")
+        client = await get_async_fins_client()
+        with self._handshake_lane():
+            await client.write_words(address, [value])
+
+    async def mark_read_area_as_read_async(self, batch_no: int = 1) -> bool:
+        """Async variant of mark_read_area_as_read."""
+        try:
+            address = self._get_read_status_address(batch_no)
+            await self._write_status_flag_async(address, 1)
+            logger.info("Marked READ area batch %s as read (D%s=1)", batch_no, address)
+            return True
+        except Exception as exc:
+            logger.error(f"Error marking READ area batch as read: {exc}", exc_info=True)
+            return False
 
-        raise RuntimeError(
-            f"Handshake write timeout at D{address} after {max_attempts} attempts"
-        ) from last_error
+    async def mark_equipment_failure_as_read_async(self) -> bool:
+        """Async variant of mark_equipment_failure_as_read."""
+        try:
+            await self._write_status_flag_async(self.EQUIPMENT_FAILURE_STATUS_ADDRESS, 1)
+            logger.info("Marked equipment failure as read (D8022=1)")
+            return True
+        except Exception as exc:
+            logger.error(f"Error marking equipment failure as read: {exc}", exc_info=True)
+            return False
+
+    async def reset_write_area_status_async(self) -> bool:
+        """Async variant of reset_write_area_status."""
+        try:
+            await self._write_status_flag_async(self.WRITE_AREA_STATUS_ADDRESS, 0)
+            logger.info("Reset WRITE area status (D7076=0)")
+            return True
+        except Exception as exc:
+            logger.error(f"Error resetting WRITE area status: {exc}", exc_info=True)
+            return False
 
 
 # Singleton instance
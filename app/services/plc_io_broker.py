@@ -0,0 +1,400 @@
+"""
+PLC I/O Broker
+
+Satu titik koordinasi untuk semua FINS traffic ke PLC, dari FinsSession
+(sync, thread) maupun AsyncFinsClient (coroutine, per event loop).
+
+- Concurrency dibatasi PLC_BROKER_MAX_IN_FLIGHT exchange sekaligus (gabungan
+  semua transport).
+- Token bucket PLC_BROKER_RATE_PER_SEC / PLC_BROKER_BURST membatasi jumlah
+  frame per detik untuk menjaga beban komunikasi CPU unit.
+- Waiter dilayani per priority lane lalu FIFO: handshake > write > poll >
+  dashboard. Lane dashboard punya batas antrian; request di atas batas
+  langsung ditolak (TimeoutError) supaya refresh storm tidak menumpuk.
+
+Lane dipilih lewat context (plc_lane) dengan default per operasi: write =
+WRITE, read = POLL. Route HTTP read memakai DASHBOARD, flag handshake
+memakai HANDSHAKE.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PLCLane(IntEnum):
+    """Priority lane (nilai kecil = prioritas lebih tinggi)."""
+    HANDSHAKE = 0   # flag handshake READ/WRITE/failure/manual weighing
+    WRITE = 1       # Task 1 / write MO batch ke WRITE area
+    POLL = 2        # read oleh scheduler (Task 2/4/5, scan memory image)
+    DASHBOARD = 3   # read dari route HTTP
+
+
+_current_lane: ContextVar[Optional[PLCLane]] = ContextVar("plc_lane", default=None)
+
+
+@contextmanager
+def plc_lane(lane: PLCLane) -> Iterator[None]:
+    """Jalankan blok dengan lane tertentu untuk semua FINS exchange di dalamnya."""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane(default: PLCLane = PLCLane.POLL) -> PLCLane:
+    lane = _current_lane.get()
+    return default if lane is None else lane
+
+
+@dataclass
+class LaneStats:
+    granted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    max_depth: int = 0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.granted += 1
+        self.wait_total_ms += wait_ms
+        if wait_ms > self.wait_max_ms:
+            self.wait_max_ms = wait_ms
+
+
+class _Waiter:
+    __slots__ = ("lane", "tokens", "enqueued", "granted", "event", "loop", "future")
+
+    def __init__(self, lane: PLCLane, tokens: int) -> None:
+        self.lane = lane
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+
+class PLCIOBroker:
+    """Priority-lane admission control + token bucket untuk FINS exchange."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        rate_per_sec: float = 0.0,
+        burst: int = 1,
+        max_wait_sec: float = 30.0,
+        lane_queue_limits: Optional[Dict[PLCLane, int]] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.rate_per_sec = max(0.0, float(rate_per_sec))
+        self.burst = max(1, int(burst))
+        self.max_wait_sec = max(0.0, float(max_wait_sec))
+        self.lane_queue_limits = dict(lane_queue_limits or {})
+
+        self._lock = threading.Lock()
+        self._queues: Dict[PLCLane, Deque[_Waiter]] = {lane: deque() for lane in PLCLane}
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self._stats: Dict[PLCLane, LaneStats] = {lane: LaneStats() for lane in PLCLane}
+        self.loop_thread_bypass = 0
+        self.loop_thread_blocked_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Token bucket / dispatch (dipanggil dengan _lock)
+    # ------------------------------------------------------------------
+
+    def _refill_locked(self, now: float) -> None:
+        if self.rate_per_sec <= 0:
+            return
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate_per_sec)
+
+    def _take_tokens_locked(self, tokens: int, now: float) -> bool:
+        if self.rate_per_sec <= 0:
+            return True
+        self._refill_locked(now)
+        if self._tokens + 1e-9 >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def _token_delay_locked(self, tokens: int) -> float:
+        return max(0.001, (tokens - self._tokens) / self.rate_per_sec)
+
+    def _head_waiter_locked(self) -> Optional[_Waiter]:
+        for lane in PLCLane:
+            queue = self._queues[lane]
+            if queue:
+                return queue[0]
+        return None
+
+    def _dispatch_locked(self) -> List[_Waiter]:
+        """Grant waiter sesuai prioritas selama slot dan token tersedia."""
+        granted: List[_Waiter] = []
+        now = time.monotonic()
+        while self._in_flight < self.max_in_flight:
+            waiter = self._head_waiter_locked()
+            if waiter is None:
+                break
+            if not self._take_tokens_locked(waiter.tokens, now):
+                # Head-of-line menunggu token; lane lebih rendah tidak boleh mendahului
+                self._schedule_timer_locked(self._token_delay_locked(waiter.tokens))
+                break
+            self._queues[waiter.lane].popleft()
+            self._in_flight += 1
+            waiter.granted = True
+            self._stats[waiter.lane].record_wait((now - waiter.enqueued) * 1000.0)
+            granted.append(waiter)
+        return granted
+
+    def _schedule_timer_locked(self, delay: float) -> None:
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            granted = self._dispatch_locked()
+        self._wake(granted)
+
+    def _wake(self, granted: List[_Waiter]) -> None:
+        for waiter in granted:
+            if waiter.event is not None:
+                waiter.event.set()
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve_future, waiter.future)  # type: ignore[union-attr]
+            except RuntimeError:
+                # Event loop waiter sudah ditutup: kembalikan slot
+                self._release()
+
+    def _enqueue_locked(self, waiter: _Waiter) -> None:
+        limit = self.lane_queue_limits.get(waiter.lane)
+        queue = self._queues[waiter.lane]
+        stats = self._stats[waiter.lane]
+        if limit and limit > 0 and len(queue) >= limit:
+            stats.rejected += 1
+            raise TimeoutError(
+                f"PLC broker queue full for lane {waiter.lane.name} ({len(queue)} waiting)"
+            )
+        queue.append(waiter)
+        if len(queue) > stats.max_depth:
+            stats.max_depth = len(queue)
+
+    def _abandon_locked(self, waiter: _Waiter) -> bool:
+        """Hapus waiter yang timeout/cancel. Return True jika ternyata sudah di-grant."""
+        if waiter.granted:
+            return True
+        try:
+            self._queues[waiter.lane].remove(waiter)
+        except ValueError:
+            pass
+        self._stats[waiter.lane].timed_out += 1
+        return False
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            granted = self._dispatch_locked()
+        self._wake(granted)
+
+    def _new_waiter(self, default_lane: PLCLane, tokens: int) -> _Waiter:
+        return _Waiter(current_lane(default_lane), min(max(1, int(tokens)), self.burst))
+
+    def _timeout_error(self, waiter: _Waiter) -> TimeoutError:
+        return TimeoutError(
+            f"PLC broker wait exceeded {self.max_wait_sec:.1f}s for lane {waiter.lane.name}"
+        )
+
+    # ------------------------------------------------------------------
+    # Sync API (FinsSession)
+    # ------------------------------------------------------------------
+
+    def _acquire_on_loop_thread(self, waiter: _Waiter) -> None:
+        """
+        Caller sync di thread event loop tidak boleh menunggu slot yang dipegang
+        coroutine di loop yang sama (deadlock). Hanya token bucket yang dihormati.
+
+        Menunggu token di sini memang memblok event loop (time.sleep). Ini
+        diterima karena caller yang sama sesudahnya melakukan exchange socket
+        blocking (sampai PLC_TIMEOUT_SEC) di thread ini juga, sedangkan jeda
+        token hanya tokens / PLC_BROKER_RATE_PER_SEC (default 5 ms per frame).
+        Total tunggu dibatasi max_wait_sec (lalu TimeoutError) dan dihitung di
+        loop_thread_blocked_ms. Coroutine sebaiknya memakai AsyncFinsClient.
+        """
+        with self._lock:
+            self.loop_thread_bypass += 1
+            self._in_flight += 1
+        deadline = waiter.enqueued + self.max_wait_sec if self.max_wait_sec else None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._take_tokens_locked(waiter.tokens, now):
+                    self._stats[waiter.lane].record_wait((now - waiter.enqueued) * 1000.0)
+                    return
+                delay = self._token_delay_locked(waiter.tokens)
+                timed_out = deadline is not None and now + delay > deadline
+                if timed_out:
+                    self._stats[waiter.lane].timed_out += 1
+                else:
+                    self.loop_thread_blocked_ms += delay * 1000.0
+            if timed_out:
+                self._release()
+                raise self._timeout_error(waiter)
+            time.sleep(delay)
+
+    def acquire(self, default_lane: PLCLane = PLCLane.POLL, tokens: int = 1) -> None:
+        waiter = self._new_waiter(default_lane, tokens)
+        if _running_loop() is not None:
+            self._acquire_on_loop_thread(waiter)
+            return
+        waiter.event = threading.Event()
+        with self._lock:
+            self._enqueue_locked(waiter)
+            granted = self._dispatch_locked()
+        self._wake(granted)
+        if waiter.event.wait(self.max_wait_sec or None):
+            return
+        with self._lock:
+            if self._abandon_locked(waiter):
+                return
+        raise self._timeout_error(waiter)
+
+    @contextmanager
+    def slot(self, default_lane: PLCLane = PLCLane.POLL, tokens: int = 1) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        self.acquire(default_lane, tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ------------------------------------------------------------------
+    # Async API (AsyncFinsClient)
+    # ------------------------------------------------------------------
+
+    async def acquire_async(self, default_lane: PLCLane = PLCLane.POLL, tokens: int = 1) -> None:
+        waiter = self._new_waiter(default_lane, tokens)
+        waiter.loop = asyncio.get_running_loop()
+        waiter.future = waiter.loop.create_future()
+        with self._lock:
+            self._enqueue_locked(waiter)
+            granted = self._dispatch_locked()
+        self._wake(granted)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait_sec or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                already_granted = self._abandon_locked(waiter)
+            if already_granted:
+                if isinstance(exc, asyncio.CancelledError):
+                    self._release()
+                    raise
+                return
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise self._timeout_error(waiter) from exc
+
+    @asynccontextmanager
+    async def slot_async(self, default_lane: PLCLane = PLCLane.POLL, tokens: int = 1) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+        await self.acquire_async(default_lane, tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill_locked(time.monotonic())
+            now = time.monotonic()
+            lanes = {}
+            for lane in PLCLane:
+                stats = self._stats[lane]
+                queue = self._queues[lane]
+                lanes[lane.name.lower()] = {
+                    "queue_depth": len(queue),
+                    "max_queue_depth": stats.max_depth,
+                    "oldest_wait_ms": round((now - queue[0].enqueued) * 1000.0, 1) if queue else 0.0,
+                    "granted": stats.granted,
+                    "rejected": stats.rejected,
+                    "timed_out": stats.timed_out,
+                    "avg_wait_ms": round(stats.wait_total_ms / stats.granted, 3) if stats.granted else 0.0,
+                    "max_wait_ms": round(stats.wait_max_ms, 3),
+                    "queue_limit": self.lane_queue_limits.get(lane),
+                }
+            return {
+                "enabled": self.enabled,
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "rate_per_sec": self.rate_per_sec,
+                "burst": self.burst,
+                "tokens_available": round(self._tokens, 2) if self.rate_per_sec > 0 else None,
+                "max_wait_sec": self.max_wait_sec,
+                "loop_thread_bypass": self.loop_thread_bypass,
+                "loop_thread_blocked_ms": round(self.loop_thread_blocked_ms, 3),
+                "lanes": lanes,
+            }
+
+
+def _resolve_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_plc_io_broker: Optional[PLCIOBroker] = None
+_plc_io_broker_lock = threading.Lock()
+
+
+def get_plc_io_broker() -> PLCIOBroker:
+    """Get singleton PLC I/O broker (dibagi FinsSession dan semua AsyncFinsClient)."""
+    global _plc_io_broker
+    if _plc_io_broker is None:
+        with _plc_io_broker_lock:
+            if _plc_io_broker is None:
+                settings = get_settings()
+                _plc_io_broker = PLCIOBroker(
+                    max_in_flight=settings.plc_broker_max_in_flight,
+                    rate_per_sec=settings.plc_broker_rate_per_sec,
+                    burst=settings.plc_broker_burst,
+                    max_wait_sec=settings.plc_broker_max_wait_sec,
+                    lane_queue_limits={PLCLane.DASHBOARD: settings.plc_broker_dashboard_max_queue},
+                    enabled=settings.plc_broker_enabled,
+                )
+    return _plc_io_broker
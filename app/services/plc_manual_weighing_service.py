@@ -3,23 +3,20 @@ PLC Manual Weighing Service
 Membaca data penimbangan material manual dari PLC menggunakan ADDITIONAL_EQUIPMENT_REFERENCE.json.
 Includes handshake logic dan sync ke Odoo material consumption API.
 """
+import asyncio
 import json
 import logging
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, TypeVar
 
-import requests
+import httpx
 
 from app.core.config import get_settings
-from app.services.fins_client import FinsUdpClient
-from app.services.fins_frames import (
-    MemoryReadRequest,
-    build_memory_read_frame,
-    parse_memory_read_response,
-)
+from app.services.odoo_client import close_odoo_clients, get_odoo_client
 from app.services.plc_handshake_service import get_handshake_service
+from app.services.plc_memory_image import get_plc_memory_image
 
 logger = logging.getLogger(__name__)
 
@@ -274,27 +271,7 @@ class PLCManualWeighingService:
             start_addr = self._manual_start_addr
             word_count = self._manual_word_count
             
-            with FinsUdpClient(
-                ip=self.settings.plc_ip,
-                port=self.settings.plc_port,
-                timeout_sec=self.settings.plc_timeout_sec,
-            ) as client:
-                read_request = MemoryReadRequest(
-                    area="DM",
-                    address=start_addr,
-                    count=word_count,
-                )
-                
-                frame = build_memory_read_frame(
-                    req=read_request,
-                    client_node=self.settings.client_node,
-                    plc_node=self.settings.plc_node,
-                )
-                
-                client.send_raw_hex(frame.hex())
-                response = client.recv()
-                
-                data_words = parse_memory_read_response(response.raw, word_count)
+            data_words = get_plc_memory_image().read(start_addr, word_count)
             
             # Check handshake flag first (dynamic index from reference)
             handshake_flag = data_words[self._handshake_index]
@@ -389,58 +366,62 @@ class PLCManualWeighingService:
         
         return True, None
     
+    def _build_odoo_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        mo_id = data.get("mo_id", "").strip()
+        product_id = data.get("product_id", data.get("product_tmpl_id", 0))
+        consumption = data.get("consumption", 0)
+        
+        return {
+            "mo_id": mo_id,
+            "product_id": product_id,
+            "product_tmpl_id": product_id,
+            "quantity": consumption,
+            "equipment_id": "WEIGH_SCALE_01",  # Manual weighing station ID
+            "timestamp": data.get("timestamp", datetime.now().isoformat()),
+        }
+    
+    def _check_odoo_response(self, mo_id: str, status_code: int, body: Any, text: str) -> Tuple[bool, Optional[str]]:
+        if status_code != 200:
+            error = body.get("message", text) if isinstance(body, dict) else text
+            logger.error(f"Odoo API error: {error}")
+            return False, f"Odoo sync failed: {error}"
+        
+        result = body.get("result", body) if isinstance(body, dict) else {}
+        if result.get("status") != "success":
+            error = result.get("message", "Unknown error")
+            logger.error(f"Odoo API returned error: {error}")
+            return False, error
+        
+        logger.info(f"Successfully synced weighing data to Odoo for MO: {mo_id}")
+        return True, None
+    
     def sync_to_odoo(self, data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """
         Sync manual weighing data ke Odoo material consumption API.
         
         Uses endpoint: POST /api/scada/material-consumption
         
+        Varian sync untuk script/CLI (tanpa event loop): menjalankan
+        sync_to_odoo_async lewat shared OdooClient di event loop sementara.
+        Dari coroutine pakai sync_to_odoo_async.
+        
         Returns: (sync_success, error_message)
         """
+        return _run_with_odoo_client(self.sync_to_odoo_async(data))
+    
+    async def sync_to_odoo_async(self, data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """Async variant of sync_to_odoo lewat shared OdooClient (login sekali, re-auth otomatis)."""
         try:
-            mo_id = data.get("mo_id", "").strip()
-            product_id = data.get("product_id", data.get("product_tmpl_id", 0))
-            consumption = data.get("consumption", 0)
-            
-            payload = {
-                "mo_id": mo_id,
-                "product_id": product_id,
-                "product_tmpl_id": product_id,
-                "quantity": consumption,
-                "equipment_id": "WEIGH_SCALE_01",  # Manual weighing station ID
-                "timestamp": data.get("timestamp", datetime.now().isoformat()),
-            }
-            
-            # Get session cookies if needed
-            cookies = None
-            session_id = getattr(self.settings, "ODOO_SESSION_ID", None)
-            if session_id:
-                cookies = {"session_id": session_id}
-            
-            # POST to Odoo API
-            endpoint = f"{self.base_url}/api/scada/material-consumption"
-            response = requests.post(
-                endpoint,
-                json=payload,
-                cookies=cookies,
-                timeout=10,
-            )
-            
-            if response.status_code != 200:
-                error = response.json().get("message", response.text)
-                logger.error(f"Odoo API error: {error}")
-                return False, f"Odoo sync failed: {error}"
-            
-            result = response.json()
-            if result.get("status") != "success":
-                error = result.get("message", "Unknown error")
-                logger.error(f"Odoo API returned error: {error}")
-                return False, error
-            
-            logger.info(f"Successfully synced weighing data to Odoo for MO: {mo_id}")
-            return True, None
+            payload = self._build_odoo_payload(data)
+            client = await get_odoo_client()
+            response = await client.post("/api/scada/material-consumption", json=payload)
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            return self._check_odoo_response(payload["mo_id"], response.status_code, body, response.text)
         
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             error = f"Request error: {str(e)}"
             logger.error(error)
             return False, error
@@ -471,13 +452,18 @@ class PLCManualWeighingService:
         """
         Main workflow: Read → Validate → Sync → Mark Handshake.
         
-        This is the primary method called by TASK 5 scheduler.
+        Varian sync (script/CLI) dari read_and_sync_async; Odoo tetap lewat
+        shared OdooClient. Dari coroutine pakai read_and_sync_async.
         
         Returns True jika operation sukses, False jika ada error.
         """
+        return _run_with_odoo_client(self.read_and_sync_async())
+
+    async def read_and_sync_async(self) -> bool:
+        """Read → Validate → Sync → Mark Handshake: PLC read/handshake di thread, Odoo lewat shared OdooClient."""
         try:
             # Step 1: Read data dari PLC
-            weighing_data = self.read_manual_weighing_data()
+            weighing_data = await asyncio.to_thread(self.read_manual_weighing_data)
             if not weighing_data:
                 # No new data or already read
                 return True  # Not an error, just no action needed
@@ -490,14 +476,14 @@ class PLCManualWeighingService:
                 return False
             
             # Step 3: Sync to Odoo
-            sync_ok, sync_error = self.sync_to_odoo(weighing_data)
+            sync_ok, sync_error = await self.sync_to_odoo_async(weighing_data)
             if not sync_ok:
                 logger.error(f"Sync failed: {sync_error}")
                 # Don't mark handshake, keep D9013=0 for retry
                 return False
             
             # Step 4: Mark handshake (only after successful sync)
-            if not self.mark_handshake():
+            if not await asyncio.to_thread(self.mark_handshake):
                 logger.warning("Failed to mark handshake, but Odoo sync was successful")
                 # Even if handshake fails, operation is considered successful
                 # (Odoo has the data, retrying handshake next cycle)
@@ -506,10 +492,32 @@ class PLCManualWeighingService:
             return True
         
         except Exception as e:
-            logger.error(f"Unexpected error in read_and_sync: {e}")
+            logger.error(f"Unexpected error in read_and_sync_async: {e}")
             return False
 
 
+T = TypeVar("T")
+
+
+def _run_with_odoo_client(coro: Coroutine[Any, Any, T]) -> T:
+    """Jalankan coroutine di event loop sementara; OdooClient milik loop itu ditutup setelahnya."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("Called from a running event loop; use the *_async variant instead")
+
+    async def _runner() -> T:
+        try:
+            return await coro
+        finally:
+            await close_odoo_clients()
+
+    return asyncio.run(_runner())
+
+
 # Global instance
 _manual_weighing_service: Optional[PLCManualWeighingService] = None
 
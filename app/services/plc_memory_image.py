@@ -0,0 +1,389 @@
+"""
+PLC Memory Image
+
+Cache bersama untuk word DM PLC dengan staleness terbatas. Region yang
+dikonfigurasi (default: READ D6000-D6976, WRITE D7000-D7976, failure
+D8000-D8022, manual weighing D9000-D9013) dibaca utuh dalam satu frame per
+region, disimpan beserta timestamp-nya, lalu dipakai bersama oleh READ service,
+handshake, equipment failure, manual weighing dan route /plc/read-*.
+
+Caller meminta "word D_x..D_y yang tidak lebih tua dari N ms":
+- hit  -> slice dari image, tanpa I/O
+- miss -> region di-refresh dari PLC (satu frame), lalu di-slice
+
+Koherensi: setiap write lewat FinsSession / AsyncFinsClient meng-invalidate
+region yang overlap (write listener), jadi pembacaan berikutnya pasti refresh.
+invalidate() juga menaikkan version region; refresh yang fetch-nya sudah
+berjalan sebelum write (version berubah) tidak menandai region fresh, supaya
+word sebelum write tidak dipakai ulang sebagai cache.
+Range di luar semua region dibaca langsung (passthrough, tidak di-cache).
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.services.fins_read_planner import (
+    ReadRange,
+    execute_plan,
+    execute_plan_async,
+    plan_reads,
+)
+from app.services.fins_session import add_write_listener
+
+logger = logging.getLogger(__name__)
+
+_REGION_RE = re.compile(r"^(?:(\w+):)?D?(\d+)-D?(\d+)$")
+
+
+@dataclass(eq=False)
+class MemoryRegion:
+    name: str
+    address: int
+    count: int
+    words: Optional[array] = None
+    refreshed_at: float = 0.0  # time.monotonic(); 0 = belum pernah / invalidated
+    refreshed_wall: Optional[datetime] = None
+    hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    version: int = 0  # naik setiap invalidate()
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+    def covers(self, address: int, count: int) -> bool:
+        return self.address <= address and address + count <= self.end
+
+    def overlaps(self, address: int, count: int) -> bool:
+        return address < self.end and self.address < address + count
+
+    def age_ms(self, now: Optional[float] = None) -> Optional[float]:
+        if self.words is None or not self.refreshed_at:
+            return None
+        return ((now or time.monotonic()) - self.refreshed_at) * 1000.0
+
+    def is_fresh(self, max_age_ms: float, now: float) -> bool:
+        age = self.age_ms(now)
+        return age is not None and age <= max_age_ms
+
+    def slice(self, address: int, count: int) -> List[int]:
+        start = address - self.address
+        return self.words[start:start + count].tolist()  # type: ignore[index]
+
+    def store(self, words: Sequence[int], version: int) -> None:
+        """
+        Simpan hasil refresh yang fetch-nya dimulai pada `version`. Jika region
+        di-invalidate sejak itu, words tetap disimpan (untuk caller refresh ini)
+        tapi region dibiarkan stale.
+        """
+        self.words = array("H", words)
+        self.refreshed_at = time.monotonic()
+        self.refreshed_wall = datetime.now(timezone.utc)
+        self.refreshes += 1
+        # Dicek setelah refreshed_at di-set: invalidate() menaikkan version
+        # sebelum me-reset refreshed_at, jadi tidak ada celah di antaranya
+        if self.version != version:
+            self.refreshed_at = 0.0
+
+
+def parse_regions(spec: str) -> List[Tuple[str, int, int]]:
+    """Parse "READ:D6000-D6976,WRITE:D7000-D7976" menjadi [(name, address, count)]."""
+    regions: List[Tuple[str, int, int]] = []
+    for index, token in enumerate(item.strip() for item in spec.split(",")):
+        if not token:
+            continue
+        match = _REGION_RE.match(token.upper().replace(" ", ""))
+        if not match:
+            raise ValueError(f"Invalid memory image region: {token}")
+        start, end = int(match.group(2)), int(match.group(3))
+        if end < start:
+            raise ValueError(f"Invalid memory image region: {token} (end < start)")
+        regions.append((match.group(1) or f"REGION{index + 1}", start, end - start + 1))
+    return regions
+
+
+class PLCMemoryImage:
+    """Image word DM per region dengan staleness terbatas (lihat docstring modul)."""
+
+    def __init__(
+        self,
+        regions: Sequence[Tuple[str, int, int]],
+        default_max_age_ms: float = 500.0,
+        enabled: bool = True,
+    ) -> None:
+        self.regions: List[MemoryRegion] = [
+            MemoryRegion(name=name, address=address, count=count) for name, address, count in regions
+        ]
+        self.default_max_age_ms = float(default_max_age_ms)
+        self.enabled = enabled
+        self.passthrough_reads = 0
+        self._inflight: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+    # ------------------------------------------------------------------
+    # Lookup / invalidation
+    # ------------------------------------------------------------------
+
+    def find_region(self, address: int, count: int) -> Optional[MemoryRegion]:
+        for region in self.regions:
+            if region.covers(address, count):
+                return region
+        return None
+
+    def covers(self, address: int, count: int = 1) -> bool:
+        return self.enabled and self.find_region(address, count) is not None
+
+    def is_fresh(self, address: int, count: int = 1, max_age_ms: Optional[float] = None) -> bool:
+        """True jika range ada di region yang umurnya <= max_age_ms (read tanpa I/O)."""
+        if not self.enabled:
+            return False
+        region = self.find_region(address, count)
+        return region is not None and region.is_fresh(self._max_age(max_age_ms), time.monotonic())
+
+    def invalidate(self, address: Optional[int] = None, count: int = 1) -> None:
+        """Tandai region yang overlap sebagai stale (semua region jika address None)."""
+        for region in self.regions:
+            if address is None or region.overlaps(address, count):
+                region.version += 1
+                region.refreshed_at = 0.0
+
+    def _on_write(self, area: str, address: int, count: int) -> None:
+        if area == "DM":
+            self.invalidate(address, count)
+
+    def _max_age(self, max_age_ms: Optional[float]) -> float:
+        return self.default_max_age_ms if max_age_ms is None else max(float(max_age_ms), 0.0)
+
+    # ------------------------------------------------------------------
+    # Sync API
+    # ------------------------------------------------------------------
+
+    def read(self, address: int, count: int, max_age_ms: Optional[float] = None) -> List[int]:
+        """Word D{address}..D{address+count-1} yang umurnya <= max_age_ms."""
+        return self.read_ranges({0: (address, count)}, max_age_ms=max_age_ms)[0]
+
+    def read_ranges(
+        self,
+        ranges: Dict[Hashable, Tuple[int, int]],
+        max_age_ms: Optional[float] = None,
+    ) -> Dict[Hashable, List[int]]:
+        """
+        Baca beberapa range sekaligus; region stale di-refresh dalam satu
+        ReadPlan (pipelined), range di luar region dibaca langsung.
+        """
+        max_age = self._max_age(max_age_ms)
+        by_region, passthrough = self._classify(ranges)
+        now = time.monotonic()
+        stale = [region for region in by_region if not (self.enabled and region.is_fresh(max_age, now))]
+
+        if stale:
+            locks = sorted(stale, key=lambda region: region.address)
+            for region in locks:
+                region.lock.acquire()
+            try:
+                # Re-check setelah lock: thread lain mungkin sudah refresh
+                now = time.monotonic()
+                stale = [region for region in stale if not (self.enabled and region.is_fresh(max_age, now))]
+                plan_ranges = [ReadRange(key=region.name, address=region.address, count=region.count) for region in stale]
+                plan_ranges += [ReadRange(key=("passthrough", key), address=a, count=c) for key, (a, c) in passthrough.items()]
+                versions = self._versions(stale)
+                fetched = execute_plan(plan_reads(plan_ranges, max_gap=0)) if plan_ranges else {}
+                self._store_fetched(stale, fetched, versions)
+            finally:
+                for region in locks:
+                    region.lock.release()
+        else:
+            fetched = {}
+            if passthrough:
+                fetched = execute_plan(
+                    plan_reads(
+                        [ReadRange(key=("passthrough", key), address=a, count=c) for key, (a, c) in passthrough.items()],
+                        max_gap=0,
+                    )
+                )
+
+        return self._assemble(ranges, by_region, passthrough, stale, fetched)
+
+    def scan(self) -> Dict[str, Any]:
+        """Refresh semua region (bulk scan), return status."""
+        self.read_ranges({region.name: (region.address, region.count) for region in self.regions}, max_age_ms=0)
+        return self.get_status()
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def read_async(self, address: int, count: int, max_age_ms: Optional[float] = None) -> List[int]:
+        return (await self.read_ranges_async({0: (address, count)}, max_age_ms=max_age_ms))[0]
+
+    async def read_ranges_async(
+        self,
+        ranges: Dict[Hashable, Tuple[int, int]],
+        max_age_ms: Optional[float] = None,
+    ) -> Dict[Hashable, List[int]]:
+        """Async variant of read_ranges; refresh region yang sama di-share antar coroutine."""
+        max_age = self._max_age(max_age_ms)
+        by_region, passthrough = self._classify(ranges)
+        now = time.monotonic()
+        stale = [region for region in by_region if not (self.enabled and region.is_fresh(max_age, now))]
+
+        loop = asyncio.get_running_loop()
+        waits: List[asyncio.Future] = []
+        to_fetch: List[MemoryRegion] = []
+        own_future: Optional[asyncio.Future] = None
+        for region in stale:
+            inflight = self._inflight.get(region.name)
+            if inflight is not None and inflight[0] is loop and not inflight[1].done():
+                waits.append(inflight[1])
+            else:
+                to_fetch.append(region)
+
+        fetched: Dict[Hashable, List[int]] = {}
+        if to_fetch or passthrough:
+            own_future = loop.create_future()
+            for region in to_fetch:
+                self._inflight[region.name] = (loop, own_future)
+            plan_ranges = [ReadRange(key=region.name, address=region.address, count=region.count) for region in to_fetch]
+            plan_ranges += [ReadRange(key=("passthrough", key), address=a, count=c) for key, (a, c) in passthrough.items()]
+            versions = self._versions(to_fetch)
+            try:
+                fetched = await execute_plan_async(plan_reads(plan_ranges, max_gap=0))
+                self._store_fetched(to_fetch, fetched, versions)
+                own_future.set_result(True)
+            except BaseException as exc:
+                own_future.set_exception(exc)
+                # Hindari "exception never retrieved" jika tidak ada waiter
+                own_future.exception()
+                raise
+            finally:
+                for region in to_fetch:
+                    if self._inflight.get(region.name, (None, None))[1] is own_future:
+                        self._inflight.pop(region.name, None)
+        if waits:
+            await asyncio.gather(*waits)
+
+        return self._assemble(ranges, by_region, passthrough, stale, fetched)
+
+    async def scan_async(self) -> Dict[str, Any]:
+        await self.read_ranges_async(
+            {region.name: (region.address, region.count) for region in self.regions},
+            max_age_ms=0,
+        )
+        return self.get_status()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _classify(
+        self,
+        ranges: Dict[Hashable, Tuple[int, int]],
+    ) -> Tuple[Dict[MemoryRegion, List[Hashable]], Dict[Hashable, Tuple[int, int]]]:
+        by_region: Dict[MemoryRegion, List[Hashable]] = {}
+        passthrough: Dict[Hashable, Tuple[int, int]] = {}
+        for key, (address, count) in ranges.items():
+            region = self.find_region(address, count) if self.enabled else None
+            if region is None:
+                passthrough[key] = (address, count)
+            else:
+                by_region.setdefault(region, []).append(key)
+        return by_region, passthrough
+
+    @staticmethod
+    def _versions(regions: Sequence[MemoryRegion]) -> Dict[str, int]:
+        """Snapshot version region sebelum fetch dimulai."""
+        return {region.name: region.version for region in regions}
+
+    def _store_fetched(
+        self,
+        regions: Sequence[MemoryRegion],
+        fetched: Dict[Hashable, List[int]],
+        versions: Dict[str, int],
+    ) -> None:
+        for region in regions:
+            words = fetched.get(region.name)
+            if words is not None and len(words) == region.count:
+                region.store(words, versions[region.name])
+
+    def _assemble(
+        self,
+        ranges: Dict[Hashable, Tuple[int, int]],
+        by_region: Dict[MemoryRegion, List[Hashable]],
+        passthrough: Dict[Hashable, Tuple[int, int]],
+        stale: Sequence[MemoryRegion],
+        fetched: Dict[Hashable, List[int]],
+    ) -> Dict[Hashable, List[int]]:
+        stale_names = {region.name for region in stale}
+        result: Dict[Hashable, List[int]] = {}
+        for region, keys in by_region.items():
+            if region.words is None:
+                raise RuntimeError(f"Memory image region {region.name} has no data")
+            if region.name in stale_names:
+                region.misses += len(keys)
+            else:
+                region.hits += len(keys)
+            for key in keys:
+                result[key] = region.slice(*ranges[key])
+        for key in passthrough:
+            self.passthrough_reads += 1
+            result[key] = fetched[("passthrough", key)]
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        regions = []
+        for region in self.regions:
+            age = region.age_ms(now)
+            regions.append(
+                {
+                    "name": region.name,
+                    "range": f"D{region.address}-D{region.end - 1}",
+                    "words": region.count,
+                    "age_ms": round(age, 1) if age is not None else None,
+                    "refreshed_at": region.refreshed_wall.isoformat() if region.refreshed_wall else None,
+                    "hits": region.hits,
+                    "misses": region.misses,
+                    "refreshes": region.refreshes,
+                }
+            )
+        hits = sum(region.hits for region in self.regions)
+        misses = sum(region.misses for region in self.regions)
+        return {
+            "enabled": self.enabled,
+            "default_max_age_ms": self.default_max_age_ms,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "passthrough_reads": self.passthrough_reads,
+            "plc_frames": sum(region.refreshes for region in self.regions),
+            "regions": regions,
+        }
+
+
+_plc_memory_image: Optional[PLCMemoryImage] = None
+_plc_memory_image_lock = threading.Lock()
+
+
+def get_plc_memory_image() -> PLCMemoryImage:
+    """Get singleton PLCMemoryImage (region & staleness dari settings)."""
+    global _plc_memory_image
+    if _plc_memory_image is None:
+        with _plc_memory_image_lock:
+            if _plc_memory_image is None:
+                settings = get_settings()
+                image = PLCMemoryImage(
+                    regions=parse_regions(settings.plc_memory_image_regions),
+                    default_max_age_ms=settings.plc_memory_image_max_age_ms,
+                    enabled=settings.plc_memory_image_enabled,
+                )
+                add_write_listener(image._on_write)
+                _plc_memory_image = image
+    return _plc_memory_image
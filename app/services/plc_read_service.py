@@ -2,21 +2,29 @@
 PLC Read Service
 Uses READ_DATA_PLC_MAPPING.json as PLC memory mapping reference.
 """
+import asyncio
 import json
 import logging
 import re
-import socket
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.config import get_settings
-from app.services.fins_client import FinsUdpClient
-from app.services.fins_frames import (
-    MemoryReadRequest,
-    build_memory_read_frame,
-    parse_memory_read_response,
+from app.services.fins_async_client import get_async_fins_client
+from app.services.fins_frames import words_to_bytes
+from app.services.fins_session import get_fins_session
+from app.services.plc_decode_plan import (
+    BatchDecodePlan,
+    DataType,
+    DecodeEntry,
+    Normalizer,
+    compile_batch_plan,
+    decode_ascii_bytes,
+    parse_dm_range,
 )
+from app.services.plc_memory_image import get_plc_memory_image
+from app.services.plc_retry_policy import budget_exhausted, get_plc_circuit_breaker, get_plc_retry_policy
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +47,7 @@ class PLCReadService:
         # Keep this for backward compatibility (default points to BATCH_READ_01 mapping).
         self.mapping: List[Dict[str, Any]] = []
         self.batch_mappings: Dict[int, List[Dict[str, Any]]] = {}
+        self.decode_plans: Dict[int, BatchDecodePlan] = {}
         self._load_reference()
 
     def _load_reference(self):
@@ -66,6 +75,16 @@ class PLCReadService:
                 self.batch_mappings[batch_no] = []
 
         self.mapping = self.batch_mappings.get(1, [])
+        self.decode_plans = {
+            batch_no: compile_batch_plan(
+                batch_no=batch_no,
+                fields=fields,
+                start_address=self._get_batch_start_address(batch_no),
+                word_count=self.BATCH_WORD_COUNT,
+                real_limit_for=self._get_real_field_limit,
+            )
+            for batch_no, fields in self.batch_mappings.items()
+        }
         logger.info(
             "Loaded PLC read mapping: batches=%s, fields_per_batch=%s",
             len(self.batch_mappings),
@@ -86,42 +105,30 @@ class PLCReadService:
             raise ValueError(f"Mapping for batch_no={batch_no} is empty or missing")
         return mapping
 
+    def _get_decode_plan(self, batch_no: int) -> BatchDecodePlan:
+        batch_no = self._validate_batch_no(batch_no)
+        plan = self.decode_plans.get(batch_no)
+        if plan is None or (not plan.entries and not plan.invalid_fields):
+            raise ValueError(f"Mapping for batch_no={batch_no} is empty or missing")
+        return plan
+
     def _parse_dm_address(self, dm_str: str) -> tuple[int, int]:
         """Parse DM address string into (start_address, word_count)."""
-        dm_str = dm_str.strip().upper().replace(" ", "")
-
-        if "-" not in dm_str:
-            match = re.match(r"D(\d+)", dm_str)
-            if not match:
-                raise ValueError(f"Invalid DM address format: {dm_str}")
-            address = int(match.group(1))
-            return (address, 1)
-
-        match = re.match(r"D(\d+)-D?(\d+)", dm_str)
-        if not match:
-            raise ValueError(f"Invalid DM range format: {dm_str}")
-
-        start = int(match.group(1))
-        end = int(match.group(2))
-        count = end - start + 1
-        if count <= 0:
-            raise ValueError(f"Invalid DM range: {dm_str} (count={count})")
-
-        return (start, count)
+        return parse_dm_range(dm_str)
 
     def _convert_from_words(
         self,
         words: List[int],
-        data_type: str,
+        data_type: DataType | str,
         scale: Optional[float] = None,
     ) -> Any:
         """Convert PLC word values into Python value."""
-        data_type = data_type.upper()
+        data_type = DataType.parse(data_type)
 
-        if data_type == "BOOLEAN":
+        if data_type == DataType.BOOLEAN:
             return bool(words[0]) if words else False
 
-        if data_type == "INT":
+        if data_type == DataType.INT:
             if not words:
                 return 0
             if len(words) >= 2:
@@ -134,7 +141,7 @@ class PLCReadService:
                 raw_value -= 65536
             return int(raw_value)
 
-        if data_type == "REAL":
+        if data_type == DataType.REAL:
             if not words:
                 return 0.0
             if len(words) >= 2:
@@ -144,16 +151,12 @@ class PLCReadService:
             scale = scale if scale else 1.0
             return float(raw_value) / scale
 
-        if data_type == "ASCII":
-            chars = []
-            for word in words:
-                high = (word >> 8) & 0xFF
-                low = word & 0xFF
-                if 32 <= high <= 126:
-                    chars.append(chr(high))
-                if 32 <= low <= 126:
-                    chars.append(chr(low))
-            return "".join(chars).rstrip("\x00")
+        if data_type == DataType.ASCII:
+            try:
+                raw = words_to_bytes(words)
+            except OverflowError:
+                raw = words_to_bytes([word & 0xFFFF for word in words])
+            return decode_ascii_bytes(raw)
 
         raise ValueError(f"Unsupported data type: {data_type}")
 
@@ -165,20 +168,21 @@ class PLCReadService:
         decoded_value: Any,
         emit_log: bool = True,
         anomaly_collector: Optional[List[str]] = None,
+        field_limit: Optional[float] = None,
     ) -> Any:
         """Normalize REAL field values for known PLC torn-read/word-order anomalies."""
         if len(words) < 2 or not isinstance(decoded_value, (int, float)):
             return decoded_value
 
-        field_upper = field_name.upper()
-        if (
-            "CONSUMPTION" not in field_upper
-            and "QUANTITY" not in field_upper
-            and "WEIGHT" not in field_upper
-        ):
-            return decoded_value
-
-        field_limit = self._get_real_field_limit(field_upper)
+        if field_limit is None:
+            field_upper = field_name.upper()
+            if (
+                "CONSUMPTION" not in field_upper
+                and "QUANTITY" not in field_upper
+                and "WEIGHT" not in field_upper
+            ):
+                return decoded_value
+            field_limit = self._get_real_field_limit(field_upper)
 
         scale_value = scale if scale not in (None, 0) else 1.0
         swapped_raw = (words[1] << 16) | words[0]
@@ -241,17 +245,17 @@ class PLCReadService:
         decoded_value: Any,
         emit_log: bool = True,
         anomaly_collector: Optional[List[str]] = None,
+        expected_id: Optional[int] = None,
     ) -> Any:
         """Normalize INT fields for SILO/LQ IDs when PLC word noise appears."""
         if not words:
             return decoded_value
 
-        field_upper = field_name.upper()
-        match = re.search(r"(?:SILO\s+ID|LQ\s+ID)\s*(\d+)", field_upper)
-        if not match:
-            return decoded_value
-
-        expected_id = int(match.group(1))
+        if expected_id is None:
+            match = re.search(r"(?:SILO\s+ID|LQ\s+ID)\s*(\d+)", field_name.upper())
+            if not match:
+                return decoded_value
+            expected_id = int(match.group(1))
         candidate = (
             int(decoded_value)
             if isinstance(decoded_value, (int, float, bool))
@@ -320,34 +324,7 @@ class PLCReadService:
             batch_no = self._validate_batch_no(batch_no)
             start_address = 6000 + ((batch_no - 1) * 100)
             words = self._read_from_plc(start_address, 77)
-
-            chars_hl: List[str] = []
-            chars_lh: List[str] = []
-
-            for word in words:
-                high = (word >> 8) & 0xFF
-                low = word & 0xFF
-
-                for byte in (high, low):
-                    if byte in (0, 0x82):
-                        continue
-                    if 32 <= byte <= 126:
-                        chars_hl.append(chr(byte))
-
-                for byte in (low, high):
-                    if byte in (0, 0x82):
-                        continue
-                    if 32 <= byte <= 126:
-                        chars_lh.append(chr(byte))
-
-            for candidate_text in (
-                "".join(chars_hl),
-                "".join(chars_lh),
-            ):
-                extracted = self._extract_mo_id_candidate(candidate_text)
-                if extracted:
-                    return extracted
-
+            return self._extract_mo_id_from_words(words)
         except Exception as exc:
             logger.debug(
                 "MO_ID batch memory fallback failed for batch=%s: %s",
@@ -357,50 +334,111 @@ class PLCReadService:
 
         return ""
 
-    def _read_from_plc(self, address: int, count: int) -> List[int]:
-        """Low-level PLC read via FINS protocol."""
-        last_error: Exception | None = None
+    def _extract_mo_id_from_words(self, words: List[int]) -> str:
+        """Scan raw block words (both byte orders) for an MO ID pattern."""
+        chars_hl: List[str] = []
+        chars_lh: List[str] = []
 
-        for attempt in range(1, self.MAX_READ_ATTEMPTS + 1):
-            try:
-                with FinsUdpClient(
-                    ip=self.settings.plc_ip,
-                    port=self.settings.plc_port,
-                    timeout_sec=self.settings.plc_timeout_sec,
-                ) as client:
-                    req = MemoryReadRequest(area="DM", address=address, count=count)
-                    frame = build_memory_read_frame(
-                        req=req,
-                        client_node=self.settings.client_node,
-                        plc_node=self.settings.plc_node,
-                        sid=0x00,
-                    )
-                    client.send_raw_hex(frame.hex())
-                    response = client.recv()
-                    return parse_memory_read_response(response.raw, expected_count=count)
-            except (TimeoutError, socket.timeout, ValueError) as exc:
-                last_error = exc
-                if attempt < self.MAX_READ_ATTEMPTS:
-                    logger.warning(
-                        "PLC read retry at D%s (attempt %s/%s): %s",
-                        address,
-                        attempt,
-                        self.MAX_READ_ATTEMPTS,
-                        exc,
-                    )
-                    time.sleep(self.RETRY_DELAY_SEC)
+        for word in words:
+            high = (word >> 8) & 0xFF
+            low = word & 0xFF
+
+            for byte in (high, low):
+                if byte in (0, 0x82):
+                    continue
+                if 32 <= byte <= 126:
+                    chars_hl.append(chr(byte))
+
+            for byte in (low, high):
+                if byte in (0, 0x82):
                     continue
-                break
+                if 32 <= byte <= 126:
+                    chars_lh.append(chr(byte))
 
-        raise RuntimeError(
-            f"PLC read failed at D{address} after {self.MAX_READ_ATTEMPTS} attempts"
-        ) from last_error
+        for candidate_text in (
+            "".join(chars_hl),
+            "".join(chars_lh),
+        ):
+            extracted = self._extract_mo_id_candidate(candidate_text)
+            if extracted:
+                return extracted
+
+        return ""
+
+    def _read_from_plc(self, address: int, count: int) -> List[int]:
+        """Low-level PLC read via FINS protocol (retry lewat PLC RetryPolicy)."""
+        return get_plc_retry_policy().run(
+            lambda: get_fins_session().read_words(address, count),
+            f"PLC read at D{address}",
+        )
+
+    async def _read_from_plc_async(self, address: int, count: int) -> List[int]:
+        """Low-level PLC read via async FINS client (tidak memblokir event loop)."""
+        client = await get_async_fins_client()
+        return await client.read_words(address, count)
+
+    def _read_cached(self, address: int, count: int) -> List[int]:
+        """Read lewat PLC memory image (bounded staleness), fallback ke _read_from_plc."""
+        try:
+            return get_plc_memory_image().read(address, count)
+        except Exception as exc:
+            logger.warning("Memory image read at D%s failed, reading PLC directly: %s", address, exc)
+            return self._read_from_plc(address, count)
+
+    async def _read_cached_async(self, address: int, count: int) -> List[int]:
+        try:
+            return await get_plc_memory_image().read_async(address, count)
+        except Exception as exc:
+            logger.warning("Async memory image read at D%s failed, reading PLC directly: %s", address, exc)
+            return await self._read_from_plc_async(address, count)
 
     def _get_batch_start_address(self, batch_no: int) -> int:
         batch_no = self._validate_batch_no(batch_no)
         return 6000 + ((batch_no - 1) * 100)
 
-    def _read_batch_snapshot_words(self, batch_no: int) -> List[int]:
+    def prefetch_batch_snapshots(
+        self,
+        batch_nos: Optional[List[int]] = None,
+        max_age_ms: Optional[float] = None,
+    ) -> Dict[int, List[int]]:
+        """
+        Read raw READ blocks for several batches from the PLC memory image.
+
+        Region READ (D6000-D6976) di-refresh dalam satu frame jika lebih tua
+        dari max_age_ms (default PLC_MEMORY_IMAGE_MAX_AGE_MS). Hasilnya dipakai sebagai attempt
+        pertama _read_batch_snapshot_words; batch yang tidak ter-prefetch atau
+        gagal validasi snapshot tetap dibaca ulang langsung dari PLC.
+        """
+        try:
+            words_by_batch = get_plc_memory_image().read_ranges(
+                self._batch_snapshot_ranges(batch_nos),
+                max_age_ms=max_age_ms,
+            )
+        except Exception as exc:
+            logger.warning("Planned READ batch prefetch failed: %s", exc)
+            return {}
+        return self._filter_prefetched(words_by_batch)
+
+    def _batch_snapshot_ranges(self, batch_nos: Optional[List[int]]) -> Dict[int, Tuple[int, int]]:
+        if batch_nos is None:
+            batch_nos = list(range(self.BATCH_MIN, self.BATCH_MAX + 1))
+        return {
+            self._validate_batch_no(batch_no): (self._get_batch_start_address(batch_no), self.BATCH_WORD_COUNT)
+            for batch_no in batch_nos
+        }
+
+    def _filter_prefetched(self, words_by_batch: Dict[Any, List[int]]) -> Dict[int, List[int]]:
+        return {
+            batch_no: words
+            for batch_no, words in words_by_batch.items()
+            if len(words) == self.BATCH_WORD_COUNT
+        }
+
+    def _read_batch_snapshot_words(
+        self,
+        batch_no: int,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> List[int]:
         """Read one batch memory block with consistency retry for ASCII fields."""
         start_address = self._get_batch_start_address(batch_no)
         max_snapshot_attempts = max(self.MAX_READ_ATTEMPTS, 4)
@@ -409,7 +447,13 @@ class PLCReadService:
 
         previous_words: Optional[List[int]] = None
         for attempt in range(1, max_snapshot_attempts + 1):
-            current_words = self._read_from_plc(start_address, self.BATCH_WORD_COUNT)
+            if attempt == 1 and prefetched_words:
+                current_words = list(prefetched_words)
+            elif attempt == 1:
+                # Attempt pertama boleh dari memory image; retry selalu langsung ke PLC
+                current_words = self._read_cached(start_address, self.BATCH_WORD_COUNT)
+            else:
+                current_words = self._read_from_plc(start_address, self.BATCH_WORD_COUNT)
             current_score = self._score_batch_snapshot(current_words)
 
             if current_score > best_score:
@@ -431,6 +475,8 @@ class PLCReadService:
 
             previous_words = current_words
             if attempt < max_snapshot_attempts:
+                if self._snapshot_retry_blocked():
+                    break
                 logger.debug(
                     "Low-quality batch snapshot for batch=%s (score=%s, attempt %s/%s). Retrying...",
                     batch_no,
@@ -442,9 +488,62 @@ class PLCReadService:
 
         return best_words if best_words else []
 
-    def _read_batch_snapshot_with_quality(self, batch_no: int) -> tuple[List[int], int, bool]:
+    async def _read_batch_snapshot_words_async(
+        self,
+        batch_no: int,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> List[int]:
+        """Async variant of _read_batch_snapshot_words (same acceptance rules)."""
+        start_address = self._get_batch_start_address(batch_no)
+        max_snapshot_attempts = max(self.MAX_READ_ATTEMPTS, 4)
+        best_words: List[int] = []
+        best_score = -1
+
+        for attempt in range(1, max_snapshot_attempts + 1):
+            if attempt == 1 and prefetched_words:
+                current_words = list(prefetched_words)
+            elif attempt == 1:
+                current_words = await self._read_cached_async(start_address, self.BATCH_WORD_COUNT)
+            else:
+                current_words = await self._read_from_plc_async(start_address, self.BATCH_WORD_COUNT)
+            current_score = self._score_batch_snapshot(current_words)
+
+            if current_score > best_score:
+                best_score = current_score
+                best_words = current_words
+
+            if self._is_strict_snapshot_valid(current_words):
+                return current_words
+
+            if attempt < max_snapshot_attempts:
+                if self._snapshot_retry_blocked():
+                    break
+                logger.debug(
+                    "Low-quality batch snapshot for batch=%s (score=%s, attempt %s/%s). Retrying...",
+                    batch_no,
+                    current_score,
+                    attempt,
+                    max_snapshot_attempts,
+                )
+                await asyncio.sleep(self.RETRY_DELAY_SEC)
+
+        return best_words if best_words else []
+
+    def _snapshot_retry_blocked(self) -> bool:
+        """Retry kualitas snapshot berhenti saat cycle budget habis atau breaker PLC terbuka."""
+        return budget_exhausted() or get_plc_circuit_breaker().is_open
+
+    def _read_batch_snapshot_with_quality(
+        self,
+        batch_no: int,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> tuple[List[int], int, bool]:
         """Read one batch snapshot with quality metadata."""
-        snapshot_words = self._read_batch_snapshot_words(batch_no)
+        snapshot_words = self._read_batch_snapshot_words(batch_no, prefetched_words=prefetched_words)
+        return self._assess_snapshot_quality(batch_no, snapshot_words)
+
+    def _assess_snapshot_quality(self, batch_no: int, snapshot_words: List[int]) -> tuple[List[int], int, bool]:
+        """Attach score/strict-validity metadata to an already-read snapshot."""
         if not snapshot_words:
             return ([], -1, False)
 
@@ -526,19 +625,18 @@ class PLCReadService:
         if isinstance(finished_goods, str) and len(finished_goods.strip()) >= 4:
             score += 1
 
+        plan = self.decode_plans.get(1)
         for consumption_field in (
             "SILO ID 101 Consumption",
             "SILO ID 102 Consumption",
         ):
             try:
-                field_def = next(
-                    item
-                    for item in self._get_batch_mapping(1)
-                    if str(item.get("Informasi") or "") == consumption_field
-                )
-                value = self._decode_field_from_snapshot(
+                entry = plan.get(consumption_field) if plan else None
+                if entry is None:
+                    raise ValueError(f"Field '{consumption_field}' not in decode plan")
+                value = self._decode_entry(
                     words=words,
-                    field_def=field_def,
+                    entry=entry,
                     batch_no=1,
                     anomaly_collector=[],
                 )
@@ -587,48 +685,79 @@ class PLCReadService:
 
         return silos, liquids
 
-    def _decode_field_from_snapshot(
+    def _decode_entry(
         self,
         words: List[int],
-        field_def: Dict[str, Any],
+        entry: DecodeEntry,
         batch_no: int,
         anomaly_collector: Optional[List[str]] = None,
+        emit_log: Optional[bool] = None,
     ) -> Any:
-        field_name = str(field_def.get("Informasi") or "")
-        dm_str = self._resolve_dm_string(field_def)
-        address, word_count = self._parse_dm_address(dm_str)
-
-        start_address = self._get_batch_start_address(batch_no)
-        start_index = address - start_address
-        end_index = start_index + word_count
-        if start_index < 0 or end_index > len(words):
+        """Decode one precompiled field from a batch snapshot block."""
+        if entry.end > len(words):
             raise ValueError(
-                f"Field '{field_name}' DM={dm_str} out of snapshot range for batch {batch_no}"
+                f"Field '{entry.name}' DM={entry.dm} out of snapshot range for batch {batch_no}"
             )
+        return self._decode_entry_words(
+            entry.slice(words),
+            entry,
+            batch_no,
+            anomaly_collector=anomaly_collector,
+            emit_log=emit_log,
+        )
 
-        slice_words = words[start_index:end_index]
-        data_type = str(field_def.get("Data Type", ""))
-        scale = field_def.get("scale")
-        value = self._convert_from_words(slice_words, data_type, scale)
-        if data_type.upper() == "INT" and field_name != "BATCH":
+    def _decode_entry_words(
+        self,
+        slice_words: List[int],
+        entry: DecodeEntry,
+        batch_no: int,
+        anomaly_collector: Optional[List[str]] = None,
+        emit_log: Optional[bool] = None,
+    ) -> Any:
+        """Convert + normalize words of one field according to its decode entry."""
+        value = self._convert_from_words(slice_words, entry.data_type, entry.scale)
+        return self._normalize_entry_value(
+            slice_words,
+            entry,
+            value,
+            batch_no,
+            anomaly_collector=anomaly_collector,
+            emit_log=emit_log,
+        )
+
+    def _normalize_entry_value(
+        self,
+        slice_words: List[int],
+        entry: DecodeEntry,
+        value: Any,
+        batch_no: int,
+        anomaly_collector: Optional[List[str]] = None,
+        emit_log: Optional[bool] = None,
+    ) -> Any:
+        """Apply the entry normalizer to an already converted value."""
+        if emit_log is None:
+            emit_log = anomaly_collector is None
+
+        if entry.normalizer == Normalizer.EQUIPMENT_ID:
             value = self._normalize_int_field_value(
                 slice_words,
-                field_name,
+                entry.name,
                 value,
-                emit_log=anomaly_collector is None,
+                emit_log=emit_log,
                 anomaly_collector=anomaly_collector,
+                expected_id=entry.expected_id,
             )
-        if data_type.upper() == "REAL":
+        elif entry.normalizer == Normalizer.REAL_RANGE:
             value = self._normalize_real_field_value(
                 slice_words,
-                scale,
-                field_name,
+                entry.scale,
+                entry.name,
                 value,
-                emit_log=anomaly_collector is None,
+                emit_log=emit_log,
                 anomaly_collector=anomaly_collector,
+                field_limit=entry.value_limit,
             )
-
-        if field_name == "BATCH" and slice_words:
+        elif entry.normalizer == Normalizer.BATCH and slice_words:
             raw_word = int(slice_words[0]) & 0xFFFF
             batch_candidate = int(value) if isinstance(value, (int, float, bool)) else raw_word
             if batch_candidate < self.BATCH_MIN or batch_candidate > self.BATCH_MAX:
@@ -640,58 +769,39 @@ class PLCReadService:
                 else:
                     value = batch_no
 
-        if data_type.upper() == "ASCII" and field_name == "NO-MO":
-            extracted = self._extract_mo_id_candidate(value)
-            if extracted:
-                value = extracted
-
         return value
 
-    def read_field(self, field_name: str, batch_no: int = 1) -> Any:
-        """Read one field from a specific READ batch area."""
-        mapping = self._get_batch_mapping(batch_no)
-
-        field_def: Optional[Dict[str, Any]] = None
-        for item in mapping:
-            if item.get("Informasi") == field_name:
-                field_def = item
-                break
+    def _decode_field_from_snapshot(
+        self,
+        words: List[int],
+        field_def: Dict[str, Any],
+        batch_no: int,
+        anomaly_collector: Optional[List[str]] = None,
+    ) -> Any:
+        """Decode one raw mapping field from a snapshot (compat wrapper over the decode plan)."""
+        entry = self._find_field_entry(str(field_def.get("Informasi") or ""), batch_no)
+        value = self._decode_entry(words, entry, batch_no, anomaly_collector=anomaly_collector)
+        if entry.normalizer == Normalizer.MO_ID:
+            value = self._extract_mo_id_candidate(value) or value
+        return value
 
-        if not field_def:
+    def _find_field_entry(self, field_name: str, batch_no: int) -> DecodeEntry:
+        entry = self._get_decode_plan(batch_no).get(field_name)
+        if entry is None:
             raise ValueError(
                 f"Field '{field_name}' not found in mapping for batch_no={batch_no}"
             )
+        return entry
 
-        dm_str = self._resolve_dm_string(field_def)
-        address, word_count = self._parse_dm_address(dm_str)
+    def read_field(self, field_name: str, batch_no: int = 1) -> Any:
+        """Read one field from a specific READ batch area."""
+        entry = self._find_field_entry(field_name, batch_no)
+        address, word_count = entry.address, entry.count
         words = self._read_from_plc(address, word_count)
 
-        data_type = str(field_def.get("Data Type", ""))
-        scale = field_def.get("scale")
-        value = self._convert_from_words(words, data_type, scale)
-        if data_type.upper() == "INT" and field_name != "BATCH":
-            value = self._normalize_int_field_value(words, field_name, value)
-        if data_type.upper() == "REAL":
-            value = self._normalize_real_field_value(
-                words,
-                scale,
-                field_name,
-                value,
-            )
-
-        if field_name == "BATCH" and words:
-            raw_word = int(words[0]) & 0xFFFF
-            batch_candidate = int(value) if isinstance(value, (int, float, bool)) else raw_word
-            if batch_candidate < self.BATCH_MIN or batch_candidate > self.BATCH_MAX:
-                swapped = ((raw_word & 0x00FF) << 8) | ((raw_word & 0xFF00) >> 8)
-                if self.BATCH_MIN <= swapped <= self.BATCH_MAX:
-                    value = swapped
-                elif self.BATCH_MIN <= raw_word <= self.BATCH_MAX:
-                    value = raw_word
-                else:
-                    value = batch_no
+        value = self._decode_entry_words(words, entry, batch_no)
 
-        if data_type.upper() == "ASCII" and field_name == "NO-MO":
+        if entry.normalizer == Normalizer.MO_ID:
             normalized_value = value.strip() if isinstance(value, str) else ""
             if not normalized_value:
                 for retry_attempt in range(1, self.MAX_READ_ATTEMPTS):
@@ -704,7 +814,7 @@ class PLCReadService:
                     )
                     time.sleep(self.RETRY_DELAY_SEC)
                     retry_words = self._read_from_plc(address, word_count)
-                    retry_value = self._convert_from_words(retry_words, data_type, scale)
+                    retry_value = self._convert_from_words(retry_words, entry.data_type, entry.scale)
                     normalized_retry = (
                         retry_value.strip() if isinstance(retry_value, str) else ""
                     )
@@ -723,53 +833,185 @@ class PLCReadService:
             "Read batch=%s field=%s DM=%s words=%s value=%s",
             batch_no,
             field_name,
-            dm_str,
+            entry.dm,
             words,
             value,
         )
         return value
 
+    async def read_field_async(self, field_name: str, batch_no: int = 1) -> Any:
+        """Async variant of read_field."""
+        entry = self._find_field_entry(field_name, batch_no)
+        address, word_count = entry.address, entry.count
+        words = await self._read_from_plc_async(address, word_count)
+
+        value = self._decode_entry_words(words, entry, batch_no)
+
+        if entry.normalizer == Normalizer.MO_ID:
+            normalized_value = value.strip() if isinstance(value, str) else ""
+            if not normalized_value:
+                for retry_attempt in range(1, self.MAX_READ_ATTEMPTS):
+                    logger.warning(
+                        "NO-MO empty at batch=%s D%s. Retrying ASCII read (%s/%s)",
+                        batch_no,
+                        address,
+                        retry_attempt,
+                        self.MAX_READ_ATTEMPTS - 1,
+                    )
+                    await asyncio.sleep(self.RETRY_DELAY_SEC)
+                    retry_words = await self._read_from_plc_async(address, word_count)
+                    retry_value = self._convert_from_words(retry_words, entry.data_type, entry.scale)
+                    if isinstance(retry_value, str) and retry_value.strip():
+                        words = retry_words
+                        value = retry_value
+                        break
+
+            extracted = self._extract_mo_id_candidate(value)
+            if not extracted:
+                try:
+                    block = await self._read_from_plc_async(
+                        self._get_batch_start_address(batch_no),
+                        self.BATCH_WORD_COUNT,
+                    )
+                    extracted = self._extract_mo_id_from_words(block)
+                except Exception as exc:
+                    logger.debug(
+                        "MO_ID batch memory fallback failed for batch=%s: %s",
+                        batch_no,
+                        exc,
+                    )
+            if extracted:
+                value = extracted
+
+        return value
+
     def read_all_fields(self, batch_no: int = 1) -> Dict[str, Any]:
         """Read all fields for one batch."""
         all_fields, _, _, _ = self._read_all_fields_with_quality(batch_no=batch_no)
         return all_fields
 
-    def _read_all_fields_with_quality(self, batch_no: int = 1) -> tuple[Dict[str, Any], int, bool, List[str]]:
+    def _read_all_fields_with_quality(
+        self,
+        batch_no: int = 1,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> tuple[Dict[str, Any], int, bool, List[str]]:
         """Read all fields plus snapshot quality metadata."""
-        mapping = self._get_batch_mapping(batch_no)
+        snapshot_words, snapshot_score, strict_valid = self._read_batch_snapshot_with_quality(
+            batch_no,
+            prefetched_words=prefetched_words,
+        )
+        result, anomalies = self._decode_all_fields(batch_no, snapshot_words)
+        return (result, snapshot_score, strict_valid, anomalies)
+
+    async def _read_all_fields_with_quality_async(
+        self,
+        batch_no: int = 1,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> tuple[Dict[str, Any], int, bool, List[str]]:
+        """Async variant of _read_all_fields_with_quality."""
+        raw_words = await self._read_batch_snapshot_words_async(batch_no, prefetched_words=prefetched_words)
+        snapshot_words, snapshot_score, strict_valid = self._assess_snapshot_quality(batch_no, raw_words)
+        result, anomalies = self._decode_all_fields(batch_no, snapshot_words)
+        return (result, snapshot_score, strict_valid, anomalies)
+
+    def _decode_all_fields(self, batch_no: int, snapshot_words: List[int]) -> tuple[Dict[str, Any], List[str]]:
+        """Decode every mapped field from one snapshot (pure, no PLC I/O)."""
+        plan = self._get_decode_plan(batch_no)
         result: Dict[str, Any] = {}
         anomalies: List[str] = []
-        snapshot_words, snapshot_score, strict_valid = self._read_batch_snapshot_with_quality(batch_no)
 
         if not snapshot_words:
-            return (result, -1, False, anomalies)
+            return (result, anomalies)
 
-        for field_def in mapping:
-            field_name = field_def.get("Informasi")
-            if not field_name:
-                continue
+        # Satu struct unpack untuk seluruh block; None -> fallback decode per field
+        block_values = plan.decode_block(snapshot_words)
+
+        for index, entry in enumerate(plan.entries):
             try:
-                result[field_name] = self._decode_field_from_snapshot(
-                    snapshot_words,
-                    field_def,
-                    batch_no,
-                    anomaly_collector=anomalies,
-                )
+                if block_values is None:
+                    value = self._decode_entry(
+                        snapshot_words,
+                        entry,
+                        batch_no,
+                        anomaly_collector=anomalies,
+                    )
+                elif entry.normalizer in (Normalizer.NONE, Normalizer.MO_ID):
+                    value = block_values[index]
+                else:
+                    value = self._normalize_entry_value(
+                        entry.slice(snapshot_words),
+                        entry,
+                        block_values[index],
+                        batch_no,
+                        anomaly_collector=anomalies,
+                    )
+                if entry.normalizer == Normalizer.MO_ID:
+                    value = self._extract_mo_id_candidate(value) or value
+                result[entry.name] = value
             except Exception as exc:
                 logger.error(
                     "Error reading field '%s' for batch %s: %s",
-                    field_name,
+                    entry.name,
                     batch_no,
                     exc,
                 )
-                result[str(field_name)] = None
+                result[entry.name] = None
 
-        return (result, snapshot_score, strict_valid, anomalies)
+        for field_name in plan.invalid_fields:
+            result[field_name] = None
+
+        return (result, anomalies)
 
-    def read_batch_data(self, batch_no: int = 1) -> Dict[str, Any]:
+    async def read_all_fields_async(self, batch_no: int = 1) -> Dict[str, Any]:
+        """Async variant of read_all_fields."""
+        all_fields, _, _, _ = await self._read_all_fields_with_quality_async(batch_no=batch_no)
+        return all_fields
+
+    def read_batch_data(
+        self,
+        batch_no: int = 1,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
         """Read and format one batch payload from PLC."""
-        all_fields, snapshot_score, strict_valid, anomalies = self._read_all_fields_with_quality(batch_no=batch_no)
+        all_fields, snapshot_score, strict_valid, anomalies = self._read_all_fields_with_quality(
+            batch_no=batch_no,
+            prefetched_words=prefetched_words,
+        )
+        return self._build_batch_payload(batch_no, all_fields, snapshot_score, strict_valid, anomalies)
 
+    async def read_batch_data_async(
+        self,
+        batch_no: int = 1,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of read_batch_data."""
+        payload, _ = await self.read_batch_data_with_snapshot_async(batch_no, prefetched_words)
+        return payload
+
+    async def read_batch_data_with_snapshot_async(
+        self,
+        batch_no: int = 1,
+        prefetched_words: Optional[List[int]] = None,
+    ) -> tuple[Dict[str, Any], List[int]]:
+        """
+        read_batch_data_async plus word snapshot yang benar-benar di-decode
+        (setelah retry kualitas, bisa berbeda dari prefetched_words).
+        """
+        raw_words = await self._read_batch_snapshot_words_async(batch_no, prefetched_words=prefetched_words)
+        snapshot_words, snapshot_score, strict_valid = self._assess_snapshot_quality(batch_no, raw_words)
+        all_fields, anomalies = self._decode_all_fields(batch_no, snapshot_words)
+        payload = self._build_batch_payload(batch_no, all_fields, snapshot_score, strict_valid, anomalies)
+        return payload, snapshot_words
+
+    def _build_batch_payload(
+        self,
+        batch_no: int,
+        all_fields: Dict[str, Any],
+        snapshot_score: int,
+        strict_valid: bool,
+        anomalies: List[str],
+    ) -> Dict[str, Any]:
+        """Format decoded fields into the batch payload (pure, no PLC I/O)."""
         parsed_batch_no = all_fields.get("BATCH", batch_no)
         try:
             parsed_batch_no = int(parsed_batch_no) if parsed_batch_no is not None else batch_no
@@ -848,8 +1090,64 @@ class PLCReadService:
     def read_all_batches_data(self) -> Dict[int, Dict[str, Any]]:
         """Read and format all batch payloads (1..10)."""
         result: Dict[int, Dict[str, Any]] = {}
+        prefetched = self.prefetch_batch_snapshots()
         for batch_no in range(self.BATCH_MIN, self.BATCH_MAX + 1):
-            result[batch_no] = self.read_batch_data(batch_no=batch_no)
+            result[batch_no] = self.read_batch_data(
+                batch_no=batch_no,
+                prefetched_words=prefetched.get(batch_no),
+            )
+        return result
+
+    async def prefetch_batch_snapshots_async(
+        self,
+        batch_nos: Optional[List[int]] = None,
+        max_age_ms: Optional[float] = None,
+    ) -> Dict[int, List[int]]:
+        """Async variant of prefetch_batch_snapshots (same memory image)."""
+        try:
+            words_by_batch = await get_plc_memory_image().read_ranges_async(
+                self._batch_snapshot_ranges(batch_nos),
+                max_age_ms=max_age_ms,
+            )
+        except Exception as exc:
+            logger.warning("Async planned READ batch prefetch failed: %s", exc)
+            return {}
+        return self._filter_prefetched(words_by_batch)
+
+    async def read_gate_words_async(
+        self,
+        batch_nos: Optional[List[int]] = None,
+    ) -> Dict[int, Tuple[int, ...]]:
+        """
+        Phase one two-phase polling: baca word gating semua batch dalam satu
+        Multiple Memory Area Read (0x0104), tanpa decode.
+
+        Returns:
+            {batch_no: tuple word gating} (urutan sesuai plan.gate_offsets)
+        """
+        if batch_nos is None:
+            batch_nos = list(range(self.BATCH_MIN, self.BATCH_MAX + 1))
+        addresses: List[int] = []
+        spans: List[Tuple[int, int, int]] = []
+        for batch_no in batch_nos:
+            plan = self._get_decode_plan(batch_no)
+            begin = len(addresses)
+            addresses.extend(plan.start_address + offset for offset in plan.gate_offsets)
+            spans.append((batch_no, begin, len(addresses)))
+
+        client = await get_async_fins_client()
+        words = await client.read_multiple(addresses)
+        return {batch_no: tuple(words[begin:end]) for batch_no, begin, end in spans}
+
+    async def read_all_batches_data_async(self) -> Dict[int, Dict[str, Any]]:
+        """Async variant of read_all_batches_data."""
+        result: Dict[int, Dict[str, Any]] = {}
+        prefetched = await self.prefetch_batch_snapshots_async()
+        for batch_no in range(self.BATCH_MIN, self.BATCH_MAX + 1):
+            result[batch_no] = await self.read_batch_data_async(
+                batch_no=batch_no,
+                prefetched_words=prefetched.get(batch_no),
+            )
         return result
 
 
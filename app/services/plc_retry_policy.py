@@ -0,0 +1,410 @@
+"""
+PLC Retry Policy, Cycle Budget & Circuit Breaker
+
+Sebelumnya setiap service punya loop retry sendiri (3 attempt, sleep 0.1s)
+di atas timeout transport 2s, dan snapshot READ mengulang lagi sampai 4 kali
+per batch. Saat PLC mati satu cycle Task 2 bisa tertahan beberapa menit dan
+bertabrakan dengan cycle berikutnya.
+
+Modul ini menyatukan tiga mekanisme:
+
+- RetryPolicy: retry dengan back-off eksponensial + jitter (PLC_RETRY_*),
+  dipakai oleh read/write/handshake service, read planner dan async client.
+- plc_deadline(): time budget per cycle (contextvar, berlaku juga di
+  asyncio.to_thread dan task turunan). Timeout transport dipotong ke sisa
+  budget, retry/back-off berhenti saat budget habis.
+- CircuitBreaker: dipasang di FinsSession dan AsyncFinsClient (jalur yang
+  dipakai semua service PLC). Setelah PLC_BREAKER_FAILURE_THRESHOLD kegagalan
+  transport berturut-turut breaker terbuka dan request langsung gagal
+  (PLCUnavailableError) selama cool-down; setelah itu satu request membawa
+  probe murah (read 1 word) sebelum request aslinya dikirim.
+"""
+import asyncio
+import logging
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PLCUnavailableError(ConnectionError):
+    """Circuit breaker terbuka: request PLC ditolak tanpa dikirim."""
+
+
+class PLCBudgetExceededError(TimeoutError):
+    """Time budget cycle PLC sudah habis sebelum request dikirim."""
+
+
+# Error yang tidak pernah di-retry (retry justru melawan tujuan breaker/budget)
+NON_RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (PLCUnavailableError, PLCBudgetExceededError)
+TRANSPORT_ERRORS: Tuple[Type[BaseException], ...] = (TimeoutError, socket.timeout, OSError)
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = TRANSPORT_ERRORS + (ValueError,)
+
+
+# ----------------------------------------------------------------------
+# Cycle budget
+# ----------------------------------------------------------------------
+_deadline: ContextVar[Optional[float]] = ContextVar("plc_deadline", default=None)
+
+
+@contextmanager
+def plc_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Batasi total waktu komunikasi PLC di dalam blok ini.
+
+    Deadline bersarang tidak pernah memperpanjang deadline luar.
+    seconds None/<= 0 = tanpa budget.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    deadline = time.monotonic() + float(seconds)
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Sisa budget (detik), None jika tidak ada deadline aktif."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def budget_exhausted() -> bool:
+    remaining = remaining_budget()
+    return remaining is not None and remaining <= 0
+
+
+def clip_timeout(timeout_sec: float) -> float:
+    """Timeout transport dipotong ke sisa budget; raise jika budget sudah habis."""
+    remaining = remaining_budget()
+    if remaining is None:
+        return timeout_sec
+    if remaining <= 0:
+        raise PLCBudgetExceededError("PLC cycle time budget exhausted")
+    return min(timeout_sec, remaining)
+
+
+# ----------------------------------------------------------------------
+# Circuit breaker
+# ----------------------------------------------------------------------
+class CircuitBreaker:
+    """
+    Breaker closed -> open -> half_open untuk semua FINS traffic.
+
+    Kegagalan yang dihitung hanya kegagalan transport (timeout, socket error);
+    response FINS dengan end code error berarti PLC masih menjawab.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown_sec: float = 15.0,
+        probe_address: int = 7076,
+        enabled: bool = True,
+    ) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_sec = max(0.0, float(cooldown_sec))
+        self.probe_address = int(probe_address)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+        # Counters untuk endpoint status
+        self.open_count = 0
+        self.rejected = 0
+        self.probes = 0
+        self.probe_failures = 0
+        self.last_failure: Optional[str] = None
+        self.last_opened_at: Optional[datetime] = None
+        self.last_closed_at: Optional[datetime] = None
+
+    def before_request(self) -> bool:
+        """
+        Dipanggil sebelum setiap exchange.
+
+        Returns True jika caller harus mengirim probe dulu (dan melaporkan
+        hasilnya lewat probe_finished / release_probe). Raise
+        PLCUnavailableError selama cool-down atau saat probe lain berjalan.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            now = time.monotonic()
+            probe_stuck = self.state == self.HALF_OPEN and now - self._probe_started_at > max(self.cooldown_sec, 1.0)
+            if (self.state == self.OPEN and now - self._opened_at >= self.cooldown_sec) or probe_stuck:
+                self.state = self.HALF_OPEN
+                self._probe_started_at = now
+                self.probes += 1
+                return True
+            self.rejected += 1
+            retry_in = max(0.0, self.cooldown_sec - (now - self._opened_at))
+        raise PLCUnavailableError(
+            f"PLC circuit breaker {self.state} (next probe in {retry_in:.1f}s); last failure: {self.last_failure}"
+        )
+
+    def record_success(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                self._close()
+
+    def record_failure(self, exc: BaseException) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure = f"{type(exc).__name__}: {exc}"
+            if self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def probe_finished(self, ok: bool, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if ok:
+                self.consecutive_failures = 0
+                self._close()
+                return
+            self.probe_failures += 1
+            self.consecutive_failures += 1
+            if exc is not None:
+                self.last_failure = f"{type(exc).__name__}: {exc}"
+            self._open()
+
+    def release_probe(self) -> None:
+        """Probe batal sebelum terkirim (broker timeout dsb): request berikutnya boleh probe lagi."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic() - self.cooldown_sec
+
+    def reset(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._close()
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            self.open_count += 1
+            logger.warning(
+                "PLC circuit breaker OPEN after %s consecutive failure(s), cool-down %.1fs: %s",
+                self.consecutive_failures,
+                self.cooldown_sec,
+                self.last_failure,
+            )
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.last_opened_at = datetime.now(timezone.utc)
+
+    def _close(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("PLC circuit breaker CLOSED (PLC reachable again)")
+            self.last_closed_at = datetime.now(timezone.utc)
+        self.state = self.CLOSED
+
+    @property
+    def is_open(self) -> bool:
+        return self.enabled and self.state != self.CLOSED
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.cooldown_sec - (time.monotonic() - self._opened_at)), 3)
+            return {
+                "enabled": self.enabled,
+                "state": self.state,
+                "failure_threshold": self.failure_threshold,
+                "cooldown_sec": self.cooldown_sec,
+                "probe_address": f"D{self.probe_address}",
+                "consecutive_failures": self.consecutive_failures,
+                "next_probe_in_sec": retry_in,
+                "open_count": self.open_count,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "probe_failures": self.probe_failures,
+                "last_failure": self.last_failure,
+                "last_opened_at": self.last_opened_at.isoformat() if self.last_opened_at else None,
+                "last_closed_at": self.last_closed_at.isoformat() if self.last_closed_at else None,
+            }
+
+
+# ----------------------------------------------------------------------
+# Retry policy
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry dengan back-off eksponensial + jitter, sadar cycle budget."""
+
+    max_attempts: int = 3
+    base_delay_sec: float = 0.1
+    max_delay_sec: float = 2.0
+    # Fraksi back-off yang diacak (0 = tanpa jitter, 1 = full jitter)
+    jitter: float = 0.5
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay_sec, self.base_delay_sec * (2 ** (attempt - 1)))
+        if self.jitter > 0:
+            delay *= 1.0 - min(self.jitter, 1.0) * random.random()
+        return max(0.0, delay)
+
+    def _next_delay(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """Back-off sebelum attempt berikutnya, None jika harus berhenti."""
+        if isinstance(exc, NON_RETRYABLE_ERRORS) or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= delay:
+            return None
+        return delay
+
+    def run(
+        self,
+        func: Callable[[], T],
+        label: str,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+    ) -> T:
+        """
+        Jalankan func() dengan retry.
+
+        Breaker terbuka / budget habis di-raise apa adanya; selain itu error
+        terakhir dibungkus RuntimeError "<label> failed after N attempt(s)".
+        """
+        last_error: Optional[BaseException] = None
+        attempt = 0
+        while attempt < max(1, self.max_attempts):
+            attempt += 1
+            try:
+                return func()
+            except retry_on as exc:
+                if isinstance(exc, NON_RETRYABLE_ERRORS):
+                    raise
+                last_error = exc
+                delay = self._next_delay(attempt, exc)
+                if delay is None:
+                    break
+                logger.warning(
+                    "%s retry (attempt %s/%s, back-off %.2fs): %s",
+                    label,
+                    attempt,
+                    self.max_attempts,
+                    delay,
+                    exc,
+                )
+                time.sleep(delay)
+
+        raise RuntimeError(f"{label} failed after {attempt} attempt(s)") from last_error
+
+    async def run_async(
+        self,
+        func: Callable[[], Awaitable[T]],
+        label: str,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+    ) -> T:
+        """Async variant of run (back-off lewat asyncio.sleep)."""
+        last_error: Optional[BaseException] = None
+        attempt = 0
+        while attempt < max(1, self.max_attempts):
+            attempt += 1
+            try:
+                return await func()
+            except retry_on as exc:
+                if isinstance(exc, NON_RETRYABLE_ERRORS):
+                    raise
+                last_error = exc
+                delay = self._next_delay(attempt, exc)
+                if delay is None:
+                    break
+                logger.warning(
+                    "%s retry (attempt %s/%s, back-off %.2fs): %s",
+                    label,
+                    attempt,
+                    self.max_attempts,
+                    delay,
+                    exc,
+                )
+                await asyncio.sleep(delay)
+
+        raise RuntimeError(f"{label} failed after {attempt} attempt(s)") from last_error
+
+
+# Singleton instances
+_retry_policy: Optional[RetryPolicy] = None
+_circuit_breaker: Optional[CircuitBreaker] = None
+_singleton_lock = threading.Lock()
+
+
+def get_plc_retry_policy() -> RetryPolicy:
+    """Get RetryPolicy dari settings (PLC_RETRY_*)."""
+    global _retry_policy
+    if _retry_policy is None:
+        settings = get_settings()
+        _retry_policy = RetryPolicy(
+            max_attempts=max(1, settings.plc_retry_attempts),
+            base_delay_sec=max(0.0, settings.plc_retry_base_delay_sec),
+            max_delay_sec=max(0.0, settings.plc_retry_max_delay_sec),
+            jitter=max(0.0, settings.plc_retry_jitter),
+        )
+    return _retry_policy
+
+
+def get_plc_circuit_breaker() -> CircuitBreaker:
+    """Get singleton CircuitBreaker yang di-share FinsSession dan semua AsyncFinsClient."""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _singleton_lock:
+            if _circuit_breaker is None:
+                settings = get_settings()
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=settings.plc_breaker_failure_threshold,
+                    cooldown_sec=settings.plc_breaker_cooldown_sec,
+                    probe_address=settings.plc_breaker_probe_address,
+                    enabled=settings.plc_breaker_enabled,
+                )
+    return _circuit_breaker
+
+
+def get_plc_resilience_status() -> Dict[str, Any]:
+    """Snapshot retry policy + breaker + sisa budget untuk endpoint monitoring."""
+    policy = get_plc_retry_policy()
+    remaining = remaining_budget()
+    return {
+        "retry": {
+            "max_attempts": policy.max_attempts,
+            "base_delay_sec": policy.base_delay_sec,
+            "max_delay_sec": policy.max_delay_sec,
+            "jitter": policy.jitter,
+        },
+        "cycle_budget_sec": get_settings().plc_cycle_budget_sec,
+        "remaining_budget_sec": round(remaining, 3) if remaining is not None else None,
+        "breaker": get_plc_circuit_breaker().get_status(),
+    }
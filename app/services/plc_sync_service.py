@@ -9,7 +9,7 @@ import asyncio
 import logging
 import re
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -17,6 +17,7 @@ from sqlalchemy.orm import Session
 from app.core.config import get_settings
 from app.db.session import SessionLocal
 from app.models.tablesmo_batch import TableSmoBatch
+from app.services.plc_decode_plan import block_digest
 from app.services.plc_read_service import get_plc_read_service
 from app.services.plc_handshake_service import get_handshake_service
 from app.services.odoo_consumption_service import (
@@ -42,6 +43,13 @@ class PLCSyncService:
         self.batch_weight_warn_limit_kg = (
             self.expected_batch_max_kg + self.batch_weight_warn_margin_kg
         )
+        self.gating_enabled = bool(settings.plc_read_gating_enabled)
+        self.gating_full_every = max(0, int(settings.plc_read_gating_full_every))
+        # Word gating terakhir per batch yang sudah selesai diproses (two-phase polling)
+        self._gate_words: Dict[int, Tuple[int, ...]] = {}
+        # Content hash raw READ block per batch yang terakhir berhasil diproses
+        self._block_digests: Dict[int, bytes] = {}
+        self._gated_cycles = 0
 
     def _warn_if_suspicious_batch_weight(
         self,
@@ -206,16 +214,91 @@ class PLCSyncService:
         )
         return bool(normalized) if normalized is not None else False
 
-    async def sync_from_plc(self) -> Dict[str, Any]:
+    async def _select_batches_to_read(
+        self,
+        force_full: bool = False,
+    ) -> Tuple[List[int], Dict[int, Tuple[int, ...]]]:
+        """
+        Phase one: baca word gating semua batch (satu frame 0x0104) dan pilih
+        batch yang word gating-nya berubah sejak cycle terakhir.
+
+        Full read semua batch jika gating nonaktif/gagal, force_full, atau
+        sudah PLC_READ_GATING_FULL_EVERY cycle sejak full read terakhir.
         """
-        Read data from all PLC READ batches (01..10) and update mo_batch if values changed.
+        all_batches = list(range(1, 11))
+        if not self.gating_enabled:
+            return all_batches, {}
+
+        try:
+            gate_words = await self.plc_read_service.read_gate_words_async(all_batches)
+        except Exception as exc:
+            logger.warning("READ gate words read failed, falling back to full read: %s", exc)
+            return all_batches, {}
+
+        self._gated_cycles += 1
+        if force_full or (self.gating_full_every and self._gated_cycles >= self.gating_full_every):
+            self._gated_cycles = 0
+            return all_batches, gate_words
+
+        changed = [
+            batch_no
+            for batch_no in all_batches
+            if self._gate_words.get(batch_no) != gate_words.get(batch_no)
+        ]
+        return changed, gate_words
+
+    def _remember_processed(
+        self,
+        batch_no: int,
+        gate_words: Dict[int, Tuple[int, ...]],
+        digest: Optional[bytes],
+    ) -> None:
+        words = gate_words.get(batch_no)
+        if words is not None:
+            self._gate_words[batch_no] = words
+        if digest is not None:
+            self._block_digests[batch_no] = digest
+
+    async def sync_from_plc(self, force_full: bool = False) -> Dict[str, Any]:
+        """
+        Read data from PLC READ batches (01..10) and update mo_batch if values changed.
+
+        Two-phase polling (PLC_READ_GATING_ENABLED): hanya batch yang word
+        gating-nya berubah yang dibaca penuh dan di-update ke DB. Cycle tanpa
+        perubahan hanya butuh satu frame kecil dan tidak membuka session DB.
+
+        Args:
+            force_full: Abaikan gating dan content hash; baca dan re-apply semua batch
 
         Returns:
             Dict with sync summary.
         """
         try:
+            batches_to_read, gate_words = await self._select_batches_to_read(force_full)
+            gated_skipped_batches = 10 - len(batches_to_read)
+            if not batches_to_read:
+                return {
+                    "success": True,
+                    "updated": False,
+                    "message": "No READ batch changed since last cycle (gate words unchanged)",
+                    "mo_id": None,
+                    "processed_batches": 0,
+                    "updated_batches": 0,
+                    "unchanged_batches": gated_skipped_batches,
+                    "changed_batches": 0,
+                    "new_batches": 0,
+                    "gated_skipped_batches": gated_skipped_batches,
+                    "skipped_invalid_mo_batches": 0,
+                    "guard_skipped_values": 0,
+                    "failed_batches": [],
+                    "mo_ids": [],
+                }
+
             processed_batches = 0
             updated_batches = 0
+            unchanged_batches = gated_skipped_batches
+            changed_batches = 0
+            new_batches = 0
             guard_skipped_values = 0
             skipped_invalid_mo_batches = 0
             failed_batches: List[Dict[str, Any]] = []
@@ -223,9 +306,33 @@ class PLCSyncService:
             first_mo_id: Optional[str] = None
 
             with SessionLocal() as session:
-                for plc_batch_no in range(1, 11):
+                # Gate words baru saja dibaca langsung dari PLC; block jangan lebih tua dari itu
+                prefetched = await self.plc_read_service.prefetch_batch_snapshots_async(
+                    batches_to_read,
+                    max_age_ms=0 if gate_words else None,
+                )
+                for plc_batch_no in batches_to_read:
+                    # Batch gagal / belum ada di DB tidak disimpan gate/hash-nya, dicoba lagi cycle berikutnya
+                    self._gate_words.pop(plc_batch_no, None)
+                    previous_digest = self._block_digests.pop(plc_batch_no, None)
+                    raw_words = prefetched.get(plc_batch_no)
+                    unchanged = bool(raw_words) and block_digest(raw_words) == previous_digest
+                    if unchanged and not force_full:
+                        # Word image identik dengan cycle sebelumnya: skip decode, validasi MO, dan DB
+                        unchanged_batches += 1
+                        self._remember_processed(plc_batch_no, gate_words, previous_digest)
+                        continue
+                    # force_full tetap re-apply block identik (DB bisa sudah berbeda dari PLC)
+                    if previous_digest is None:
+                        new_batches += 1
+                    elif not unchanged:
+                        changed_batches += 1
+
                     try:
-                        plc_data = self.plc_read_service.read_batch_data(batch_no=plc_batch_no)
+                        plc_data, snapshot_words = await self.plc_read_service.read_batch_data_with_snapshot_async(
+                            batch_no=plc_batch_no,
+                            prefetched_words=raw_words,
+                        )
                     except Exception as exc:
                         failed_batches.append(
                             {
@@ -235,9 +342,12 @@ class PLCSyncService:
                         )
                         continue
 
+                    # Digest dari snapshot yang benar-benar di-decode (setelah retry kualitas)
+                    digest = block_digest(snapshot_words) if snapshot_words else None
                     mo_id = self._extract_valid_mo_id(plc_data, plc_batch_no)
                     if not mo_id:
                         skipped_invalid_mo_batches += 1
+                        self._remember_processed(plc_batch_no, gate_words, digest)
                         continue
 
                     processed_batches += 1
@@ -269,21 +379,30 @@ class PLCSyncService:
                         )
 
                     if self._is_completed_in_read_payload(plc_data):
-                        get_handshake_service().mark_read_area_as_read(batch_no=plc_batch_no)
+                        await get_handshake_service().mark_read_area_as_read_async(batch_no=plc_batch_no)
                     else:
                         logger.debug(
                             "Skip READ handshake mark for batch=%s (status_manufacturing!=1)",
                             plc_batch_no,
                         )
+                    self._remember_processed(plc_batch_no, gate_words, digest)
 
             if processed_batches == 0:
                 return {
                     "success": True,
                     "updated": False,
-                    "message": "No valid NO-MO in PLC READ data (all batches skipped safely)",
+                    "message": (
+                        "No valid NO-MO in PLC READ data (all batches skipped safely)"
+                        if skipped_invalid_mo_batches or failed_batches
+                        else "No READ batch changed since last cycle (content hash unchanged)"
+                    ),
                     "mo_id": None,
                     "processed_batches": 0,
                     "updated_batches": 0,
+                    "unchanged_batches": unchanged_batches,
+                    "changed_batches": changed_batches,
+                    "new_batches": new_batches,
+                    "gated_skipped_batches": gated_skipped_batches,
                     "skipped_invalid_mo_batches": skipped_invalid_mo_batches,
                     "guard_skipped_values": guard_skipped_values,
                     "failed_batches": failed_batches,
@@ -296,10 +415,15 @@ class PLCSyncService:
                 "mo_id": first_mo_id,
                 "message": (
                     f"Processed {processed_batches} batch(es), "
-                    f"updated {updated_batches} batch(es)"
+                    f"updated {updated_batches} batch(es), "
+                    f"unchanged {unchanged_batches}"
                 ),
                 "processed_batches": processed_batches,
                 "updated_batches": updated_batches,
+                "unchanged_batches": unchanged_batches,
+                "changed_batches": changed_batches,
+                "new_batches": new_batches,
+                "gated_skipped_batches": gated_skipped_batches,
                 "skipped_invalid_mo_batches": skipped_invalid_mo_batches,
                 "guard_skipped_values": guard_skipped_values,
                 "failed_batches": failed_batches,
@@ -409,9 +533,13 @@ class PLCSyncService:
             first_mo_id: Optional[str] = None
 
             with SessionLocal() as session:
+                prefetched = await self.plc_read_service.prefetch_batch_snapshots_async(list(range(1, 11)))
                 for plc_batch_no in range(1, 11):
                     try:
-                        plc_data = self.plc_read_service.read_batch_data(batch_no=plc_batch_no)
+                        plc_data = await self.plc_read_service.read_batch_data_async(
+                            batch_no=plc_batch_no,
+                            prefetched_words=prefetched.get(plc_batch_no),
+                        )
                     except Exception as exc:
                         failed_batches.append(
                             {
@@ -461,7 +589,7 @@ class PLCSyncService:
                         )
 
                     if self._is_completed_in_read_payload(plc_data):
-                        get_handshake_service().mark_read_area_as_read(batch_no=plc_batch_no)
+                        await get_handshake_service().mark_read_area_as_read_async(batch_no=plc_batch_no)
                     else:
                         logger.debug(
                             "Skip READ handshake mark for batch=%s (status_manufacturing!=1)",
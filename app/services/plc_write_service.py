@@ -8,26 +8,47 @@ import logging
 import math
 import os
 import re
-import socket
 import struct
-import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from app.core.config import get_settings
-from app.services.fins_client import FinsUdpClient
-from app.services.fins_frames import build_memory_write_frame, parse_memory_write_response
+from app.services.fins_async_client import get_async_fins_client
+from app.services.fins_read_planner import MAX_READ_WORDS
+from app.services.fins_session import get_fins_session
 from app.services.plc_handshake_service import get_handshake_service
+from app.services.plc_retry_policy import TRANSPORT_ERRORS, get_plc_retry_policy
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SlotWrite:
+    """Encoded words untuk satu WRITE slot (address -> word), siap di-pack ke block write."""
+    batch_name: str
+    start: int
+    count: int
+    words_by_address: Dict[int, int] = field(default_factory=dict)
+    success_count: int = 0
+    skipped_count: int = 0
+    error_count: int = 0
+
+    @property
+    def end(self) -> int:
+        return self.start + self.count
+
+
 class PLCWriteService:
     """Service untuk write data ke PLC menggunakan FINS protocol."""
+
+    # Max word per Memory Area Write frame (sama dengan batas read planner)
+    MAX_WRITE_WORDS = MAX_READ_WORDS
     
     def __init__(self):
         self.settings = get_settings()
         self.mapping: Dict[str, List[Dict[str, Any]]] = {}
+        self._slot_spans: Dict[str, tuple[int, int]] = {}
         self._load_reference()
     
     def _load_reference(self):
@@ -250,14 +271,31 @@ class PLCWriteService:
             value: Nilai yang akan ditulis
         """
         resolved_batch_name = self._resolve_batch_name(batch_name)
+        address, words = self._encode_field(resolved_batch_name, field_name, value)
+        
+        # Write to PLC
+        self._write_to_plc(address, words)
         
-        # Find field definition
-        field_def = None
+        logger.info(f"Written {field_name} to DM {address}: {words} (value={value})")
+
+    async def write_field_async(self, batch_name: str, field_name: str, value: Any) -> None:
+        """Async variant of write_field."""
+        resolved_batch_name = self._resolve_batch_name(batch_name)
+        address, words = self._encode_field(resolved_batch_name, field_name, value)
+
+        await self._write_to_plc_async(address, words)
+
+        logger.info(f"Written {field_name} to DM {address}: {words} (value={value})")
+
+    def _find_field_def(self, resolved_batch_name: str, field_name: str) -> Optional[Dict[str, Any]]:
         for item in self.mapping[resolved_batch_name]:
             if item["Informasi"] == field_name:
-                field_def = item
-                break
-        
+                return item
+        return None
+
+    def _encode_field(self, resolved_batch_name: str, field_name: str, value: Any) -> tuple[int, List[int]]:
+        """Resolve address and encode value words for one WRITE field (no PLC I/O)."""
+        field_def = self._find_field_def(resolved_batch_name, field_name)
         if not field_def:
             raise ValueError(f"Field {field_name} not found in {resolved_batch_name}")
         
@@ -288,10 +326,7 @@ class PLCWriteService:
             else:
                 words = words[:expected_count]
         
-        # Write to PLC
-        self._write_to_plc(address, words)
-        
-        logger.info(f"Written {field_name} to DM {address}: {words} (value={value})")
+        return address, words
     
     def write_batch(self, batch_name: str, data: Dict[str, Any], skip_handshake_check: bool = False) -> None:
         """
@@ -341,39 +376,14 @@ class PLCWriteService:
             
             logger.info(f"[{resolved_batch_name}] Handshake check passed: PLC ready for new batch (D7076=1)")
         
-        success_count = 0
-        error_count = 0
-        skipped_count = 0
-        
         logger.info(f"[{resolved_batch_name}] Writing {len(data)} fields to PLC...")
-        
-        for field_name, value in data.items():
-            try:
-                # Find field in mapping
-                field_def = None
-                for item in self.mapping[resolved_batch_name]:
-                    if item["Informasi"] == field_name:
-                        field_def = item
-                        break
-                
-                if not field_def:
-                    logger.warning(
-                        f"[{resolved_batch_name}] Field '{field_name}' not found in MASTER_BATCH_REFERENCE mapping. "
-                        f"Available fields: {[item['Informasi'] for item in self.mapping[resolved_batch_name]]}"
-                    )
-                    skipped_count += 1
-                    continue
-                
-                # Write field
-                self.write_field(resolved_batch_name, field_name, value)
-                success_count += 1
-                
-            except Exception as exc:
-                logger.error(
-                    f"[{resolved_batch_name}] Error writing field '{field_name}' with value {value}: {exc}",
-                    exc_info=True
-                )
-                error_count += 1
+
+        # Seluruh slot di-encode lalu dikirim per run word berurutan (bukan per field)
+        slot = self._prepare_slot_write(resolved_batch_name, data)
+        self._write_slot_groups([slot])
+        success_count = slot.success_count
+        error_count = slot.error_count
+        skipped_count = slot.skipped_count
         
         # After successful write, reset handshake flag to 0
         # (indicating Middleware has written new data, PLC should read it)
@@ -394,6 +404,270 @@ class PLCWriteService:
                 f"Failed to write {resolved_batch_name}: {error_count} field(s) failed. "
                 f"Check logs for details."
             )
+
+    async def write_batch_async(
+        self,
+        batch_name: str,
+        data: Dict[str, Any],
+        skip_handshake_check: bool = False,
+    ) -> None:
+        """Async variant of write_batch (same handshake and error semantics)."""
+        resolved_batch_name = self._resolve_batch_name(batch_name)
+
+        if not skip_handshake_check:
+            handshake = get_handshake_service()
+            plc_has_read = await handshake.check_write_area_status_async()
+
+            if not plc_has_read:
+                logger.warning(
+                    f"[{resolved_batch_name}] Handshake check failed: PLC hasn't read previous batch yet (D7076=0). "
+                    f"Skipping write to prevent data overwrite. PLC will set D7076=1 when ready."
+                )
+                raise RuntimeError(
+                    f"Cannot write {resolved_batch_name}: PLC handshake not ready (D7076=0). "
+                    f"Wait for PLC to read current batch first."
+                )
+
+            logger.info(f"[{resolved_batch_name}] Handshake check passed: PLC ready for new batch (D7076=1)")
+
+        logger.info(f"[{resolved_batch_name}] Writing {len(data)} fields to PLC...")
+
+        slot = self._prepare_slot_write(resolved_batch_name, data)
+        await self._write_slot_groups_async([slot])
+        success_count = slot.success_count
+        error_count = slot.error_count
+        skipped_count = slot.skipped_count
+
+        if not skip_handshake_check and error_count == 0:
+            handshake = get_handshake_service()
+            await handshake.reset_write_area_status_async()  # Set D7076 = 0
+            logger.info(f"[{resolved_batch_name}] Reset handshake flag (D7076=0) - waiting for PLC to read")
+
+        logger.info(
+            f"[{resolved_batch_name}] Write completed: "
+            f"✓ {success_count} success, "
+            f"⚠ {skipped_count} skipped, "
+            f"✗ {error_count} errors"
+        )
+
+        if error_count > 0:
+            raise RuntimeError(
+                f"Failed to write {resolved_batch_name}: {error_count} field(s) failed. "
+                f"Check logs for details."
+            )
+
+    # ------------------------------------------------------------------
+    # Whole-slot block writes
+    # ------------------------------------------------------------------
+    def _slot_span(self, resolved_batch_name: str) -> tuple[int, int]:
+        """(start_address, word_count) yang dicakup seluruh field satu WRITE slot."""
+        cached = self._slot_spans.get(resolved_batch_name)
+        if cached is not None:
+            return cached
+
+        start: Optional[int] = None
+        end: Optional[int] = None
+        for item in self.mapping.get(resolved_batch_name, []):
+            address, count = self._parse_dm_address(item["DM"])
+            start = address if start is None else min(start, address)
+            end = address + count if end is None else max(end, address + count)
+        if start is None or end is None:
+            raise ValueError(f"No DM fields mapped for {resolved_batch_name}")
+
+        span = (start, end - start)
+        self._slot_spans[resolved_batch_name] = span
+        return span
+
+    def _prepare_slot_write(self, resolved_batch_name: str, data: Dict[str, Any]) -> SlotWrite:
+        """Encode semua field satu slot ke map address -> word (tanpa PLC I/O)."""
+        start, count = self._slot_span(resolved_batch_name)
+        slot = SlotWrite(batch_name=resolved_batch_name, start=start, count=count)
+
+        for field_name, value in data.items():
+            if not self._find_field_def(resolved_batch_name, field_name):
+                logger.warning(
+                    f"[{resolved_batch_name}] Field '{field_name}' not found in MASTER_BATCH_REFERENCE mapping. "
+                    f"Available fields: {[item['Informasi'] for item in self.mapping[resolved_batch_name]]}"
+                )
+                slot.skipped_count += 1
+                continue
+
+            try:
+                address, words = self._encode_field(resolved_batch_name, field_name, value)
+            except Exception as exc:
+                logger.error(
+                    f"[{resolved_batch_name}] Error encoding field '{field_name}' with value {value}: {exc}",
+                    exc_info=True
+                )
+                slot.error_count += 1
+                continue
+
+            for offset, word in enumerate(words):
+                slot.words_by_address[address + offset] = word
+            slot.success_count += 1
+
+        return slot
+
+    def _group_slot_writes(self, slots: List[SlotWrite]) -> List[List[SlotWrite]]:
+        """Pack slot yang span-nya bersambung (slot.start == end slot sebelumnya) selama span <= MAX_WRITE_WORDS."""
+        groups: List[List[SlotWrite]] = []
+        for slot in sorted((s for s in slots if s.words_by_address), key=lambda s: s.start):
+            if groups:
+                group = groups[-1]
+                if slot.start == group[-1].end and (slot.end - group[0].start) <= self.MAX_WRITE_WORDS:
+                    group.append(slot)
+                    continue
+            groups.append([slot])
+        return groups
+
+    def _block_runs(self, group: List[SlotWrite]) -> List[tuple[int, List[int]]]:
+        """
+        Word yang di-encode dalam satu group sebagai run address berurutan
+        [(start, words)], maksimal MAX_WRITE_WORDS per run.
+
+        Word yang tidak di-encode (mis. status manufaturing yang di-update PLC
+        sendiri) tidak ikut ditulis: run dipecah di sekitarnya, bukan diisi
+        dari image hasil read sebelumnya (update PLC di antara read dan write
+        akan hilang).
+        """
+        words_by_address: Dict[int, int] = {}
+        for slot in group:
+            words_by_address.update(slot.words_by_address)
+
+        runs: List[tuple[int, List[int]]] = []
+        for address in sorted(words_by_address):
+            if runs:
+                run_start, run_words = runs[-1]
+                if address == run_start + len(run_words) and len(run_words) < self.MAX_WRITE_WORDS:
+                    run_words.append(words_by_address[address])
+                    continue
+            runs.append((address, [words_by_address[address]]))
+        return runs
+
+    def _log_group_written(self, group: List[SlotWrite], runs: List[tuple[int, List[int]]]) -> None:
+        logger.info(
+            "Block write D%s-D%s (%s words in %s frame(s), %s slot(s): %s)",
+            runs[0][0],
+            runs[-1][0] + len(runs[-1][1]) - 1,
+            sum(len(words) for _, words in runs),
+            len(runs),
+            len(group),
+            ", ".join(slot.batch_name for slot in group),
+        )
+
+    def _write_slot_groups(self, slots: List[SlotWrite], written: Optional[List[str]] = None) -> None:
+        """Tulis slot sebagai block write: satu frame per run word yang di-encode."""
+        for group in self._group_slot_writes(slots):
+            runs = self._block_runs(group)
+            for start, words in runs:
+                self._write_to_plc(start, words)
+            if written is not None:
+                written.extend(slot.batch_name for slot in group)
+            self._log_group_written(group, runs)
+
+    async def _write_slot_groups_async(self, slots: List[SlotWrite], written: Optional[List[str]] = None) -> None:
+        """Async variant of _write_slot_groups."""
+        for group in self._group_slot_writes(slots):
+            runs = self._block_runs(group)
+            for start, words in runs:
+                await self._write_to_plc_async(start, words)
+            if written is not None:
+                written.extend(slot.batch_name for slot in group)
+            self._log_group_written(group, runs)
+
+    def _raise_for_slot_errors(self, slots: List[SlotWrite]) -> None:
+        failed = [f"{slot.batch_name} ({slot.error_count})" for slot in slots if slot.error_count]
+        if failed:
+            raise RuntimeError(
+                f"Failed to encode field(s) for {', '.join(failed)}. Check logs for details."
+            )
+
+    def write_batches(
+        self,
+        batches: Dict[str, Dict[str, Any]],
+        written: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Write beberapa WRITE slot sekaligus tanpa handshake check.
+
+        Word yang di-encode dikirim sebagai Memory Area Write per run address
+        berurutan; slot yang span-nya bersambung di-pack ke run yang sama.
+        Word slot yang tidak di-encode tidak ditulis. Handshake (D7076) tetap tanggung
+        jawab caller. `written` (opsional) diisi nama slot yang sudah terkirim,
+        juga ketika method ini raise di tengah jalan.
+        """
+        slots = [
+            self._prepare_slot_write(self._resolve_batch_name(batch_name), data)
+            for batch_name, data in batches.items()
+        ]
+        written = written if written is not None else []
+        self._write_slot_groups(slots, written)
+        self._raise_for_slot_errors(slots)
+        return written
+
+    async def write_batches_async(
+        self,
+        batches: Dict[str, Dict[str, Any]],
+        written: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Async variant of write_batches."""
+        slots = [
+            self._prepare_slot_write(self._resolve_batch_name(batch_name), data)
+            for batch_name, data in batches.items()
+        ]
+        written = written if written is not None else []
+        await self._write_slot_groups_async(slots, written)
+        self._raise_for_slot_errors(slots)
+        return written
+
+    def write_mo_batches_to_plc(
+        self,
+        mo_batches: List[tuple[Dict[str, Any], int]],
+        written: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Write beberapa mo_batch (data, batch_number) dengan block write per group slot.
+
+        Slot yang tidak ada di mapping menghentikan antrian: slot sebelumnya
+        tetap ditulis, lalu error di-raise (sama seperti write per slot).
+        """
+        written = written if written is not None else []
+        batches, build_error = self._build_mo_batches_plc_data(mo_batches)
+        self.write_batches(batches, written)
+        if build_error is not None:
+            raise build_error
+        return written
+
+    async def write_mo_batches_to_plc_async(
+        self,
+        mo_batches: List[tuple[Dict[str, Any], int]],
+        written: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Async variant of write_mo_batches_to_plc."""
+        written = written if written is not None else []
+        batches, build_error = self._build_mo_batches_plc_data(mo_batches)
+        await self.write_batches_async(batches, written)
+        if build_error is not None:
+            raise build_error
+        return written
+
+    def _build_mo_batches_plc_data(
+        self,
+        mo_batches: List[tuple[Dict[str, Any], int]],
+    ) -> tuple[Dict[str, Dict[str, Any]], Optional[ValueError]]:
+        batches: Dict[str, Dict[str, Any]] = {}
+        for mo_batch_data, batch_number in mo_batches:
+            try:
+                resolved_batch_name, plc_data = self._build_mo_batch_plc_data(mo_batch_data, batch_number)
+            except ValueError as exc:
+                return batches, exc
+            batches[resolved_batch_name] = plc_data
+        return batches, None
+
+    async def _write_to_plc_async(self, address: int, values: List[int]) -> None:
+        """Low-level write ke PLC via async FINS client (tidak memblokir event loop)."""
+        client = await get_async_fins_client()
+        await client.write_words(address, values)
     
     def _write_to_plc(self, address: int, values: List[int]) -> None:
         """
@@ -403,45 +677,11 @@ class PLCWriteService:
             address: DM address (e.g., 7000)
             values: List of 16-bit integer values
         """
-        max_attempts = 3
-        last_error: Exception | None = None
-
-        for attempt in range(1, max_attempts + 1):
-            try:
-                with FinsUdpClient(
-                    ip=self.settings.plc_ip,
-                    port=self.settings.plc_port,
-                    timeout_sec=self.settings.plc_timeout_sec,
-                ) as client:
-                    frame = build_memory_write_frame(
-                        area="DM",
-                        address=address,
-                        values=values,
-                        client_node=self.settings.client_node,
-                        plc_node=self.settings.plc_node,
-                        sid=0x00,
-                    )
-
-                    client.send_raw_hex(frame.hex())
-                    response = client.recv()
-                    parse_memory_write_response(response.raw)
-                return
-            except (TimeoutError, socket.timeout) as exc:
-                last_error = exc
-                if attempt < max_attempts:
-                    logger.warning(
-                        "PLC write timeout at D%s (attempt %s/%s). Retrying...",
-                        address,
-                        attempt,
-                        max_attempts,
-                    )
-                    time.sleep(0.1)
-                    continue
-                break
-
-        raise RuntimeError(
-            f"PLC write timeout at D{address} after {max_attempts} attempts"
-        ) from last_error
+        get_plc_retry_policy().run(
+            lambda: get_fins_session().write_words(address, values),
+            f"PLC write at D{address}",
+            retry_on=TRANSPORT_ERRORS,
+        )
     
     def write_mo_batch_to_plc(
         self,
@@ -468,6 +708,50 @@ class PLCWriteService:
             - Status Operation: Status operasi (0/1)
             - weight_finished_good: Actual weight hasil (REAL)
         """
+        resolved_batch_name, plc_data = self._build_mo_batch_plc_data(mo_batch_data, batch_number)
+        
+        # Write to PLC
+        self.write_batch(
+            resolved_batch_name,
+            plc_data,
+            skip_handshake_check=skip_handshake_check,
+        )
+        
+        logger.info(
+            f"✓ MO batch data written to PLC {resolved_batch_name}: "
+            f"mo_id={mo_batch_data.get('mo_id')}, "
+            f"batch={batch_number}/30, "
+            f"fields={len(plc_data)}"
+        )
+
+    async def write_mo_batch_to_plc_async(
+        self,
+        mo_batch_data: Dict[str, Any],
+        batch_number: int = 1,
+        skip_handshake_check: bool = False,
+    ) -> None:
+        """Async variant of write_mo_batch_to_plc."""
+        resolved_batch_name, plc_data = self._build_mo_batch_plc_data(mo_batch_data, batch_number)
+
+        await self.write_batch_async(
+            resolved_batch_name,
+            plc_data,
+            skip_handshake_check=skip_handshake_check,
+        )
+
+        logger.info(
+            f"✓ MO batch data written to PLC {resolved_batch_name}: "
+            f"mo_id={mo_batch_data.get('mo_id')}, "
+            f"batch={batch_number}/30, "
+            f"fields={len(plc_data)}"
+        )
+
+    def _build_mo_batch_plc_data(
+        self,
+        mo_batch_data: Dict[str, Any],
+        batch_number: int,
+    ) -> tuple[str, Dict[str, Any]]:
+        """Map one mo_batch row onto WRITE slot field values (no PLC I/O)."""
         if batch_number < 1 or batch_number > 30:
             raise ValueError(f"Batch number must be 1-30, got {batch_number}")
         
@@ -550,19 +834,7 @@ class PLCWriteService:
                 plc_data[item["Informasi"]] = mo_batch_data.get("actual_weight_quantity_finished_goods", 0)
                 logger.debug(f"Set weight field: {item['Informasi']} = {plc_data[item['Informasi']]}")
         
-        # Write to PLC
-        self.write_batch(
-            resolved_batch_name,
-            plc_data,
-            skip_handshake_check=skip_handshake_check,
-        )
-        
-        logger.info(
-            f"✓ MO batch data written to PLC {resolved_batch_name}: "
-            f"mo_id={mo_batch_data.get('mo_id')}, "
-            f"batch={batch_number}/30, "
-            f"fields={len(plc_data)}"
-        )
+        return resolved_batch_name, plc_data
 
 
 # Singleton instance
@@ -0,0 +1,252 @@
+"""
+Partition maintenance untuk table system_log.
+
+Sejak migration 20261017_0017, system_log adalah table Postgres yang
+di-partisi RANGE per hari (kolom timestamp, UTC):
+
+    system_log                 (parent, partitioned)
+    system_log_p20261017       [2026-10-17 00:00+00, 2026-10-18 00:00+00)
+    ...
+    system_log_default         (DEFAULT, menampung row di luar partisi harian)
+
+Retention tidak lagi DELETE ... NOT IN (...) per row, tetapi:
+- ensure_partitions(): buat partisi hari ini + N hari ke depan
+- drop_expired(): DROP partisi harian yang seluruhnya lebih lama dari cutoff
+  (operasi metadata, konstan terhadap jumlah row), dengan tetap menjaga
+  LOG_CLEANUP_KEEP_LAST row terbaru
+
+Jika table belum dipartisi (migration belum dijalankan) service jatuh ke
+DELETE per row seperti sebelumnya.
+"""
+import logging
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import desc, select, text
+from sqlalchemy.orm import Session
+
+from app.models.system_log import SystemLog
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "system_log"
+DEFAULT_PARTITION = "system_log_default"
+_PARTITION_NAME_RE = re.compile(r"^system_log_p(\d{8})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class SystemLogPartitionService:
+    """Create/drop partisi harian system_log."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_partitioned(self) -> bool:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(
+            self.db.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table pt "
+                    "JOIN pg_class c ON c.oid = pt.partrelid "
+                    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                    "WHERE c.relname = :name AND n.nspname = current_schema()"
+                ),
+                {"name": PARENT_TABLE},
+            ).scalar()
+        )
+
+    def list_partitions(self) -> List[Dict[str, Any]]:
+        """Partisi harian yang ter-attach, urut dari yang tertua."""
+        rows = self.db.execute(
+            text(
+                "SELECT c.relname, c.reltuples::bigint "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "JOIN pg_namespace n ON n.oid = p.relnamespace "
+                "WHERE p.relname = :name AND n.nspname = current_schema()"
+            ),
+            {"name": PARENT_TABLE},
+        ).fetchall()
+
+        partitions: List[Dict[str, Any]] = []
+        for name, approx_rows in rows:
+            match = _PARTITION_NAME_RE.match(name)
+            if not match:
+                continue
+            day = datetime.strptime(match.group(1), "%Y%m%d").date()
+            partitions.append(
+                {
+                    "name": name,
+                    "day": day,
+                    "from": _day_start(day),
+                    "to": _day_start(day + timedelta(days=1)),
+                    # reltuples = estimasi dari ANALYZE (-1 jika belum pernah di-analyze)
+                    "approx_rows": max(0, int(approx_rows or 0)),
+                }
+            )
+        partitions.sort(key=lambda item: item["day"])
+        return partitions
+
+    def create_partition(self, day: date) -> bool:
+        """
+        Buat partisi untuk `day` jika belum ada. Return True jika dibuat.
+
+        Partisi dibuat sebagai table biasa, row yang sudah terlanjur masuk
+        DEFAULT untuk range tersebut dipindah, lalu di-ATTACH (ATTACH gagal
+        jika DEFAULT masih berisi row dalam range itu).
+        """
+        name = partition_name(day)
+        exists = self.db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists:
+            return False
+
+        bounds = {"lo": _day_start(day), "hi": _day_start(day + timedelta(days=1))}
+        lo_literal = bounds["lo"].isoformat()
+        hi_literal = bounds["hi"].isoformat()
+        self.db.execute(
+            text(
+                f'CREATE TABLE "{name}" '
+                f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        self.db.execute(
+            text(
+                f"WITH moved AS ("
+                f"  DELETE FROM {DEFAULT_PARTITION} "
+                f"  WHERE timestamp >= :lo AND timestamp < :hi RETURNING *"
+                f") INSERT INTO \"{name}\" SELECT * FROM moved"
+            ),
+            bounds,
+        )
+        self.db.execute(
+            text(
+                f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{lo_literal}') TO ('{hi_literal}')"
+            )
+        )
+        logger.info("system_log partition created: %s", name)
+        return True
+
+    def ensure_partitions(self, days_ahead: int, today: Optional[date] = None) -> List[str]:
+        """Pastikan partisi hari ini sampai `days_ahead` hari ke depan tersedia."""
+        today = today or datetime.now(timezone.utc).date()
+        created: List[str] = []
+        for offset in range(max(0, int(days_ahead)) + 1):
+            day = today + timedelta(days=offset)
+            if self.create_partition(day):
+                created.append(partition_name(day))
+        self.db.commit()
+        return created
+
+    def _keep_last_boundary(self, keep_last: int) -> Optional[datetime]:
+        """Timestamp row ke-`keep_last` terbaru (None jika row lebih sedikit)."""
+        if keep_last <= 0:
+            return None
+        return self.db.execute(
+            select(SystemLog.timestamp)
+            .order_by(desc(SystemLog.timestamp))
+            .offset(keep_last - 1)
+            .limit(1)
+        ).scalar()
+
+    def drop_expired(self, cutoff: datetime, keep_last: int = 0) -> Dict[str, Any]:
+        """
+        DROP partisi harian yang seluruh range-nya < cutoff.
+
+        Partisi yang masih memuat salah satu dari `keep_last` row terbaru tidak
+        di-drop. Row lama di partisi DEFAULT dihapus per row (DEFAULT hanya
+        menampung row di luar range partisi harian, jadi kecil).
+
+        approx_deleted_count = jumlah reltuples partisi yang di-drop (estimasi
+        ANALYZE, 0 untuk partisi yang belum di-analyze); default_deleted exact.
+        """
+        effective_cutoff = cutoff
+        boundary = self._keep_last_boundary(keep_last)
+        if keep_last > 0:
+            if boundary is None:
+                # Total row <= keep_last: tidak ada yang boleh dihapus
+                return {"dropped_partitions": [], "approx_deleted_count": 0, "default_deleted": 0, "cutoff": cutoff}
+            effective_cutoff = min(cutoff, boundary)
+
+        dropped: List[str] = []
+        approx_deleted = 0
+        for partition in self.list_partitions():
+            if partition["to"] > effective_cutoff:
+                break
+            self.db.execute(text(f'DROP TABLE "{partition["name"]}"'))
+            dropped.append(partition["name"])
+            approx_deleted += partition["approx_rows"]
+            logger.info("system_log partition dropped: %s (~%s rows)", partition["name"], partition["approx_rows"])
+
+        default_deleted = self.db.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff"),
+            {"cutoff": effective_cutoff},
+        ).rowcount
+        self.db.commit()
+        return {
+            "dropped_partitions": dropped,
+            "approx_deleted_count": approx_deleted,
+            "default_deleted": default_deleted or 0,
+            "cutoff": effective_cutoff,
+        }
+
+    def keep_latest(self, keep_last: int) -> Dict[str, Any]:
+        """
+        Sisakan `keep_last` row terbaru: partisi yang lebih tua di-drop, lalu
+        sisa row lama di partisi batas dihapus per row (partition pruning
+        membatasi DELETE ke satu partisi). `deleted` exact (DELETE per row),
+        approx_deleted_count estimasi dari partisi yang di-drop.
+        """
+        boundary = self._keep_last_boundary(keep_last)
+        if boundary is None:
+            return {"dropped_partitions": [], "approx_deleted_count": 0, "deleted": 0}
+
+        result = self.drop_expired(boundary, keep_last=0)
+        deleted = self.db.execute(
+            text(f"DELETE FROM {PARENT_TABLE} WHERE timestamp < :boundary"),
+            {"boundary": boundary},
+        ).rowcount
+        self.db.commit()
+        return {
+            "dropped_partitions": result["dropped_partitions"],
+            "approx_deleted_count": result["approx_deleted_count"],
+            "deleted": (deleted or 0) + result["default_deleted"],
+        }
+
+    def truncate(self) -> int:
+        """Kosongkan semua partisi; return estimasi (reltuples) jumlah row yang dihapus."""
+        approx_deleted = sum(partition["approx_rows"] for partition in self.list_partitions())
+        self.db.execute(text(f"TRUNCATE TABLE {PARENT_TABLE}"))
+        self.db.commit()
+        return approx_deleted
+
+    def delete_legacy(self, cutoff: Optional[datetime], keep_last: int) -> int:
+        """DELETE per row (table system_log belum dipartisi)."""
+        query = self.db.query(SystemLog)
+        if cutoff is not None:
+            query = query.filter(SystemLog.timestamp < cutoff)
+        if keep_last > 0:
+            keep_subquery = (
+                select(SystemLog.id)
+                .order_by(desc(SystemLog.timestamp))
+                .limit(keep_last)
+            )
+            query = query.filter(~SystemLog.id.in_(keep_subquery))
+        deleted = query.delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+
+def get_system_log_partition_service(db: Session) -> SystemLogPartitionService:
+    """Get SystemLogPartitionService instance"""
+    return SystemLogPartitionService(db=db)
@@ -1,9 +1,10 @@
 import logging
 from typing import Any, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.db.pagination import count_rows, encode_cursor, keyset_page
 from app.models.tablesmo_batch import TableSmoBatch
 from app.models.tablesmo_history import TableSmoHistory
 
@@ -80,47 +81,74 @@ class TableViewService:
         offset: int = 0,
         status: Optional[str] = None,
         mo_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact",
     ) -> dict[str, Any]:
-        """Ambil data mo_histories dengan pagination."""
+        """
+        Ambil data mo_histories dengan pagination.
+
+        Dengan `cursor` (next_cursor halaman sebelumnya) dipakai keyset
+        pagination pada (last_read_from_plc, id) dan offset diabaikan.
+        `count`: exact | approx | none (lihat app.db.pagination.count_rows).
+        Raise ValueError jika cursor tidak valid.
+        """
         base_stmt = select(TableSmoHistory)
-        count_stmt = select(func.count()).select_from(TableSmoHistory)
 
         if status:
             base_stmt = base_stmt.where(TableSmoHistory.status == status)
-            count_stmt = count_stmt.where(TableSmoHistory.status == status)
 
         if mo_id:
             base_stmt = base_stmt.where(TableSmoHistory.mo_id.ilike(f"%{mo_id}%"))
-            count_stmt = count_stmt.where(TableSmoHistory.mo_id.ilike(f"%{mo_id}%"))
 
-        total = self.db.execute(count_stmt).scalar_one()
-
-        stmt = (
-            base_stmt
-            .order_by(TableSmoHistory.last_read_from_plc.desc().nullslast())
-            .limit(limit)
-            .offset(offset)
-        )
-        result = self.db.execute(stmt)
-        rows = result.scalars().all()
+        total, total_is_estimate = count_rows(self.db, base_stmt, count)
+
+        if cursor:
+            rows, next_cursor = keyset_page(
+                self.db,
+                base_stmt,
+                TableSmoHistory.last_read_from_plc,
+                TableSmoHistory.id,
+                limit,
+                cursor=cursor,
+                nullable=True,
+            )
+            offset = 0
+        else:
+            stmt = (
+                base_stmt
+                .order_by(
+                    TableSmoHistory.last_read_from_plc.desc().nullslast(),
+                    TableSmoHistory.id.desc(),
+                )
+                .limit(limit + 1)
+                .offset(offset)
+            )
+            rows = list(self.db.execute(stmt).scalars().all())
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor([rows[-1].last_read_from_plc, rows[-1].id])
 
         logger.info(
             (
                 "Retrieved %s history row(s) from mo_histories "
-                "(limit=%s offset=%s status=%s mo_id=%s)"
+                "(limit=%s offset=%s cursor=%s status=%s mo_id=%s)"
             ),
             len(rows),
             limit,
             offset,
+            bool(cursor),
             status,
             mo_id,
         )
 
         return {
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "limit": limit,
             "offset": offset,
-            "has_next": (offset + len(rows)) < total,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor,
             "items": [self._serialize_mo_history(row) for row in rows],
         }
 
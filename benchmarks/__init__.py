@@ -0,0 +1,13 @@
+"""
+Benchmark suite untuk hot path PLC -> DB -> Odoo.
+
+Jalankan:
+    python -m benchmarks                       # semua case yang bisa jalan
+    python -m benchmarks --save benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json
+
+PLC memakai tools/plc_simulator.py (in-process, port ephemeral) dan Odoo memakai
+stub HTTP server lokal (benchmarks/odoo_stub.py). Case yang butuh database
+(sync_from_plc, process_completed_batches_task) hanya jalan dengan
+--database-url ke database scratch yang sudah di-migrate.
+"""
@@ -0,0 +1,281 @@
+"""
+Benchmark cases.
+
+Module app.* di-import di dalam fungsi case, setelah __main__ mengarahkan
+PLC_IP/PLC_PORT/ODOO_BASE_URL/DATABASE_URL ke stand-in lokal.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from benchmarks.harness import BenchResult, run_async, run_sync
+
+BENCH_MO_PREFIX = "BENCH/MO/"
+
+
+@dataclass
+class BenchContext:
+    simulator: Any
+    odoo_stub: Any
+    iterations: int = 50
+    db_enabled: bool = False
+    task3_batches: int = 10
+    _mo_counter: int = 0
+    seeded_batch_ids: List[Any] = field(default_factory=list)
+
+    def next_mo_id(self) -> str:
+        self._mo_counter += 1
+        return f"{BENCH_MO_PREFIX}{self._mo_counter:05d}"
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    runner: Callable[[BenchContext], Union[BenchResult, Awaitable[BenchResult]]]
+    is_async: bool = False
+    requires_db: bool = False
+    description: str = ""
+
+
+# ---------------------------------------------------------------------------
+# FINS frame encode/decode (tanpa I/O)
+# ---------------------------------------------------------------------------
+
+def bench_frames_encode_read(ctx: BenchContext) -> BenchResult:
+    from app.services.fins_frames import MemoryReadRequest, build_memory_read_frame
+
+    request = MemoryReadRequest(area="DM", address=6000, count=977)
+    sids = iter(range(1 << 30))
+    return run_sync(
+        "fins.encode_read_frame",
+        lambda: build_memory_read_frame(request, 0x22, 0x02, next(sids) % 255 + 1),
+        ctx.iterations,
+        inner=1000,
+    )
+
+
+def bench_frames_encode_write(ctx: BenchContext) -> BenchResult:
+    from app.services.fins_frames import build_memory_write_frame
+
+    words = [random.randint(0, 0xFFFF) for _ in range(77)]
+    return run_sync(
+        "fins.encode_write_frame_77w",
+        lambda: build_memory_write_frame("DM", 7000, words, 0x22, 0x02, 1),
+        ctx.iterations,
+        inner=1000,
+    )
+
+
+def bench_frames_parse_read(ctx: BenchContext) -> BenchResult:
+    from app.services.fins_frames import parse_memory_read_response, words_to_bytes
+
+    count = 977
+    raw = bytes(10) + b"\x01\x01\x00\x00" + words_to_bytes([random.randint(0, 0xFFFF) for _ in range(count)])
+    return run_sync(
+        "fins.parse_read_response_977w",
+        lambda: parse_memory_read_response(raw, count),
+        ctx.iterations,
+        inner=1000,
+    )
+
+
+def bench_frames_parse_multi_read(ctx: BenchContext) -> BenchResult:
+    from app.services.fins_frames import AREA_CODES, parse_multiple_memory_read_response
+
+    items = [("DM", 6076 + 100 * index) for index in range(23)]
+    raw = bytes(10) + b"\x01\x04\x00\x00" + b"".join(
+        bytes((AREA_CODES["DM"],)) + random.randint(0, 1).to_bytes(2, "big") for _ in items
+    )
+    return run_sync(
+        "fins.parse_multi_read_23items",
+        lambda: parse_multiple_memory_read_response(raw, items),
+        ctx.iterations,
+        inner=1000,
+    )
+
+
+def bench_decode_batch_block(ctx: BenchContext) -> BenchResult:
+    from app.services.plc_read_service import get_plc_read_service
+
+    service = get_plc_read_service()
+    words = ctx.simulator.image.get_words(6000, 77)
+    return run_sync(
+        "read.decode_all_fields_77w",
+        lambda: service._decode_all_fields(1, words),
+        ctx.iterations,
+        inner=100,
+    )
+
+
+# ---------------------------------------------------------------------------
+# PLC I/O terhadap simulator
+# ---------------------------------------------------------------------------
+
+def bench_read_all_batches(ctx: BenchContext) -> BenchResult:
+    from app.services.plc_read_service import get_plc_read_service
+
+    service = get_plc_read_service()
+    return run_sync("plc.read_all_batches_data", service.read_all_batches_data, ctx.iterations)
+
+
+def bench_write_mo_batches_30(ctx: BenchContext) -> BenchResult:
+    """30x write_mo_batch_to_plc; slot BATCH01..10 dipakai bergiliran (3 putaran)."""
+    from app.services.plc_write_service import get_plc_write_service
+
+    service = get_plc_write_service()
+    rows = [
+        {
+            "mo_id": f"WH/MO/{index:05d}",
+            "finished_goods": "JF SUPER 2A 25",
+            "consumption": 1000.0,
+            "status_manufacturing": 0,
+            "status_operation": 0,
+            **{f"consumption_silo_{letter}": 10.0 + index for letter in "abcdefghijklm"},
+        }
+        for index in range(1, 31)
+    ]
+
+    def write_cycle() -> None:
+        for index, row in enumerate(rows):
+            service.write_mo_batch_to_plc(row, batch_number=index % 10 + 1, skip_handshake_check=True)
+
+    result = run_sync("plc.write_mo_batch_to_plc_x30", write_cycle, ctx.iterations)
+    result.extra["writes_per_op"] = len(rows)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Case yang butuh database (scratch DB yang sudah di-migrate)
+# ---------------------------------------------------------------------------
+
+def _seed_sync_batches(ctx: BenchContext) -> None:
+    """Buat row mo_batch yang cocok dengan NO-MO di simulator (strict batch_no + mo_id)."""
+    from app.db.session import SessionLocal
+    from app.models.tablesmo_batch import TableSmoBatch
+    from app.services.plc_read_service import get_plc_read_service
+
+    payloads = get_plc_read_service().read_all_batches_data()
+    with SessionLocal() as session:
+        for batch_no, payload in payloads.items():
+            mo_id = str(payload.get("mo_id") or "").strip()
+            if not mo_id:
+                continue
+            exists = (
+                session.query(TableSmoBatch.id)
+                .filter(TableSmoBatch.batch_no == batch_no, TableSmoBatch.mo_id == mo_id)
+                .first()
+            )
+            if exists:
+                continue
+            row = TableSmoBatch(
+                batch_no=batch_no,
+                mo_id=mo_id,
+                consumption=1000,
+                equipment_id_batch="PLC01",
+            )
+            session.add(row)
+            session.flush()
+            ctx.seeded_batch_ids.append(row.id)
+        session.commit()
+
+
+def _cleanup_seeded(ctx: BenchContext) -> None:
+    from app.db.session import SessionLocal
+    from app.models.tablesmo_batch import TableSmoBatch
+    from app.models.tablesmo_history import TableSmoHistory
+
+    with SessionLocal() as session:
+        if ctx.seeded_batch_ids:
+            session.query(TableSmoBatch).filter(TableSmoBatch.id.in_(ctx.seeded_batch_ids)).delete(
+                synchronize_session=False
+            )
+        session.query(TableSmoBatch).filter(TableSmoBatch.mo_id.like(f"{BENCH_MO_PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        session.query(TableSmoHistory).filter(TableSmoHistory.mo_id.like(f"{BENCH_MO_PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        session.commit()
+    ctx.seeded_batch_ids.clear()
+
+
+async def bench_sync_from_plc(ctx: BenchContext) -> BenchResult:
+    from app.services.plc_sync_service import get_plc_sync_service
+
+    service = get_plc_sync_service()
+    _seed_sync_batches(ctx)
+    rng = random.Random(7)
+
+    def perturb() -> None:
+        # Ubah consumption SILO 101 batch 1 supaya tiap cycle ada update ke DB
+        ctx.simulator.image.set_words(6028, [0, rng.randint(1, 9000)])
+
+    try:
+        return await run_async("sync.sync_from_plc", service.sync_from_plc, ctx.iterations, setup=perturb)
+    finally:
+        _cleanup_seeded(ctx)
+
+
+async def bench_process_completed_batches(ctx: BenchContext) -> BenchResult:
+    from app.core.scheduler import process_completed_batches_task
+    from app.db.session import SessionLocal
+    from app.models.tablesmo_batch import TableSmoBatch
+
+    def seed_completed() -> None:
+        with SessionLocal() as session:
+            for batch_no in range(1, ctx.task3_batches + 1):
+                row = TableSmoBatch(
+                    batch_no=batch_no,
+                    mo_id=ctx.next_mo_id(),
+                    consumption=1000,
+                    equipment_id_batch="PLC01",
+                    status_manufacturing=True,
+                    update_odoo=False,
+                    actual_weight_quantity_finished_goods=1000,
+                )
+                for letter in "abcdefghijklm":
+                    setattr(row, f"actual_consumption_silo_{letter}", 12.5)
+                session.add(row)
+            session.commit()
+
+    try:
+        result = await run_async(
+            "task3.process_completed_batches",
+            process_completed_batches_task,
+            ctx.iterations,
+            warmup=1,
+            setup=seed_completed,
+        )
+    finally:
+        _cleanup_seeded(ctx)
+    result.extra["batches_per_op"] = ctx.task3_batches
+    result.extra["odoo_requests"] = dict(ctx.odoo_stub.hits)
+    return result
+
+
+CASES: List[BenchCase] = [
+    BenchCase("fins.encode_read_frame", bench_frames_encode_read, description="Build 0x0101 frame"),
+    BenchCase("fins.encode_write_frame_77w", bench_frames_encode_write, description="Build 0x0102 frame (1 slot)"),
+    BenchCase("fins.parse_read_response_977w", bench_frames_parse_read, description="Parse 10-batch READ block"),
+    BenchCase("fins.parse_multi_read_23items", bench_frames_parse_multi_read, description="Parse handshake multi-read"),
+    BenchCase("read.decode_all_fields_77w", bench_decode_batch_block, description="Decode one READ batch"),
+    BenchCase("plc.read_all_batches_data", bench_read_all_batches, description="PLCReadService.read_all_batches_data"),
+    BenchCase("plc.write_mo_batch_to_plc_x30", bench_write_mo_batches_30, description="30 MO writes"),
+    BenchCase("sync.sync_from_plc", bench_sync_from_plc, is_async=True, requires_db=True,
+              description="PLCSyncService.sync_from_plc"),
+    BenchCase("task3.process_completed_batches", bench_process_completed_batches, is_async=True, requires_db=True,
+              description="process_completed_batches_task (Odoo stub)"),
+]
+
+
+def select_cases(names: Optional[List[str]] = None) -> List[BenchCase]:
+    if not names:
+        return list(CASES)
+    selected = [case for case in CASES if any(case.name.startswith(name) for name in names)]
+    if not selected:
+        raise ValueError(f"No benchmark case matches: {names}")
+    return selected
+
+
+def describe_cases() -> Dict[str, str]:
+    return {case.name: case.description for case in CASES}
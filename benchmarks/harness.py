@@ -0,0 +1,187 @@
+"""
+Timing harness: jalankan case N kali, hitung ops/sec dan p50/p95/p99,
+simpan/bandingkan baseline JSON.
+"""
+import asyncio
+import json
+import math
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+    errors: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile atas sample yang sudah terurut."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(
+    name: str,
+    samples_sec: List[float],
+    errors: int = 0,
+    extra: Optional[Dict[str, Any]] = None,
+) -> BenchResult:
+    ordered = sorted(samples_sec)
+    total = sum(ordered)
+    to_ms = 1000.0
+    return BenchResult(
+        name=name,
+        iterations=len(ordered),
+        ops_per_sec=(len(ordered) / total) if total > 0 else 0.0,
+        mean_ms=(total / len(ordered) * to_ms) if ordered else 0.0,
+        p50_ms=percentile(ordered, 50) * to_ms,
+        p95_ms=percentile(ordered, 95) * to_ms,
+        p99_ms=percentile(ordered, 99) * to_ms,
+        min_ms=(ordered[0] * to_ms) if ordered else 0.0,
+        max_ms=(ordered[-1] * to_ms) if ordered else 0.0,
+        errors=errors,
+        extra=dict(extra or {}),
+    )
+
+
+def run_sync(
+    name: str,
+    func: Callable[[], Any],
+    iterations: int,
+    warmup: int = 3,
+    setup: Optional[Callable[[], Any]] = None,
+    inner: int = 1,
+) -> BenchResult:
+    """
+    Ukur func() per iterasi; setup() (jika ada) dijalankan di luar timing.
+
+    inner > 1 untuk operasi mikro: satu sample = rata-rata `inner` panggilan,
+    supaya overhead timer tidak mendominasi.
+    """
+    inner = max(1, int(inner))
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+
+    samples: List[float] = []
+    errors = 0
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        try:
+            for _ in range(inner):
+                func()
+        except Exception:
+            errors += 1
+        samples.append((time.perf_counter() - started) / inner)
+    return summarize(name, samples, errors=errors, extra={"inner": inner} if inner > 1 else None)
+
+
+async def run_async(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    iterations: int,
+    warmup: int = 3,
+    setup: Optional[Callable[[], Any]] = None,
+) -> BenchResult:
+    """Async variant of run_sync (setup boleh sync atau coroutine)."""
+
+    async def _setup() -> None:
+        if setup is None:
+            return
+        result = setup()
+        if asyncio.iscoroutine(result):
+            await result
+
+    for _ in range(warmup):
+        await _setup()
+        await func()
+
+    samples: List[float] = []
+    errors = 0
+    for _ in range(iterations):
+        await _setup()
+        started = time.perf_counter()
+        try:
+            await func()
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - started)
+    return summarize(name, samples, errors=errors)
+
+
+def format_table(results: List[BenchResult]) -> str:
+    header = f"{'case':<36} {'iters':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>4}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.name:<36} {result.iterations:>6} {result.ops_per_sec:>10.1f} "
+            f"{result.p50_ms:>9.3f} {result.p95_ms:>9.3f} {result.p99_ms:>9.3f} {result.errors:>4}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(path: Path, results: List[BenchResult], config: Dict[str, Any]) -> Path:
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": {result.name: result.to_dict() for result in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def compare_with_baseline(
+    path: Path,
+    results: List[BenchResult],
+    threshold: float = 0.2,
+) -> List[str]:
+    """
+    Bandingkan hasil dengan baseline JSON.
+
+    Regresi = p95 naik lebih dari `threshold` (relatif) atau ops/sec turun
+    lebih dari `threshold`. Return daftar pesan regresi (kosong jika aman).
+    """
+    baseline = json.loads(path.read_text(encoding="utf-8")).get("results", {})
+    regressions: List[str] = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        old_p95 = float(previous.get("p95_ms") or 0.0)
+        old_ops = float(previous.get("ops_per_sec") or 0.0)
+        if old_p95 > 0 and result.p95_ms > old_p95 * (1 + threshold):
+            regressions.append(
+                f"{result.name}: p95 {old_p95:.3f} ms -> {result.p95_ms:.3f} ms "
+                f"(+{(result.p95_ms / old_p95 - 1) * 100:.1f}%)"
+            )
+        if old_ops > 0 and result.ops_per_sec < old_ops * (1 - threshold):
+            regressions.append(
+                f"{result.name}: ops/s {old_ops:.1f} -> {result.ops_per_sec:.1f} "
+                f"({(result.ops_per_sec / old_ops - 1) * 100:.1f}%)"
+            )
+    return regressions
@@ -0,0 +1,112 @@
+"""
+Stub Odoo HTTP server untuk benchmark.
+
+Menjawab endpoint /api/scada/* dan /web/session/authenticate yang dipakai
+middleware dengan response sukses minimal (format sama dengan modul SCADA
+Odoo), plus latency opsional. Jumlah request per path dicatat di `hits`.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+def _response_for(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if path.endswith("/authenticate"):
+        return {"jsonrpc": "2.0", "result": {"status": "success", "uid": 2}}
+    if path.endswith("/mo-list-detailed"):
+        return {"jsonrpc": "2.0", "result": {"status": "success", "data": [], "count": 0}}
+    if path.endswith("/mo/update-with-consumptions"):
+        consumed = [key for key in payload if key not in ("mo_id", "quantity")]
+        return {
+            "jsonrpc": "2.0",
+            "result": {"status": "success", "message": "ok", "consumed_items": consumed, "errors": []},
+        }
+    return {"jsonrpc": "2.0", "result": {"status": "success", "message": "ok"}}
+
+
+class OdooStubServer:
+    """ThreadingHTTPServer di thread background; gunakan sebagai context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0) -> None:
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.hits: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        if self._server is None:
+            return (self.host, self.port)
+        return self._server.server_address[:2]  # type: ignore[return-value]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000.0)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Set-Cookie", "session_id=bench-session; Path=/")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    payload = json.loads(raw) if raw else {}
+                except ValueError:
+                    payload = {}
+                if isinstance(payload, dict) and isinstance(payload.get("params"), dict):
+                    payload = payload["params"]
+                path = self.path.split("?", 1)[0]
+                with stub._lock:
+                    stub.hits[path] += 1
+                self._reply(_response_for(path, payload if isinstance(payload, dict) else {}))
+
+            do_POST = _handle
+            do_GET = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        return Handler
+
+    def start(self) -> "OdooStubServer":
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="odoo-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def __enter__(self) -> "OdooStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Local Omron FINS PLC simulator backed by an in-memory DM image.
+
+Dipakai untuk benchmark / load test tanpa PLC fisik (192.168.1.2).
+
+Command yang didukung:
+- 0x0101 Memory Area Read
+- 0x0102 Memory Area Write
+- 0x0104 Multiple Memory Area Read
+Command lain dibalas end code 0x0401 (Undefined command).
+
+Transport: FINS/UDP, FINS/TCP (node-address handshake), atau keduanya di port
+yang sama. DM image bisa di-seed dari snapshot CSV
+(`snapshots/PLC_BATCH_READ_*_LIVE.csv`, `PLC_BATCH_READ_01_D6000.csv`) dan
+override `--set D7076=1`.
+
+Fault injection per request:
+- latency + jitter (ms)
+- packet loss (request di-drop, client harus timeout/retry)
+- torn word: dua word berurutan di response read ditukar (simulasi torn-read /
+  word-order pada REAL 32-bit)
+
+Contoh:
+    python tools/plc_simulator.py --port 9600 --protocol both --latency-ms 2 --jitter-ms 1
+    PLC_IP=127.0.0.1 PLC_PORT=9600 uvicorn app.main:app
+
+Embed (misalnya dari benchmark):
+    with PLCSimulator(SimulatorConfig(port=0)) as sim:
+        sim.image.seed_default()
+        host, port = sim.address
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import random
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Ensure project root is importable when running this script directly.
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.fins_frames import (
+    AREA_CODES,
+    FINS_TCP_CMD_FRAME,
+    FINS_TCP_CMD_NODE_REQUEST,
+    FINS_TCP_CMD_NODE_RESPONSE,
+    FINS_TCP_HEADER_SIZE,
+    FINS_TCP_MAGIC,
+    parse_fins_tcp_header,
+    wrap_fins_tcp_frame,
+    words_from_bytes,
+    words_to_bytes,
+)
+from app.services.plc_decode_plan import parse_dm_range
+
+logger = logging.getLogger("plc_simulator")
+
+AREA_WORDS = 32768  # CS/CJ: D0-D32767
+DEFAULT_SEED_FILES = [
+    PROJECT_ROOT / "PLC_BATCH_READ_01_D6000.csv",
+    *sorted((PROJECT_ROOT / "snapshots").glob("PLC_BATCH_READ_*_LIVE.csv")),
+]
+
+END_OK = 0x0000
+END_UNDEFINED_COMMAND = 0x0401
+END_COMMAND_TOO_SHORT = 0x1002
+END_AREA_MISSING = 0x1101
+END_ADDRESS_RANGE = 0x1103
+
+
+@dataclass
+class SimulatorConfig:
+    host: str = "127.0.0.1"
+    port: int = 9600
+    protocol: str = "udp"  # udp | tcp | both
+    server_node: int = 2
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    loss_rate: float = 0.0
+    torn_rate: float = 0.0
+    random_seed: Optional[int] = None
+
+
+def load_snapshot_csv(path: Path) -> List[Tuple[int, List[int]]]:
+    """
+    Baca snapshot CSV menjadi list (address, words).
+
+    Format yang didukung:
+    - LIVE/TRANSLATED export: kolom `raw_words` ("w1|w2|...")
+    - PLC_BATCH_READ_01_D6000.csv: kolom `raw_word_1` (+ `raw_word_2`)
+    """
+    rows: List[Tuple[int, List[int]]] = []
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            dm = (row.get("dm_address") or "").strip()
+            if not dm:
+                continue
+            if "raw_words" in row:
+                parts = [row.get("raw_words") or ""]
+            else:
+                parts = [row.get("raw_word_1") or "", row.get("raw_word_2") or ""]
+            words = [int(token) & 0xFFFF for part in parts for token in part.split("|") if token.strip()]
+            if not words:
+                continue
+            address, count = parse_dm_range(dm)
+            rows.append((address, words[:count]))
+    return rows
+
+
+class MemoryImage:
+    """Word memory per area (big-endian bytearray), thread-safe."""
+
+    def __init__(self) -> None:
+        self._areas: Dict[int, bytearray] = {code: bytearray(AREA_WORDS * 2) for code in AREA_CODES.values()}
+        self._lock = threading.Lock()
+
+    def has_area(self, area_code: int) -> bool:
+        return area_code in self._areas
+
+    def read_bytes(self, area_code: int, address: int, count: int) -> bytes:
+        with self._lock:
+            return bytes(self._areas[area_code][address * 2:(address + count) * 2])
+
+    def write_bytes(self, area_code: int, address: int, data: bytes) -> None:
+        with self._lock:
+            self._areas[area_code][address * 2:address * 2 + len(data)] = data
+
+    def get_words(self, address: int, count: int, area: str = "DM") -> List[int]:
+        return words_from_bytes(self.read_bytes(AREA_CODES[area], address, count)).tolist()
+
+    def set_words(self, address: int, words: List[int], area: str = "DM") -> None:
+        if address < 0 or address + len(words) > AREA_WORDS:
+            raise ValueError(f"{area}{address} (+{len(words)}) out of range")
+        self.write_bytes(AREA_CODES[area], address, words_to_bytes([int(word) & 0xFFFF for word in words]))
+
+    def seed_from_csv(self, path: Path) -> int:
+        rows = load_snapshot_csv(path)
+        for address, words in rows:
+            self.set_words(address, words)
+        return len(rows)
+
+    def seed_default(self) -> int:
+        total = 0
+        for path in DEFAULT_SEED_FILES:
+            if path.exists():
+                total += self.seed_from_csv(path)
+        return total
+
+
+class FinsCommandHandler:
+    """Proses satu FINS frame request -> response frame (atau None jika di-drop)."""
+
+    def __init__(self, image: MemoryImage, config: SimulatorConfig) -> None:
+        self.image = image
+        self.config = config
+        self._random = random.Random(config.random_seed)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "reads": 0,
+            "writes": 0,
+            "multi_reads": 0,
+            "errors": 0,
+            "dropped": 0,
+            "torn": 0,
+            "words_read": 0,
+            "words_written": 0,
+        }
+
+    def response_delay(self) -> float:
+        delay_ms = self.config.latency_ms
+        if self.config.jitter_ms:
+            delay_ms += self._random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(delay_ms, 0.0) / 1000.0
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        self.stats["requests"] += 1
+        if self.config.loss_rate and self._random.random() < self.config.loss_rate:
+            self.stats["dropped"] += 1
+            return None
+        if len(frame) < 12:
+            self.stats["errors"] += 1
+            return None
+
+        # Response header: tukar destination/source dari request, SID sama
+        header = bytes((0xC0, 0x00, 0x02, frame[6], frame[7], frame[8], frame[3], frame[4], frame[5], frame[9]))
+        mrc, src = frame[10], frame[11]
+        command = (mrc << 8) | src
+        try:
+            if command == 0x0101:
+                end_code, data = self._memory_read(frame)
+            elif command == 0x0102:
+                end_code, data = self._memory_write(frame)
+            elif command == 0x0104:
+                end_code, data = self._multiple_read(frame)
+            else:
+                end_code, data = END_UNDEFINED_COMMAND, b""
+        except (IndexError, struct.error):
+            end_code, data = END_COMMAND_TOO_SHORT, b""
+
+        if end_code != END_OK:
+            self.stats["errors"] += 1
+            data = b""
+        return header + bytes((mrc, src)) + end_code.to_bytes(2, "big") + data
+
+    def _check_range(self, area_code: int, address: int, count: int) -> int:
+        if not self.image.has_area(area_code):
+            return END_AREA_MISSING
+        if count <= 0 or address + count > AREA_WORDS:
+            return END_ADDRESS_RANGE
+        return END_OK
+
+    def _memory_read(self, frame: bytes) -> Tuple[int, bytes]:
+        area_code, address, _bit, count = struct.unpack_from(">BHBH", frame, 12)
+        end_code = self._check_range(area_code, address, count)
+        if end_code != END_OK:
+            return end_code, b""
+        self.stats["reads"] += 1
+        self.stats["words_read"] += count
+        data = self.image.read_bytes(area_code, address, count)
+        if count >= 2 and self.config.torn_rate and self._random.random() < self.config.torn_rate:
+            index = self._random.randrange(count - 1) * 2
+            torn = bytearray(data)
+            torn[index:index + 2], torn[index + 2:index + 4] = data[index + 2:index + 4], data[index:index + 2]
+            data = bytes(torn)
+            self.stats["torn"] += 1
+        return END_OK, data
+
+    def _memory_write(self, frame: bytes) -> Tuple[int, bytes]:
+        area_code, address, _bit, count = struct.unpack_from(">BHBH", frame, 12)
+        end_code = self._check_range(area_code, address, count)
+        if end_code != END_OK:
+            return end_code, b""
+        data = frame[18:18 + count * 2]
+        if len(data) != count * 2:
+            return END_COMMAND_TOO_SHORT, b""
+        self.image.write_bytes(area_code, address, data)
+        self.stats["writes"] += 1
+        self.stats["words_written"] += count
+        return END_OK, b""
+
+    def _multiple_read(self, frame: bytes) -> Tuple[int, bytes]:
+        body = frame[12:]
+        if not body or len(body) % 4:
+            return END_COMMAND_TOO_SHORT, b""
+        out = bytearray()
+        for offset in range(0, len(body), 4):
+            area_code, address, _bit = struct.unpack_from(">BHB", body, offset)
+            end_code = self._check_range(area_code, address, 1)
+            if end_code != END_OK:
+                return end_code, b""
+            out.append(area_code)
+            out += self.image.read_bytes(area_code, address, 1)
+        self.stats["multi_reads"] += 1
+        self.stats["words_read"] += len(body) // 4
+        return END_OK, bytes(out)
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, handler: FinsCommandHandler) -> None:
+        self.handler = handler
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        response = self.handler.handle(data)
+        if response is None or self.transport is None:
+            return
+        delay = self.handler.response_delay()
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+class PLCSimulator:
+    """FINS server (UDP/TCP) di event loop thread background."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, image: Optional[MemoryImage] = None) -> None:
+        self.config = config or SimulatorConfig()
+        self.image = image or MemoryImage()
+        self.handler = FinsCommandHandler(self.image, self.config)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stop: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+        self._next_client_node = 10
+        self._tcp_tasks: set = set()
+        self.bound_port: Optional[int] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return (self.config.host, self.bound_port or self.config.port)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.handler.stats)
+
+    def _assign_client_node(self, requested: int) -> int:
+        if 0 < requested < 255 and requested != self.config.server_node:
+            return requested
+        node = self._next_client_node
+        self._next_client_node = 10 + (self._next_client_node - 9) % 240
+        return node
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        self._tcp_tasks.add(task)
+        last_due = 0.0
+        try:
+            while True:
+                header = await reader.readexactly(FINS_TCP_HEADER_SIZE)
+                length, command, _ = parse_fins_tcp_header(header)
+                body = await reader.readexactly(length - 8)
+                if command == FINS_TCP_CMD_NODE_REQUEST:
+                    requested = struct.unpack_from(">I", body, 0)[0] if len(body) >= 4 else 0
+                    client_node = self._assign_client_node(requested & 0xFF)
+                    writer.write(
+                        FINS_TCP_MAGIC
+                        + struct.pack(">IIIII", 16, FINS_TCP_CMD_NODE_RESPONSE, 0, client_node, self.config.server_node)
+                    )
+                    continue
+                if command != FINS_TCP_CMD_FRAME:
+                    continue
+                response = self.handler.handle(body)
+                if response is None:
+                    continue
+                # Stream TCP tetap berurutan walau ada jitter
+                due = max(loop.time() + self.handler.response_delay(), last_due)
+                last_due = due
+                loop.call_at(due, writer.write, wrap_fins_tcp_frame(response))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self._tcp_tasks.discard(task)
+            writer.close()
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        host, port = self.config.host, self.config.port
+        protocol = self.config.protocol.lower()
+        udp_transport = None
+        tcp_server = None
+        try:
+            if protocol in ("udp", "both"):
+                udp_transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _UdpProtocol(self.handler), local_addr=(host, port)
+                )
+                port = udp_transport.get_extra_info("sockname")[1]
+            if protocol in ("tcp", "both"):
+                tcp_server = await asyncio.start_server(self._handle_tcp, host, port)
+                port = tcp_server.sockets[0].getsockname()[1]
+            if udp_transport is None and tcp_server is None:
+                raise ValueError(f"Unsupported protocol: {self.config.protocol}")
+            self.bound_port = port
+            logger.info("FINS simulator listening on %s:%s (%s)", host, port, protocol)
+            self._ready.set()
+            await self._stop.wait()
+        finally:
+            if udp_transport is not None:
+                udp_transport.close()
+            if tcp_server is not None:
+                tcp_server.close()
+                for task in list(self._tcp_tasks):
+                    task.cancel()
+                await asyncio.gather(*self._tcp_tasks, return_exceptions=True)
+                await tcp_server.wait_closed()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self.serve())
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+        finally:
+            self._loop.close()
+
+    def start(self, timeout_sec: float = 5.0) -> "PLCSimulator":
+        self._thread = threading.Thread(target=self._run, name="plc-simulator", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout_sec):
+            raise TimeoutError("PLC simulator did not start in time")
+        if self._error is not None:
+            raise RuntimeError(f"PLC simulator failed to start: {self._error}") from self._error
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._stop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def __enter__(self) -> "PLCSimulator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def _parse_set(value: str) -> Tuple[int, List[int]]:
+    """Parse `D7076=1` atau `D7000-7001=1,2`."""
+    dm, _, raw = value.partition("=")
+    if not raw:
+        raise argparse.ArgumentTypeError(f"Expected Dxxxx=value, got: {value}")
+    address, count = parse_dm_range(dm)
+    words = [int(token, 0) for token in raw.split(",") if token.strip()]
+    if len(words) == 1 and count > 1:
+        words = words * count
+    return address, words
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local FINS PLC simulator (DM image).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9600)
+    parser.add_argument("--protocol", choices=["udp", "tcp", "both"], default="udp")
+    parser.add_argument("--node", type=int, default=2, help="Server FINS node (PLC_NODE)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="Probabilitas request di-drop (0..1)")
+    parser.add_argument("--torn", type=float, default=0.0, help="Probabilitas torn word per read (0..1)")
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument("--seed-csv", type=Path, action="append", default=[], help="Snapshot CSV tambahan")
+    parser.add_argument("--no-default-seed", action="store_true", help="Jangan seed dari snapshot bawaan repo")
+    parser.add_argument("--set", type=_parse_set, action="append", default=[], metavar="Dxxxx=value")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    config = SimulatorConfig(
+        host=args.host,
+        port=args.port,
+        protocol=args.protocol,
+        server_node=args.node,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        loss_rate=args.loss,
+        torn_rate=args.torn,
+        random_seed=args.random_seed,
+    )
+    simulator = PLCSimulator(config)
+    seeded = 0 if args.no_default_seed else simulator.image.seed_default()
+    for path in args.seed_csv:
+        seeded += simulator.image.seed_from_csv(path)
+    for address, words in args.set:
+        simulator.image.set_words(address, words)
+    print(f"Seeded {seeded} fields, {len(args.set)} overrides")
+
+    try:
+        asyncio.run(simulator.serve())
+    except KeyboardInterrupt:
+        pass
+    print(f"Stats: {simulator.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())